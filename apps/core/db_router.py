@@ -0,0 +1,71 @@
+"""
+Primary/replica database routing.
+
+Reads go to a random alias of ``REPLICA_ROUTING["REPLICAS"]``; writes go
+to ``default``. Replicas lag behind the primary, so reads also go to
+``default``:
+
+* inside a transaction on ``default``, which must see its own writes and
+  hold its locks;
+* for ``STICKY_SECONDS`` after a write in the same context (the request,
+  or the Celery task), see ``pin_primary()``;
+* for requests carrying the ``COOKIE_NAME`` cookie, which
+  ``ReplicaStickinessMiddleware`` sets on responses to requests that wrote,
+  so the same browser session reads its own writes on its next requests.
+
+Without replicas configured every query goes to ``default``.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# time.monotonic() until which reads in this context use the primary.
+_primary_until = ContextVar("db_primary_until", default=0.0)
+# Whether this context wrote since the last reset().
+_wrote = ContextVar("db_wrote", default=False)
+
+
+def routing():
+    return settings.REPLICA_ROUTING
+
+
+def pin_primary(seconds=None):
+    """Read from the primary in the current context for ``seconds`` (default ``STICKY_SECONDS``)."""
+    if seconds is None:
+        seconds = routing()["STICKY_SECONDS"]
+    _primary_until.set(max(_primary_until.get(), time.monotonic() + seconds))
+
+
+def is_pinned():
+    return time.monotonic() < _primary_until.get()
+
+
+def wrote():
+    return _wrote.get()
+
+
+def reset():
+    """Start a new context (a request) with no pin and no write recorded."""
+    _primary_until.set(0.0)
+    _wrote.set(False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = routing()["REPLICAS"]
+        if not replicas or is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
@@ -0,0 +1,140 @@
+"""
+Liveness and readiness probes, answered by ``HealthCheckMiddleware`` before
+any other middleware runs (no session, CSRF, auth or host checks).
+
+* Liveness (``/health``) only proves the worker can answer requests; it never
+  touches the database or Redis, so a slow dependency does not get healthy
+  containers restarted.
+* Readiness (``/ready``) checks Postgres, its read replicas, Redis and the
+  Celery broker in parallel. Each check enforces ``HEALTH_CHECK["TIMEOUT"]``
+  itself (connect and statement timeouts, socket timeouts), so a hung
+  dependency does not pin a pool thread; a check that is still running when
+  the next round starts is waited on again rather than started twice. The result is kept in process memory for
+  ``HEALTH_CHECK["CACHE_SECONDS"]``, so frequent probes from many replicas
+  cost one round of checks per worker per period, and only one request runs
+  them while the others wait for its result.
+"""
+
+import copy
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+import redis
+from celery import current_app
+from django.conf import settings
+from django.db import connections
+from redis.backoff import NoBackoff
+from redis.exceptions import RedisError
+from redis.retry import Retry
+
+from apps.core.utils.redis_client import get_redis, mark_unavailable
+
+_lock = threading.Lock()
+_cached = None
+_cached_until = 0.0
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="readiness")
+# Futures of checks that outlived their round, by check name.
+_running = {}
+
+
+def ping_database(alias):
+    """``SELECT 1`` on a fresh connection bounded by the readiness timeout."""
+    timeout = settings.HEALTH_CHECK["TIMEOUT"]
+    settings_dict = copy.deepcopy(connections[alias].settings_dict)
+    if settings_dict["ENGINE"] == "django.db.backends.postgresql":
+        # libpq only takes whole seconds.
+        settings_dict["OPTIONS"]["connect_timeout"] = math.ceil(timeout)
+    connection = type(connections[alias])(settings_dict, alias)
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT set_config('statement_timeout', %s, false)", [f"{int(timeout * 1000)}ms"])
+            cursor.execute("SELECT 1")
+    finally:
+        connection.close()
+
+
+def check_database():
+    ping_database("default")
+
+
+def check_replicas():
+    for alias in settings.REPLICA_ROUTING["REPLICAS"]:
+        ping_database(alias)
+
+
+@lru_cache(maxsize=None)
+def probe_client(url, timeout):
+    # The shared client retries timeouts; a probe must fail within its timeout.
+    return redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout,
+                                retry=Retry(NoBackoff(), 0))
+
+
+def check_redis():
+    if get_redis() is None:
+        raise ConnectionError("Redis failed recently")
+    try:
+        probe_client(settings.REDIS_URL, settings.HEALTH_CHECK["TIMEOUT"]).ping()
+    except RedisError as e:
+        mark_unavailable(e)
+        raise
+
+
+def check_broker():
+    timeout = settings.HEALTH_CHECK["TIMEOUT"]
+    with current_app.connection_for_write(connect_timeout=timeout) as connection:
+        connection.ensure_connection(max_retries=0, timeout=timeout)
+
+
+CHECKS = {
+    "database": check_database,
+    "replicas": check_replicas,
+    "redis": check_redis,
+    "broker": check_broker,
+}
+
+
+def run_checks():
+    """
+    Run every check concurrently. Returns ``(ready, {name: "ok" | error})``;
+    a check still running after the timeout counts as failed, and is not
+    started again until it finishes.
+    """
+    futures = {}
+    for name, check in CHECKS.items():
+        previous = _running.get(name)
+        futures[name] = previous if previous is not None and not previous.done() else _executor.submit(check)
+    wait(futures.values(), timeout=settings.HEALTH_CHECK["TIMEOUT"])
+    _running.clear()
+    _running.update((name, future) for name, future in futures.items() if not future.done())
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            results[name] = "timeout"
+        elif future.exception() is not None:
+            results[name] = type(future.exception()).__name__
+        else:
+            results[name] = "ok"
+    return all(result == "ok" for result in results.values()), results
+
+
+def readiness():
+    """``run_checks()``, reusing a result younger than ``CACHE_SECONDS``."""
+    global _cached, _cached_until
+    if time.monotonic() < _cached_until:
+        return _cached
+    with _lock:
+        if time.monotonic() >= _cached_until:
+            _cached = run_checks()
+            _cached_until = time.monotonic() + settings.HEALTH_CHECK["CACHE_SECONDS"]
+        return _cached
+
+
+def reset():
+    """Forget the cached readiness result (used by tests)."""
+    global _cached, _cached_until
+    _cached, _cached_until = None, 0.0
+    _running.clear()
@@ -0,0 +1,130 @@
+"""
+Prometheus metrics for the API and the Celery workers.
+
+Gunicorn (and Celery prefork) run several processes, each with its own copy
+of these metrics. Set ``PROMETHEUS_MULTIPROC_DIR`` to an empty directory,
+shared by every process and created before they start: prometheus_client
+then keeps the values in memory-mapped files there, and ``metrics_view``
+merges them, so a scrape sees the totals of all workers rather than
+whichever worker answered it. Without the variable (runserver, tests) the
+metrics of the current process are served.
+
+Only counters and histograms are used, which need no cleanup when a worker
+exits.
+"""
+
+import hmac
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+TASK_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Label used for requests that did not resolve to a view (404s, probes), so
+# scanners cannot create a new time series per path.
+UNRESOLVED = "<unresolved>"
+# The method is sent by the client: anything else is counted as OTHER_METHOD,
+# for the same reason.
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"})
+OTHER_METHOD = "other"
+
+REQUEST_LATENCY = Histogram(
+    "django_http_request_duration_seconds", "Time spent handling a request, per view.",
+    ["view", "method", "status"], buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "django_http_response_size_bytes", "Response body size, per view (streamed responses excluded).",
+    ["view", "method"], buckets=SIZE_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "django_http_db_queries", "Database queries run by one request, per view.",
+    ["view", "method"], buckets=QUERY_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "django_http_db_duration_seconds", "Time one request spent in database queries, per view.",
+    ["view", "method"], buckets=LATENCY_BUCKETS,
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Celery task run time.",
+    ["task", "state"], buckets=TASK_BUCKETS,
+)
+TASK_FAILURES = Counter(
+    "celery_task_failures", "Celery task runs that raised.",
+    ["task", "exception"],
+)
+
+
+class QueryMetrics:
+    """``connection.execute_wrapper`` counting queries and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def track(self):
+        """Context manager installing the wrapper on every database alias."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED
+    return match.view_name or match._func_path
+
+
+def method_label(request):
+    return request.method if request.method in HTTP_METHODS else OTHER_METHOD
+
+
+def observe_request(request, response, duration, queries):
+    view, method = view_label(request), method_label(request)
+    REQUEST_LATENCY.labels(view, method, str(response.status_code)).observe(duration)
+    if not response.streaming:
+        RESPONSE_SIZE.labels(view, method).observe(len(response.content))
+    DB_QUERIES.labels(view, method).observe(queries.count)
+    DB_DURATION.labels(view, method).observe(queries.duration)
+
+
+def registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    collector_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collector_registry)
+    return collector_registry
+
+
+def can_scrape(request):
+    """``Authorization: Bearer <METRICS_TOKEN>``, or a logged-in staff user."""
+    token = settings.METRICS_TOKEN
+    auth = request.headers.get("Authorization", "")
+    if token and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].encode(), token.encode()):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    if not can_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,177 @@
+"""
+Redis-backed throttling shared by every worker process.
+
+* ``TokenBucketThrottle`` subclasses refill ``num`` tokens per period (DRF
+  rate syntax, e.g. ``"5/min"``) into a bucket holding at most ``num``; each
+  request takes one. Refill and take happen in one Lua script, so concurrent
+  workers can never overspend a bucket.
+* ``ConcurrencyLimitMixin`` caps how many requests a view handles at once
+  across all workers (a Redis sorted-set semaphore) and sheds the excess
+  with 429 before any database or broker work.
+
+Both fail open: if Redis is unavailable, requests are let through.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from redis.exceptions import RedisError
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from apps.core.utils.redis_client import get_redis, mark_unavailable
+
+# KEYS[1] bucket hash; ARGV: refill rate (tokens/s), capacity.
+# Returns {allowed, seconds until a token is available}. Uses the Redis clock
+# so workers with skewed clocks agree.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed, wait = 0, (1 - tokens) / rate
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed, wait = 1, 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+# KEYS[1] semaphore zset; ARGV: limit, slot token, slot lifetime (s).
+# Slots older than their lifetime belong to crashed workers and are reaped.
+ACQUIRE_SLOT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[2])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+"""
+
+
+def run_script(script, keys, args):
+    """Run a Lua script, returning None when Redis is unavailable."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return client.register_script(script)(keys=keys, args=args)
+    except RedisError as e:
+        mark_unavailable(e)
+        return None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class. Subclasses set ``scope`` (looked up in
+    ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``) and implement ``get_ident``.
+    """
+    scope = None
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        self.num_requests, self.duration = self.parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.wait_seconds = None
+
+    @staticmethod
+    def parse_rate(rate):
+        num, period = rate.split("/")
+        return int(num), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+    def get_ident(self, request):
+        raise NotImplementedError(".get_ident() must be overridden")
+
+    def allow_request(self, request, view):
+        ident = self.get_ident(request)
+        if ident is None:
+            return True
+        key = self.cache_format % {"scope": self.scope, "ident": ident}
+        result = run_script(TOKEN_BUCKET_SCRIPT, [key], [self.num_requests / self.duration, self.num_requests])
+        if result is None:
+            return True
+        allowed, wait = result
+        self.wait_seconds = float(wait)
+        return bool(allowed)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Keyed by client IP: ``REMOTE_ADDR``, or the X-Forwarded-For entry added by
+    the outermost of ``REST_FRAMEWORK["NUM_PROXIES"]`` trusted proxies.
+    """
+
+    def get_ident(self, request):
+        return BaseThrottle.get_ident(self, request)
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    """Keyed by the ``email`` field of the request body."""
+
+    def get_ident(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email:
+            return None
+        return hashlib.sha256(str(email).strip().lower().encode()).hexdigest()
+
+
+class ConcurrencyLimitMixin:
+    """
+    APIView mixin capping in-flight requests across all workers.
+
+    ``concurrency_limit_methods`` lists the HTTP methods subject to the cap,
+    whose size is ``CONCURRENCY_LIMITS[concurrency_scope]``. Slots are
+    released when the response is finalized, or reaped after
+    ``slot_lifetime`` seconds if a worker dies.
+    """
+    concurrency_scope = None
+    concurrency_limit_methods = ("POST",)
+    slot_lifetime = 30
+    retry_after = 1
+
+    def initial(self, request, *args, **kwargs):
+        self._concurrency_slot = None
+        if request.method in self.concurrency_limit_methods:
+            self._concurrency_slot = self.acquire_slot()
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(self, "_concurrency_slot", None):
+            self.release_slot(self._concurrency_slot)
+            self._concurrency_slot = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def semaphore_key(self):
+        return f"concurrency:{self.concurrency_scope}"
+
+    def acquire_slot(self):
+        token = uuid.uuid4().hex
+        limit = settings.CONCURRENCY_LIMITS[self.concurrency_scope]
+        acquired = run_script(ACQUIRE_SLOT_SCRIPT, [self.semaphore_key()], [limit, token, self.slot_lifetime])
+        if acquired is None:
+            return None
+        if not acquired:
+            raise Throttled(wait=self.retry_after)
+        return token
+
+    def release_slot(self, token):
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.zrem(self.semaphore_key(), token)
+        except RedisError as e:
+            mark_unavailable(e)
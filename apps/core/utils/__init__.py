@@ -1,13 +1,18 @@
+from .conditional import (aqueryset_validators, conditional_get, conditional_response, queryset_validators,
+                          row_validators, set_validators)
 from .date_utils import time_date_or_live
-from .format_response import format_response, generate_csv_response
+from .format_response import (build_envelope, error_response, format_response, generate_csv_response,
+                              stream_export_response, success_response)
 from .mailsender import send_support_email
 from .math import calculate_percentage
-from .pagination import CustomPagination, custom_array_pagination
+from .pagination import (CustomPagination, EstimatedCountPaginator, KeysetPagination, custom_array_pagination,
+                         estimated_count)
 
 from .security import match_secret_key
+from .sendfile import serve_file
 from .sorting import name_list_dict_sorting
 from .token_gen import generate_random_token
 
 from .generate_token import generate_unique_token
 
-__all__ = ["calculate_percentage", "format_response", "send_support_email", "generate_random_token", "CustomPagination", "match_secret_key", "name_list_dict_sorting", "generate_csv_response", "custom_array_pagination",  "time_date_or_live",  "generate_unique_token"]
+__all__ = ["calculate_percentage", "format_response", "send_support_email", "generate_random_token", "CustomPagination", "KeysetPagination", "EstimatedCountPaginator", "estimated_count", "match_secret_key", "name_list_dict_sorting", "generate_csv_response", "stream_export_response", "build_envelope", "success_response", "error_response", "custom_array_pagination",  "time_date_or_live",  "generate_unique_token", "conditional_get", "conditional_response", "queryset_validators", "aqueryset_validators", "row_validators", "set_validators", "serve_file"]
@@ -0,0 +1,112 @@
+"""
+Minimal asyncio HTTP/1.1 load driver used by the benchmark management commands.
+
+It has no dependencies beyond the standard library so benchmarks run anywhere
+the project runs. Each request opens its own connection (``Connection: close``),
+which keeps the measurement honest for servers without keep-alive.
+"""
+
+import asyncio
+import math
+import socket
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Result:
+    path: str
+    status: int
+    latency: float
+    size: int
+    headers: dict = field(default_factory=dict)
+    error: str = ""
+
+
+async def fetch(host, port, path, headers=None, client_delay=0.0, timeout=30.0, method="GET", body=b""):
+    """
+    Issue one request. ``client_delay`` holds the connection open for that
+    many seconds between the request line and the headers, simulating a slow
+    client (mobile network, overloaded proxy).
+    """
+    start = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(f"{method} {path} HTTP/1.1\r\n".encode("latin-1"))
+        if client_delay:
+            await writer.drain()
+            await asyncio.sleep(client_delay)
+        lines = [f"Host: {host}:{port}", "Connection: close", "Accept: application/json"]
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+        head, _, body = raw.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        response_headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        return Result(path, int(status_line.split()[1]), time.perf_counter() - start, len(body), response_headers)
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError) as e:
+        return Result(path, 0, time.perf_counter() - start, 0, error=repr(e))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run_load(host, port, paths, requests, concurrency, client_delay=0.0, headers=None, method="GET", body=b""):
+    """
+    Send ``requests`` requests cycling over ``paths`` with at most
+    ``concurrency`` in flight. Returns ``(results, elapsed_seconds)``.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with semaphore:
+            return await fetch(host, port, paths[index % len(paths)], headers, client_delay, method=method, body=body)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    return list(results), time.perf_counter() - start
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(results, elapsed):
+    """Latency percentiles (ms), throughput and error counts for a load run."""
+    ok = sorted(result.latency for result in results if 200 <= result.status < 400)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for result in results if not 200 <= result.status < 400),
+        "throughput_rps": round(len(ok) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ok, 50) * 1000, 2),
+        "p95_ms": round(percentile(ok, 95) * 1000, 2),
+        "p99_ms": round(percentile(ok, 99) * 1000, 2),
+        "max_ms": round(ok[-1] * 1000, 2) if ok else 0.0,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
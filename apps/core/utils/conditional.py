@@ -0,0 +1,117 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_validators(*querysets):
+    """
+    Build an ETag for the rows of the given querysets.
+
+    Each queryset costs a single aggregate query (``Max('updated_at')`` and a
+    row count), so the validator stays cheap however many rows there are. The
+    count catches deletions, which never move ``Max('updated_at')``.
+
+    No Last-Modified is derived: deleting or unpublishing rows shrinks the set
+    without moving ``Max('updated_at')``, so an ``If-Modified-Since`` check
+    would answer 304 for a list that changed. Clients revalidate with the ETag.
+
+    Returns:
+        tuple: ``(etag, None)``, the ``(etag, last_modified)`` pair ``conditional_get`` expects.
+    """
+    stats = [queryset.order_by().aggregate(**_VALIDATOR_AGGREGATES) for queryset in querysets]
+    return _combine_validators(querysets, stats)
+
+
+async def aqueryset_validators(*querysets):
+    """Async variant of ``queryset_validators`` for async views."""
+    stats = [await queryset.order_by().aaggregate(**_VALIDATOR_AGGREGATES) for queryset in querysets]
+    return _combine_validators(querysets, stats)
+
+
+_VALIDATOR_AGGREGATES = {'last_modified': Max('updated_at'), 'count': Count('pk')}
+
+
+def _combine_validators(querysets, stats):
+    parts = []
+    for queryset, row in zip(querysets, stats):
+        modified = row['last_modified']
+        parts.append(f"{queryset.model._meta.label}:{row['count']}:{modified.isoformat() if modified else ''}")
+    return make_etag("|".join(parts)), None
+
+
+def row_validators(model, rows):
+    """
+    Build an ETag from rows already fetched for the response, without a query
+    of its own.
+
+    ``rows`` are model instances or ``values()`` dicts that include the
+    primary key and ``updated_at``. Deleted, added or reordered rows change the
+    ETag as well as edited ones, so unlike ``queryset_validators`` no count is
+    needed; the cost is proportional to the rows served, not to the table.
+
+    Returns:
+        tuple: ``(etag, None)``, the ``(etag, last_modified)`` pair ``conditional_get`` expects.
+    """
+    pk = model._meta.pk.attname
+    parts = [model._meta.label]
+    for row in rows:
+        values = row if isinstance(row, dict) else row.__dict__
+        parts.append(f"{values[pk]}:{values['updated_at'].isoformat()}")
+    return make_etag("|".join(parts)), None
+
+
+def make_etag(value):
+    """Quoted strong ETag for an arbitrary string."""
+    return quote_etag(hashlib.md5(value.encode("utf-8")).hexdigest())
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    Return a 304/412 response when the request's If-None-Match/If-Modified-Since
+    headers match the current validators, otherwise None.
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag and Last-Modified headers to a response."""
+    response.headers.setdefault("ETag", etag)
+    if last_modified:
+        response.headers.setdefault("Last-Modified", http_date(timegm(last_modified.utctimetuple())))
+    return response
+
+
+def conditional_get(validators):
+    """
+    Decorator for ``APIView`` GET handlers adding conditional-GET support.
+
+    ``validators`` is called with the request and URL kwargs and must return
+    ``(etag, last_modified)``, usually via ``queryset_validators``. When the
+    client already holds the current representation the handler is skipped
+    entirely and an empty 304 is returned, so no serialization happens.
+
+    Example:
+        @conditional_get(lambda request: queryset_validators(MySkill.objects.all()))
+        def get(self, request): ...
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            etag, last_modified = validators(request, *args, **kwargs)
+            response = conditional_response(request, etag, last_modified)
+            if response is not None:
+                return response
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                set_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
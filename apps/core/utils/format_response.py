@@ -1,16 +1,35 @@
 import csv
 
-from django.conf import settings
-from django.http import HttpResponse
+import orjson
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.response import Response
 
 
+def build_envelope(results, message="Operation successful", success=True, **extra):
+    """
+    Build the standard response body: ``success``, ``message``, any extra keys
+    (e.g. pagination links) and finally ``results``.
+    """
+    envelope = {"success": success, "message": message}
+    envelope.update(extra)
+    envelope["results"] = results
+    return envelope
+
+
+def success_response(results, message="Operation successful", status=200, **extra):
+    return Response(build_envelope(results, message, True, **extra), status=status)
+
+
+def error_response(results, message="Operation failed", status=400, **extra):
+    return Response(build_envelope(results, message, False, **extra), status=status)
+
+
 def format_response(results, status_code=200):
-    return Response({
-        "status": "success",
-        "message": results.get('message', 'Operation successful'),
-        "results": results.get('results', {})
-    }, status=status_code)
+    return success_response(
+        results.get('results', {}),
+        results.get('message', 'Operation successful'),
+        status=status_code,
+    )
 
 
 
@@ -41,3 +60,70 @@ def generate_csv_response(data, filename):
             writer.writerow(row.values())
 
     return response
+
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+# Cells starting with these are run as formulas by spreadsheet applications.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class Echo:
+    """File-like object whose ``write`` returns the line, so ``csv.writer`` output can be yielded."""
+
+    def write(self, value):
+        return value
+
+
+def csv_safe(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(fields, rows, rows_per_chunk):
+    writer = csv.writer(Echo())
+    # The BOM and header go out before the query runs.
+    yield "\ufeff" + writer.writerow(fields)
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow([csv_safe(value) for value in row]))
+        if len(lines) >= rows_per_chunk:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def _ndjson_chunks(fields, rows, rows_per_chunk):
+    lines = []
+    for row in rows:
+        lines.append(orjson.dumps(dict(zip(fields, row)), default=str))
+        if len(lines) >= rows_per_chunk:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def stream_export_response(queryset, fields, filename, export_format="csv", chunk_size=2000):
+    """
+    Stream ``fields`` of every row in ``queryset`` as a CSV or NDJSON download.
+
+    Rows are read with ``values_list(...).iterator(chunk_size)``, a server-side
+    cursor on PostgreSQL, and written out ``chunk_size`` rows at a time, so
+    memory stays flat however large the table is. The query only runs once
+    the response starts streaming, after the CSV header has been sent.
+    """
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    chunks = _csv_chunks if export_format == "csv" else _ndjson_chunks
+    response = StreamingHttpResponse(chunks(fields, rows, chunk_size),
+                                     content_type=EXPORT_CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,128 @@
+"""
+Responsive image derivatives.
+
+Originals are resized to a few fixed widths and re-encoded in modern formats.
+Derivatives are content-addressed: their storage names are derived from the
+SHA-256 of the original, so regenerating for an unchanged file writes nothing
+and identical uploads share one set of files.
+"""
+
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# Pillow encoder name, file extension and MIME type per output format.
+FORMATS = {
+    "avif": ("AVIF", "avif", "image/avif"),
+    "webp": ("WEBP", "webp", "image/webp"),
+}
+
+
+def supported_formats(formats):
+    """The subset of ``formats`` this Pillow build can encode."""
+    return [fmt for fmt in formats if fmt in FORMATS and features.check(fmt)]
+
+
+def file_digest(file, chunk_size=1024 * 1024):
+    """
+    SHA-256 hex digest of a File or FieldFile, read in chunks. Works on
+    pending uploads too, and leaves the file open or closed as it found it.
+    """
+    was_closed = file.closed
+    digest = hashlib.sha256()
+    for chunk in file.chunks(chunk_size):
+        digest.update(chunk)
+    if was_closed:
+        file.close()
+    return digest.hexdigest()
+
+
+def variant_name(digest, label, fmt):
+    return f"variants/{digest[:2]}/{digest}/{label}.{FORMATS[fmt][1]}"
+
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def _encode(image, fmt, quality):
+    buffer = BytesIO()
+    image.save(buffer, format=FORMATS[fmt][0], quality=quality)
+    return buffer.getvalue()
+
+
+def render_variants(field_file, widths, formats, quality=80, digest=None, storage=None, thumbnail_size=None):
+    """
+    Write resized, re-encoded copies of ``field_file`` and return their names.
+
+    Requested widths larger than the original are capped at the original
+    width, so images are never upscaled. With ``thumbnail_size`` a square,
+    center-cropped WebP thumbnail is written as well.
+
+    Returns:
+        dict: ``{"digest": ..., "formats": {"webp": {"320": name, ...}, ...}, "thumbnail": name}``
+    """
+    storage = storage or default_storage
+    digest = digest or file_digest(field_file)
+    with field_file.open("rb") as fh, Image.open(fh) as original:
+        image = _prepare(original)
+    targets = sorted({min(width, image.width) for width in widths})
+
+    result = {"digest": digest, "formats": {}}
+    for fmt in supported_formats(formats):
+        names = {}
+        for width in targets:
+            name = variant_name(digest, width, fmt)
+            if not storage.exists(name):
+                height = max(1, round(image.height * width / image.width))
+                resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                name = storage.save(name, ContentFile(_encode(resized, fmt, quality)))
+            names[str(width)] = name
+        result["formats"][fmt] = names
+
+    if thumbnail_size:
+        name = variant_name(digest, f"thumb-{thumbnail_size}", "webp")
+        if not storage.exists(name):
+            thumbnail = ImageOps.fit(image, (thumbnail_size, thumbnail_size), Image.LANCZOS)
+            name = storage.save(name, ContentFile(_encode(thumbnail, "webp", quality)))
+        result["thumbnail"] = name
+    return result
+
+
+def variant_names(variants):
+    """Storage names of every file in a ``render_variants`` result."""
+    names = [name for names in (variants or {}).get("formats", {}).values() for name in names.values()]
+    if (variants or {}).get("thumbnail"):
+        names.append(variants["thumbnail"])
+    return names
+
+
+def variants_exist(variants, storage=None):
+    storage = storage or default_storage
+    return all(storage.exists(name) for name in variant_names(variants))
+
+
+def delete_variants(variants, storage=None):
+    """Delete the files of a ``render_variants`` result; missing files are skipped."""
+    storage = storage or default_storage
+    for name in variant_names(variants):
+        storage.delete(name)
+
+
+def build_srcset(variants, file_url):
+    """
+    Map stored variants to ``srcset`` strings per MIME type, ready for
+    ``<source type="image/webp" srcset="...">``. ``file_url`` turns a storage
+    name into a URL. Returns an empty dict when no variants exist yet.
+    """
+    srcset = {}
+    for fmt, names in (variants or {}).get("formats", {}).items():
+        if names and fmt in FORMATS:
+            candidates = sorted(names.items(), key=lambda item: int(item[0]))
+            srcset[FORMATS[fmt][2]] = ", ".join(f"{file_url(name)} {width}w" for width, name in candidates)
+    return srcset
@@ -1,27 +1,145 @@
-from django.core.mail import EmailMultiAlternatives
+import logging
+import queue
+import smtplib
+import time
+from contextlib import contextmanager
+
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils import timezone
 
-def send_support_email(name, email, subject="Contact Message", message="Thanks for reaching out!", from_email=None):
+logger = logging.getLogger(__name__)
+
+# Errors after which a pooled connection is reopened and the send retried once.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class PooledConnection:
+    """An email backend connection kept open across sends."""
+
+    def __init__(self):
+        self.backend = get_connection(fail_silently=False)
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+    def expired(self, max_idle, max_messages):
+        # Servers drop idle sessions and cap messages per session; retire the
+        # connection before they do.
+        return time.monotonic() - self.last_used > max_idle or self.sent >= max_messages
+
+    def send(self, messages):
+        """
+        Send over the open connection, one message at a time: when the server
+        drops the connection, only the message that failed is retried (once,
+        after reconnecting), so recipients already served get no duplicate.
+        """
+        count = 0
+        for message in messages:
+            try:
+                self.backend.open()
+                count += self.backend.send_messages([message])
+            except RECONNECT_ERRORS as e:
+                logger.warning(f"SMTP connection lost, reconnecting: {e}")
+                self.close()
+                self.backend.open()
+                count += self.backend.send_messages([message])
+            self.sent += 1
+            self.last_used = time.monotonic()
+        return count
+
+    def close(self):
+        try:
+            self.backend.close()
+        except Exception as e:
+            logger.warning(f"Error closing SMTP connection: {e}")
+
+
+class SMTPConnectionPool:
     """
-    Send an email to the provided email address when a new contact message is submitted.
+    Process-wide pool of open, authenticated email connections.
+
+    ``EmailMessage.send()`` opens and closes a connection (TCP, TLS and AUTH)
+    per message; the pool keeps up to ``EMAIL_POOL_SIZE`` connections open and
+    hands them out to senders in turn, so throughput is bounded by the server
+    rather than by handshakes. Connections idle longer than
+    ``EMAIL_POOL_MAX_IDLE`` seconds or past ``EMAIL_POOL_MAX_MESSAGES`` sends
+    are replaced.
+    """
+
+    def __init__(self):
+        self._idle = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; it returns to the pool unless the block raised."""
+        connection = self._checkout()
+        try:
+            yield connection
+        except BaseException:
+            connection.close()
+            raise
+        self._checkin(connection)
+
+    def send_messages(self, messages):
+        with self.connection() as connection:
+            return connection.send(messages)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _checkout(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return PooledConnection()
+            if not connection.expired(settings.EMAIL_POOL_MAX_IDLE, settings.EMAIL_POOL_MAX_MESSAGES):
+                return connection
+            connection.close()
+
+    def _checkin(self, connection):
+        if self._idle.qsize() < settings.EMAIL_POOL_SIZE:
+            self._idle.put(connection)
+        else:
+            connection.close()
+
+
+smtp_pool = SMTPConnectionPool()
+
+
+@receiver(setting_changed)
+def reset_smtp_pool(setting, **kwargs):
+    """Drop pooled connections opened with outdated email settings (tests)."""
+    if setting.startswith("EMAIL_"):
+        smtp_pool.close_all()
+
+
+def build_support_email(name, email, subject="Contact Message", message="Thanks for reaching out!", from_email=None,
+                        website_url=None, website_name=None, website_logo=None):
+    """
+    Build (without sending) the contact support email.
     """
     if from_email is None:
         from_email = settings.DEFAULT_FROM_EMAIL
 
     context = {
-        'website_url': settings.WEBSITE_URL,
-        'website_name': settings.WEBSITE_NAME,
+        'website_url': website_url,
+        'website_name': website_name,
         'name': name,
         'email': email,
         'from_email': from_email,
         'message': message,
         'year': timezone.now().year,
-        "logo": settings.WEBSITE_LOGO
+        "logo": website_logo
     }
 
-
     email_subject = f"📩 New Contact Message: {subject}"
     html_content = render_to_string("email/contact_support.html", context)
     text_content = render_to_string("email/contact_support.txt", context)
@@ -33,4 +151,15 @@ def send_support_email(name, email, subject="Contact Message", message="Thanks f
         to=[email],  # send to the email parameter
     )
     msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    return msg
+
+
+def send_support_email(name, email, subject="Contact Message", message="Thanks for reaching out!", from_email=None):
+    """
+    Send an email to the provided email address when a new contact message is submitted.
+    """
+    msg = build_support_email(
+        name, email, subject, message, from_email,
+        website_url=settings.WEBSITE_URL, website_name=settings.WEBSITE_NAME, website_logo=settings.WEBSITE_LOGO,
+    )
+    smtp_pool.send_messages([msg])
@@ -1,4 +1,17 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+
+from .format_response import success_response
 
 
 class CustomPagination(PageNumberPagination):
@@ -19,3 +32,147 @@ def custom_array_pagination(data, page, page_size):
     start = (page - 1) * page_size
     end = start + page_size
     return data[start:end], len(data)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering such as ``('-published_at', '-id')``.
+
+    The cursor encodes the ordering values of the last row on the page, and the
+    next page is fetched with a ``WHERE (a, b) < (x, y)`` style filter instead of
+    an OFFSET, so page 1000 costs the same as page 1 when a matching index exists.
+    Works with model instances as well as ``values()`` dicts.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(
+                self.page_size_query_param, self.page_size))
+            return max(1, min(page_size, self.max_page_size))
+        except (ValueError, TypeError):
+            return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.build_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the sliced queryset for the requested page. Split from
+        ``build_page`` so callers can evaluate it themselves (e.g. asynchronously).
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+        # Fetch one extra row to know whether there is a next page.
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def seek_filter(self, position):
+        """
+        Filter selecting rows strictly after ``position`` in the ordering:
+        ``a >= x AND (a > x OR (a = x AND b > y) OR ...)`` with the comparisons
+        flipped for descending fields. The leading ``a >= x`` is redundant
+        logically, but it is the range condition PostgreSQL seeks the index
+        with; the OR expansion alone is only applied as a filter while the
+        index is walked from its start.
+        """
+        first = self.ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            branch = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(self.ordering[:index], position):
+                branch &= Q(**{previous.lstrip('-'): value})
+            condition |= branch
+        return bound & condition
+
+    def get_position(self, row):
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        return [getattr(row, name) for name in names]
+
+    def encode_cursor(self, position):
+        # Keep full microsecond precision (DjangoJSONEncoder truncates to
+        # milliseconds), otherwise rows could be skipped or repeated.
+        payload = json.dumps(
+            position, default=lambda value: value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        ).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return success_response(data, next=self.get_next_link())
+
+
+def estimated_count(queryset):
+    """
+    PostgreSQL planner's row estimate for ``queryset``, from ``EXPLAIN``,
+    without running it. ``None`` on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables. When the planner
+    estimates more than ``threshold`` rows, the estimate is used as the count
+    instead of an exact ``COUNT(*)``, which scans the whole table. The page
+    count is approximate above the threshold; smaller results are counted
+    exactly. Pair with ``show_full_result_count = False`` on the ModelAdmin.
+    """
+    threshold = 100_000
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, "query"):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,47 @@
+"""
+Shared Redis client for features that need more than the cache API
+(Lua scripts, sorted sets, pipelines).
+
+Timeouts are short on purpose: callers treat Redis as an optimisation and
+fail open, so a slow or missing Redis must not stall requests. After a
+connection failure ``get_redis()`` returns None for ``REDIS_RETRY_INTERVAL``
+seconds instead of letting every request wait on a dead server.
+"""
+
+import logging
+import time
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_INTERVAL = 5.0
+
+_unavailable_until = 0.0
+
+
+@lru_cache(maxsize=None)
+def _client(url):
+    return redis.Redis.from_url(url, socket_connect_timeout=0.2, socket_timeout=0.5, health_check_interval=30)
+
+
+def get_redis():
+    """The process-wide client, or None while Redis is considered down."""
+    if time.monotonic() < _unavailable_until:
+        return None
+    return _client(settings.REDIS_URL)
+
+
+def mark_unavailable(error):
+    """Record a Redis failure so callers skip Redis for a short while."""
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + REDIS_RETRY_INTERVAL
+    logger.warning(f"Redis unavailable, retrying in {REDIS_RETRY_INTERVAL:.0f}s: {error}")
+
+
+def reset():
+    """Forget earlier failures (used by tests)."""
+    global _unavailable_until
+    _unavailable_until = 0.0
@@ -0,0 +1,150 @@
+"""
+File delivery with HTTP Range support and optional offload to the front proxy.
+
+``SENDFILE_BACKEND`` selects who transfers the bytes:
+
+* ``""`` (default): Django streams the file itself, honouring single-range
+  ``Range`` requests (206/416) and ``If-Range``.
+* ``"nginx"``: respond with ``X-Accel-Redirect: SENDFILE_URL_PREFIX + name``
+  and let nginx stream the file (including ranges). Needs an internal location
+  pointing at ``MEDIA_ROOT``, e.g.::
+
+      location /protected-media/ { internal; alias /app/media/; }
+
+* ``"apache"``: respond with ``X-Sendfile: <absolute path>`` (mod_xsendfile).
+
+In every mode Django still checks the conditional headers, so a 304 never
+reaches the proxy.
+"""
+
+import mimetypes
+import re
+from calendar import timegm
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import content_disposition_header, parse_http_date_safe
+
+from .conditional import conditional_response, set_validators
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Parse a ``Range`` header against a file of ``size`` bytes.
+
+    Returns ``(start, end)`` (inclusive) or None when the header should be
+    ignored and the whole file served: malformed values and multi-range
+    requests fall in that case, as RFC 9110 allows. Raises
+    ``RangeNotSatisfiable`` when the range lies outside the file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def requested_range(request, size, etag, last_modified=None):
+    """The byte range to serve for this request, honouring ``If-Range``."""
+    header = request.headers.get("Range")
+    if not header:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        if timestamp is None or parse_http_date_safe(if_range) != timestamp:
+            return None
+    return parse_range(header, size)
+
+
+def iter_range(fh, start, length, chunk_size=64 * 1024):
+    try:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def serve_file(request, field_file, etag, last_modified=None, filename=None, cache_control=None,
+               as_attachment=False):
+    """
+    Build the response delivering ``field_file`` (a stored FieldFile).
+
+    ``etag`` must be a strong, quoted ETag of the content; it is used for
+    conditional GETs and ``If-Range``.
+    """
+    filename = filename or field_file.name.rsplit("/", 1)[-1]
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        response = not_modified
+    elif settings.SENDFILE_BACKEND:
+        response = _proxy_response(field_file, settings.SENDFILE_BACKEND)
+    else:
+        response = _django_response(request, field_file, etag, last_modified)
+
+    if response.status_code in (200, 206):
+        response.headers["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+        response.headers["Accept-Ranges"] = "bytes"
+    if cache_control and response.status_code in (200, 206, 304):
+        response.headers["Cache-Control"] = cache_control
+    return set_validators(response, etag, last_modified)
+
+
+def _content_type(name):
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def _django_response(request, field_file, etag, last_modified):
+    storage, name = field_file.storage, field_file.name
+    size = storage.size(name)
+    try:
+        byte_range = requested_range(request, size, etag, last_modified)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        # FileResponse lets the WSGI server use sendfile() via wsgi.file_wrapper.
+        return FileResponse(storage.open(name, "rb"), content_type=_content_type(name))
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        iter_range(storage.open(name, "rb"), start, length), status=206, content_type=_content_type(name))
+    response.headers["Content-Length"] = str(length)
+    response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def _proxy_response(field_file, backend):
+    response = HttpResponse(content_type=_content_type(field_file.name))
+    if backend == "nginx":
+        response.headers["X-Accel-Redirect"] = settings.SENDFILE_URL_PREFIX + filepath_to_uri(field_file.name)
+    elif backend == "apache":
+        response.headers["X-Sendfile"] = field_file.path
+    else:
+        raise ValueError(f"Unknown SENDFILE_BACKEND: {backend!r}")
+    return response
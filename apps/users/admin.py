@@ -1,8 +1,56 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from apps.users.models import BlogPost, ContactMessage, MyAchievement, MyExperience, MyUser, MySkill, MyWork, Settings, Technology, SettingFiles
+from apps.users.models import BlogComment, BlogPost, ContactMessage, EmailOutbox, MyAchievement, MyExperience, MyUser, MySkill, MyWork, RequestAuditLog, Settings, Technology, SettingFiles
 from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
 from django.utils.html import format_html
+from apps.core.utils import EstimatedCountPaginator
+from apps.users.exports import export_response
+from apps.users.images import request_variants, thumbnail_url
+
+
+class ThumbnailAdminMixin:
+    """
+    Changelist previews from the pre-sized thumbnail variant (see
+    apps.users.images) instead of the full-size upload. Images without a
+    thumbnail yet get it generated in the background and show a placeholder.
+    """
+    def render_thumbnail(self, obj, field_name, empty="-"):
+        if not getattr(obj, field_name):
+            return empty
+        url = thumbnail_url(obj, field_name)
+        if url is None:
+            request_variants(obj, field_name)
+            return "Processing…"
+        return format_html(
+            '<img src="{}" width="50" height="50" loading="lazy" decoding="async" style="object-fit:cover;" />',
+            url
+        )
+
+
+class LargeTableAdminMixin:
+    """
+    Changelist for tables with millions of rows: no exact ``COUNT(*)`` per
+    page load, see ``EstimatedCountPaginator``.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ExportActionsMixin:
+    """Admin actions streaming the selected rows as CSV or NDJSON (see ``apps.users.exports``)."""
+    export_table = None
+    actions = ("export_csv", "export_ndjson")
+
+    @admin.action(description="Export selected as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(self.export_table, "csv", queryset)
+
+    @admin.action(description="Export selected as NDJSON")
+    def export_ndjson(self, request, queryset):
+        return export_response(self.export_table, "ndjson", queryset)
+
+
 @admin.register(MyUser)
 class UserAdmin(BaseUserAdmin):
     # Fields to display in the list view
@@ -34,7 +82,7 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ('email', 'name')
 
 @admin.register(MySkill)
-class MySkillAdmin(admin.ModelAdmin):
+class MySkillAdmin(ThumbnailAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'percentage', 'order', 'display_icon')  # remove 'user' if not present
     list_editable = ('percentage', 'order')
     list_filter = ('percentage', 'order')
@@ -53,9 +101,7 @@ class MySkillAdmin(admin.ModelAdmin):
 
     def display_icon(self, obj):
         """Show icon preview in admin list view."""
-        if obj.icon:
-            return format_html('<img src="{}" width="50" height="50" />', obj.icon.url)
-        return "No icon"
+        return self.render_thumbnail(obj, 'icon', empty="No icon")
     display_icon.short_description = 'Icon Preview'
 
     def save_model(self, request, obj, form, change):
@@ -82,7 +128,7 @@ class MyWorkTechnologyInline(admin.TabularInline):
     extra = 1
 
 @admin.register(MyWork)
-class MyWorkAdmin(admin.ModelAdmin):
+class MyWorkAdmin(ThumbnailAdminMixin, admin.ModelAdmin):
     list_display = ("title", "subtext", "order", "thumbnail")
     list_filter = ("technologies",)
     search_fields = ("title", "subtext", "description")
@@ -92,25 +138,18 @@ class MyWorkAdmin(admin.ModelAdmin):
 
     # show small image thumbnail
     def thumbnail(self, obj):
-        if obj.image:
-            return format_html('<img src="{}" width="50" height="50" style="object-fit:cover;" />', obj.image.url)
-        return "-"
+        return self.render_thumbnail(obj, "image")
     thumbnail.short_description = "Image"
 
 @admin.register(MyAchievement)
-class MyAchievementAdmin(admin.ModelAdmin):
+class MyAchievementAdmin(ThumbnailAdminMixin, admin.ModelAdmin):
     list_display = ("title", "date", "order", "thumbnail")
     search_fields = ("title", "description")
     ordering = ("order",)
 
     # Show small thumbnail for the achievement image
     def thumbnail(self, obj):
-        if obj.image:
-            return format_html(
-                '<img src="{}" width="50" height="50" style="object-fit:cover;" />',
-                obj.image.url
-            )
-        return "-"
+        return self.render_thumbnail(obj, "image")
     thumbnail.short_description = "Image"
 @admin.register(MyExperience)
 class MyExperienceAdmin(admin.ModelAdmin):
@@ -127,7 +166,8 @@ class MyExperienceAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(LargeTableAdminMixin, ExportActionsMixin, admin.ModelAdmin):
+    export_table = "contact-messages"
     list_display = ("name", "email", "short_message", "created_at")
     search_fields = ("name", "email", "message")
     ordering = ("-created_at",)
@@ -141,23 +181,72 @@ class ContactMessageAdmin(admin.ModelAdmin):
     short_message.short_description = "Message Preview"
 
 
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("recipient", "status", "attempts", "available_at", "sent_at")
+    list_filter = ("status",)
+    ordering = ("-created_at",)
+    readonly_fields = ("contact_message", "payload", "attempts", "sent_at", "last_error", "created_at", "updated_at")
+    actions = ("retry_now",)
+
+    def recipient(self, obj):
+        return obj.payload.get("email")
+    recipient.short_description = "Recipient"
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=EmailOutbox.Status.SENT).update(
+            status=EmailOutbox.Status.PENDING, available_at=timezone.now())
+
+
+@admin.register(RequestAuditLog)
+class RequestAuditLogAdmin(LargeTableAdminMixin, ExportActionsMixin, admin.ModelAdmin):
+    export_table = "request-audit-logs"
+    list_display = ("requested_at", "method", "path", "status_code", "duration_ms", "ip_address", "user")
+    list_filter = ("method", "status_code")
+    search_fields = ("path", "ip_address")
+    ordering = ("-requested_at",)
+    list_select_related = ("user",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BlogComment)
+class BlogCommentAdmin(LargeTableAdminMixin, ExportActionsMixin, admin.ModelAdmin):
+    export_table = "blog-comments"
+    list_display = ("name", "email", "post", "created_at")
+    search_fields = ("name", "email", "body")
+    ordering = ("-created_at",)
+    list_select_related = ("post",)
+    raw_id_fields = ("post",)
+
+    def get_readonly_fields(self, request, obj=None):
+        # Moving a comment would leave both posts' comment_count wrong.
+        return ("post",) if obj is not None else ()
+
+
 @admin.register(BlogPost)
-class BlogPostAdmin(admin.ModelAdmin):
-    list_display = ("title", "status", "published_at", "thumbnail")
+class BlogPostAdmin(ThumbnailAdminMixin, admin.ModelAdmin):
+    list_display = ("title", "status", "published_at", "comment_count", "view_count", "thumbnail")
     list_filter = ("status", "published_at")
     search_fields = ("title", "excerpt", "content")
     prepopulated_fields = {"slug": ("title",)}  # Auto-fill slug from title
     ordering = ("-published_at",)
     readonly_fields = ("published_at",)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Use the GIN-indexed full-text search instead of icontains scans."""
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.search(search_term), False
+
     # Show small thumbnail in list view
     def thumbnail(self, obj):
-        if obj.image:
-            return format_html(
-                '<img src="{}" width="50" height="50" style="object-fit:cover;" />',
-                obj.image.url
-            )
-        return "-"
+        return self.render_thumbnail(obj, "image")
     thumbnail.short_description = "Image"
 
 
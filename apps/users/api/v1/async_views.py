@@ -0,0 +1,154 @@
+"""
+Async read views for the public v1 API.
+
+Served instead of the DRF views in ``views.py`` when ``ASGI_READ_VIEWS`` is
+enabled and the project runs under an ASGI server (``DJANGO_SERVER_MODE=asgi``,
+see ``compose/local/django/start``). They use the async ORM and cache APIs, so
+a slow client waits on the event loop instead of holding a worker thread.
+Responses are byte-identical to the sync views.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+
+from apps.core.renderers import FastJSONRenderer
+from apps.core.utils import (aqueryset_validators, build_envelope, conditional_response, row_validators,
+                             set_validators)
+from apps.users import counters
+from apps.users.api.v1.fast_serializers import (BlogPostValuesSerializer, MyAchievementValuesSerializer,
+                                                MyExperienceValuesSerializer, MySkillValuesSerializer,
+                                                SettingsFilesValuesSerializer)
+from apps.users.api.v1.serializers import BlogPostSerializer, MyWorkSerializer
+from apps.users.api.v1.views import BlogPostPagination
+from apps.users.models import BlogPost, MyAchievement, MyExperience, MySkill, MyWork, SettingFiles, Technology
+from apps.users.registry import site_settings
+from apps.users.snapshot import aget_portfolio_snapshot
+
+renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200):
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+def not_found(message="Not found."):
+    # Same body as drf_standardized_errors produces for the sync views.
+    return json_response({"success": False, "error": str(message)}, status=404)
+
+
+async def respond(request, validators, build_results, **extra):
+    """
+    Shared conditional-GET flow: return 304 when the client's validators
+    match, otherwise build the results and wrap them in the standard envelope.
+    """
+    etag, last_modified = validators
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    response = json_response(build_envelope(await build_results(), **extra))
+    return set_validators(response, etag, last_modified)
+
+
+async def serialize_values(serializer_class, request, queryset=None):
+    serializer = serializer_class(context={'request': request})
+    return serializer.to_representation([row async for row in serializer.get_queryset(queryset)])
+
+
+@require_safe
+async def skills(request):
+    return await respond(
+        request, await aqueryset_validators(MySkill.objects.all()),
+        lambda: serialize_values(MySkillValuesSerializer, request))
+
+
+@require_safe
+async def achievements(request):
+    return await respond(
+        request, await aqueryset_validators(MyAchievement.objects.all()),
+        lambda: serialize_values(MyAchievementValuesSerializer, request))
+
+
+@require_safe
+async def experiences(request):
+    return await respond(
+        request, await aqueryset_validators(MyExperience.objects.all()),
+        lambda: serialize_values(MyExperienceValuesSerializer, request))
+
+
+@require_safe
+async def settings_files(request):
+    return await respond(
+        request, await aqueryset_validators(SettingFiles.objects.all()),
+        lambda: serialize_values(SettingsFilesValuesSerializer, request))
+
+
+@require_safe
+async def settings(request):
+    return await respond(request, await site_settings.avalidators(), site_settings.aas_list)
+
+
+@require_safe
+async def works(request, id=None):
+    # Technologies are prefetched, so serialization itself touches no database.
+    queryset = MyWork.objects.prefetch_related('technologies')
+    context = {'request': request}
+    if id:
+        validators = await aqueryset_validators(
+            MyWork.objects.filter(id=id), Technology.objects.filter(works__id=id))
+        work = await queryset.filter(id=id).afirst()
+        if work is None:
+            return not_found()
+
+        async def build_work():
+            return MyWorkSerializer(work, context=context).data
+        return await respond(request, validators, build_work)
+
+    async def build_works():
+        return MyWorkSerializer([work async for work in queryset], many=True, context=context).data
+    return await respond(
+        request, await aqueryset_validators(MyWork.objects.all(), Technology.objects.all()), build_works)
+
+
+@require_safe
+async def blog(request, slug=None):
+    if slug:
+        post = await BlogPost.objects.filter(slug=slug).afirst()
+        if post is None:
+            return not_found()
+
+        async def build_post():
+            return BlogPostSerializer(post, context={'request': request}).data
+        # Counted before the conditional check: a 304 is a view too.
+        if post.status == BlogPost.Status.PUBLISHED:
+            await sync_to_async(counters.record_view, thread_sensitive=False)(post)
+        return await respond(request, row_validators(BlogPost, [post]), build_post)
+
+    serializer = BlogPostValuesSerializer(context={'request': request})
+    paginator = BlogPostPagination()
+    try:
+        page_queryset = paginator.get_page_queryset(
+            serializer.get_queryset(BlogPost.objects.published(), extra=('updated_at',)), Request(request))
+    except (NotFound, ValidationError) as e:
+        # No DRF exception handler here: answer like the sync view does.
+        return not_found(e.detail if isinstance(e, NotFound) else "Not found.")
+    rows = [row async for row in page_queryset]
+    etag, last_modified = row_validators(BlogPost, rows)
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    page = paginator.build_page(rows)
+    response = json_response(build_envelope(serializer.to_representation(page), next=paginator.get_next_link()))
+    return set_validators(response, etag, last_modified)
+
+
+@require_safe
+async def portfolio(request):
+    snapshot = await aget_portfolio_snapshot()
+
+    async def results():
+        return snapshot["results"]
+    return await respond(request, (snapshot["etag"], snapshot["last_modified"]), results)
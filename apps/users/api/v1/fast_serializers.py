@@ -0,0 +1,160 @@
+"""
+Read-only serializers for the public list endpoints.
+
+They fetch only the declared columns with ``values()`` and convert them with
+plain functions instead of instantiating models and running DRF field
+machinery per row. The output is identical to the matching ModelSerializer in
+``serializers.py``; ``apps.users.tests.FastSerializerTests`` guards that.
+"""
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+
+from apps.core.utils.images import build_srcset
+from apps.users.api.v1.serializers import settings_file_download_url
+
+from apps.users.models import BlogComment, BlogPost, MyAchievement, MyExperience, MySkill, SettingFiles
+
+
+class ValuesSerializer:
+    """
+    Base class. Subclasses declare the model, the output ``fields`` in order,
+    and which of them are files, dates or datetimes needing conversion.
+    ``srcset_fields`` maps an output field to the ``*_variants`` column it is
+    rendered from (see ``serializers.SrcsetField``).
+    """
+    model = None
+    fields = ()
+    file_fields = ()
+    date_fields = ()
+    datetime_fields = ()
+    srcset_fields = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+
+    def get_queryset(self, queryset=None, extra=()):
+        """``extra`` columns are fetched too (e.g. for validators); the output ignores them."""
+        if queryset is None:
+            queryset = self.model.objects.all()
+        return queryset.values(*(self.srcset_fields.get(name, name) for name in self.fields), *extra)
+
+    def serialize(self, queryset=None):
+        return self.to_representation(self.get_queryset(queryset))
+
+    def to_representation(self, rows):
+        converters = self.get_converters()
+        return [
+            {name: convert(row[column]) if convert else row[column] for name, column, convert in converters}
+            for row in rows
+        ]
+
+    def get_converters(self):
+        file_url = self.file_url_builder() if self.file_fields else None
+        converters = []
+        for name in self.fields:
+            if name in self.srcset_fields:
+                converters.append((name, self.srcset_fields[name], self.srcset_builder(file_url)))
+            elif name in self.file_fields:
+                converters.append((name, name, file_url))
+            elif name in self.datetime_fields:
+                converters.append((name, name, self.datetime_to_representation))
+            elif name in self.date_fields:
+                converters.append((name, name, self.date_to_representation))
+            else:
+                converters.append((name, name, None))
+        return converters
+
+    @staticmethod
+    def srcset_builder(file_url):
+        return lambda variants: build_srcset(variants, file_url)
+
+    def file_url_builder(self):
+        """
+        Return a function mapping a stored file name to the URL DRF's FileField
+        would produce. For local storage the absolute media prefix is resolved
+        once per response instead of once per row.
+        """
+        request = self.context.get('request')
+        if isinstance(default_storage, FileSystemStorage):
+            prefix = default_storage.base_url
+            if request is not None:
+                prefix = request.build_absolute_uri(prefix)
+
+            def file_url(name):
+                if not name:
+                    return None
+                return prefix + filepath_to_uri(name).lstrip('/')
+            return file_url
+
+        def file_url(name):
+            if not name:
+                return None
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return file_url
+
+    @staticmethod
+    def date_to_representation(value):
+        return value.isoformat() if value is not None else None
+
+    @staticmethod
+    def datetime_to_representation(value):
+        # Mirrors rest_framework.fields.DateTimeField.to_representation.
+        if value is None:
+            return None
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+
+class MySkillValuesSerializer(ValuesSerializer):
+    model = MySkill
+    fields = ('id', 'name', 'icon', 'icon_srcset', 'percentage', 'order')
+    file_fields = ('icon',)
+    srcset_fields = {'icon_srcset': 'icon_variants'}
+
+
+class MyAchievementValuesSerializer(ValuesSerializer):
+    model = MyAchievement
+    fields = ('id', 'title', 'organization', 'image', 'image_srcset', 'date', 'order')
+    file_fields = ('image',)
+    srcset_fields = {'image_srcset': 'image_variants'}
+    date_fields = ('date',)
+
+
+class MyExperienceValuesSerializer(ValuesSerializer):
+    model = MyExperience
+    fields = ('id', 'title', 'company', 'description', 'start_date', 'end_date', 'order')
+    date_fields = ('start_date', 'end_date')
+
+
+class BlogPostValuesSerializer(ValuesSerializer):
+    model = BlogPost
+    fields = ('id', 'title', 'slug', 'excerpt', 'content', 'image', 'image_srcset', 'published_at', 'comment_count')
+    file_fields = ('image',)
+    srcset_fields = {'image_srcset': 'image_variants'}
+    datetime_fields = ('published_at',)
+
+
+class BlogCommentValuesSerializer(ValuesSerializer):
+    model = BlogComment
+    fields = ('id', 'name', 'body', 'created_at')
+    datetime_fields = ('created_at',)
+
+
+class SettingsFilesValuesSerializer(ValuesSerializer):
+    model = SettingFiles
+    fields = ('id', 'name', 'file', 'checksum')
+    file_fields = ('file',)
+
+    def to_representation(self, rows):
+        request = self.context.get('request')
+        data = super().to_representation(rows)
+        for item in data:
+            item['download_url'] = settings_file_download_url(item['id'], item['checksum'], request)
+        return data
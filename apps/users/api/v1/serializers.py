@@ -5,7 +5,9 @@ from datetime import timedelta
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
 from django.db import transaction
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
@@ -13,28 +15,53 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
 from apps.core.utils import (send_support_email, generate_unique_token)
+from apps.core.utils.images import build_srcset
 
 from apps.users.models import MyAchievement, MySkill, MyUser, SettingFiles, Settings, BlogComment, BlogPost, ContactMessage, FrequentlyAskedQuestion, MyExperience, MyWork, Technology, Testimonial
 
+# Checksum characters in versioned file download URLs.
+DOWNLOAD_VERSION_LENGTH = 16
+
+
+class SrcsetField(serializers.ReadOnlyField):
+    """
+    Renders an ``*_variants`` JSONField as ``{mime type: srcset string}``, with
+    URLs built the same way as the original image's URL.
+    """
+    def to_representation(self, value):
+        request = self.context.get('request')
+
+        def file_url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return build_srcset(value, file_url)
+
+
 class MySkillSerializer(serializers.ModelSerializer):
+    icon_srcset = SrcsetField(source='icon_variants')
+
     class Meta:
         model = MySkill
-        fields = ( 'id', 'name', 'icon', 'percentage', 'order')
+        fields = ( 'id', 'name', 'icon', 'icon_srcset', 'percentage', 'order')
         read_only = ('id',)
 
 
 class MyAchievementSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField(source='image_variants')
+
     class Meta:
         model = MyAchievement
-        fields = ( 'id', 'title', 'organization', 'image', 'date', 'order')
+        fields = ( 'id', 'title', 'organization', 'image', 'image_srcset', 'date', 'order')
         read_only = ('id',)
 
 
 class MyWorkSerializer(serializers.ModelSerializer):
     technologies = serializers.SerializerMethodField()
+    image_srcset = SrcsetField(source='image_variants')
+
     class Meta:
         model = MyWork
-        fields = ( 'id', 'title', 'subtext', 'description', 'image', 'technologies', 'github_link', 'live_link', 'order')
+        fields = ( 'id', 'title', 'subtext', 'description', 'image', 'image_srcset', 'technologies', 'github_link', 'live_link', 'order')
         read_only = ('id',)
     def get_technologies(self, obj):
         return [t.name for t in obj.technologies.all()]
@@ -52,13 +79,42 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         read_only = ('id',)
 
 class BlogPostSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField(source='image_variants')
+
     class Meta:
         model = BlogPost
-        fields = ( 'id', 'title', 'slug', 'excerpt', 'content', 'image', 'published_at')
+        fields = ( 'id', 'title', 'slug', 'excerpt', 'content', 'image', 'image_srcset', 'published_at', 'comment_count')
         read_only = ('id',)
 
+
+class BlogCommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlogComment
+        fields = ('id', 'name', 'email', 'body', 'created_at')
+        read_only_fields = ('id', 'created_at')
+        # Commenters' addresses are never published.
+        extra_kwargs = {'email': {'write_only': True}}
+
+
+def settings_file_download_url(id, checksum, request=None):
+    """
+    Download URL for a setting file. With a checksum the URL is versioned and
+    served as immutable; rows without one get the unversioned URL.
+    """
+    if checksum:
+        url = reverse('settings-file-download-version', kwargs={'id': id, 'version': checksum[:DOWNLOAD_VERSION_LENGTH]})
+    else:
+        url = reverse('settings-file-download', kwargs={'id': id})
+    return request.build_absolute_uri(url) if request is not None else url
+
+
 class SettingsFilesSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
     class Meta:
         model = SettingFiles
-        fields = ( 'id', 'name', 'file')
+        fields = ( 'id', 'name', 'file', 'checksum', 'download_url')
         read_only = ('id',)
+
+    def get_download_url(self, obj):
+        return settings_file_download_url(obj.id, obj.checksum, self.context.get('request'))
@@ -1,17 +1,32 @@
+from django.conf import settings
 from django.urls import path
 
+from apps.users.api.v1 import async_views
 from apps.users.api.v1.views import *
 
 
+def read_view(view_class, async_view):
+    """Use the async implementation of a read endpoint when serving under ASGI."""
+    return async_view if settings.ASGI_READ_VIEWS else view_class.as_view()
+
+
 urlpatterns = [
-    path('skills/', MySkillView.as_view()),
-    path('works/', MyWorkView.as_view()),
-    path('works/<int:id>/', MyWorkView.as_view()),
-    path('achievements/', MyAchievementsView.as_view()),
-    path('experiences/', MyExperienceView.as_view()),
+    path('skills/', read_view(MySkillView, async_views.skills)),
+    path('works/', read_view(MyWorkView, async_views.works)),
+    path('works/<int:id>/', read_view(MyWorkView, async_views.works)),
+    path('achievements/', read_view(MyAchievementsView, async_views.achievements)),
+    path('experiences/', read_view(MyExperienceView, async_views.experiences)),
     path('contact/', ContactMessageView.as_view()),
-    path('blog/', BlogPostView.as_view()),
-    path('blog/<slug:slug>/', BlogPostView.as_view()),
-    path('settings/', SettingsView.as_view()),
-    path('settings/files/', SettingsFilesView.as_view()),
+    path('blog/', read_view(BlogPostView, async_views.blog)),
+    path('blog/search/', BlogSearchView.as_view()),
+    path('blog/most-read/', MostReadBlogPostsView.as_view()),
+    path('blog/<slug:slug>/', read_view(BlogPostView, async_views.blog)),
+    path('blog/<slug:slug>/comments/', BlogCommentView.as_view()),
+    path('settings/', read_view(SettingsView, async_views.settings)),
+    path('settings/files/', read_view(SettingsFilesView, async_views.settings_files)),
+    path('settings/files/<int:id>/download/', SettingFileDownloadView.as_view(), name='settings-file-download'),
+    path('settings/files/<int:id>/download/<str:version>/', SettingFileDownloadView.as_view(),
+         name='settings-file-download-version'),
+    path('exports/<slug:table>/<slug:export_format>/', ExportView.as_view(), name='export'),
+    path('portfolio/', read_view(PortfolioSnapshotView, async_views.portfolio)),
 ]
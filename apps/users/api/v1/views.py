@@ -11,29 +11,39 @@ from drf_spectacular.utils import extend_schema
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import DatabaseError, transaction
+from django.http import Http404, HttpResponseRedirect
+from django.db import transaction
 from django.db.models.query import QuerySet
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.http import quote_etag, urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.translation import gettext as _
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.permissions import IsAdminUser
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.parsers import FormParser, MultiPartParser
-from rest_framework.response import Response
 
+from apps.core.throttling import ConcurrencyLimitMixin, EmailTokenBucketThrottle, IPTokenBucketThrottle
+from apps.core.utils import (CustomPagination, KeysetPagination, conditional_get, conditional_response, error_response,
+                             generate_random_token, queryset_validators, row_validators, send_support_email,
+                             serve_file, set_validators, success_response)
 
-from apps.core.utils import (format_response, generate_random_token,
-                             send_support_email)
-
-from apps.users.api.v1.serializers import (ContactMessageSerializer, MySkillSerializer,
-                                           MyWorkSerializer, MyAchievementSerializer,
-                                           MyExperienceSerializer, BlogPostSerializer, SettingsFilesSerializer)
-from apps.users.models import MyExperience, MySkill, MyWork, MyAchievement, BlogPost, SettingFiles, Settings
-from apps.users.tasks import send_support_email_task
+from apps.users.api.v1.serializers import (BlogCommentSerializer, ContactMessageSerializer, MyWorkSerializer,
+                                           BlogPostSerializer, DOWNLOAD_VERSION_LENGTH, settings_file_download_url)
+from apps.users.api.v1.fast_serializers import (BlogCommentValuesSerializer, BlogPostValuesSerializer, MyAchievementValuesSerializer,
+                                                MyExperienceValuesSerializer, MySkillValuesSerializer,
+                                                SettingsFilesValuesSerializer)
+from apps.users.models import MyExperience, MySkill, MyWork, MyAchievement, BlogComment, BlogPost, SettingFiles, Technology
+from apps.users import counters
+from apps.users.exports import EXPORTS, EXPORT_FORMATS, export_response
+from apps.users.registry import site_settings
+from apps.users.outbox import enqueue_contact_email
+from apps.users.snapshot import get_portfolio_snapshot
 
 # Create your views here.
 
@@ -41,63 +51,56 @@ logger = logging.getLogger(__name__)
 
 
 class MySkillView(APIView):
+    @conditional_get(lambda request: queryset_validators(MySkill.objects.all()))
     def get(self, request):
-        skills = MySkill.objects.all()
-        serializer = MySkillSerializer(skills, many=True, context={'request': request})
-        data = {
-            "success": True,
-            "message": "Operation successful",
-            "results": serializer.data
-        }
-        return Response(data, status=200)
+        serializer = MySkillValuesSerializer(context={'request': request})
+        return success_response(serializer.serialize())
+
+
+def work_validators(request, id=None):
+    works = MyWork.objects.filter(id=id) if id else MyWork.objects.all()
+    technologies = Technology.objects.filter(works__id=id) if id else Technology.objects.all()
+    return queryset_validators(works, technologies)
 
 
 class MyWorkView(APIView):
+    @conditional_get(work_validators)
     def get(self, request, id=None):
 
         if id:
-            work = get_object_or_404(MyWork, id=id)
+            work = get_object_or_404(MyWork.objects.prefetch_related('technologies'), id=id)
             serializer = MyWorkSerializer(work, context={'request': request})
-            data = {
-                "success": True,
-                "message": "Operation successful",
-                "results": serializer.data
-            }
-            return Response(data, status=200)
-
-        works = MyWork.objects.all()
+            return success_response(serializer.data)
+
+        works = MyWork.objects.prefetch_related('technologies')
         serializer = MyWorkSerializer(works, many=True, context={'request': request})
-        data = {
-            "success": True,
-            "message": "Operation successful",
-            "results": serializer.data
-        }
-        return Response(data, status=200)
+        return success_response(serializer.data)
 
 class MyAchievementsView(APIView):
+    @conditional_get(lambda request: queryset_validators(MyAchievement.objects.all()))
     def get(self, request):
-        achievements = MyAchievement.objects.all()
-        serializer = MyAchievementSerializer(achievements, many=True, context={'request': request})
-        data = {
-            "success": True,
-            "message": "Operation successful",
-            "results": serializer.data
-        }
-        return Response(data, status=200)
+        serializer = MyAchievementValuesSerializer(context={'request': request})
+        return success_response(serializer.serialize())
 
 class MyExperienceView(APIView):
+    @conditional_get(lambda request: queryset_validators(MyExperience.objects.all()))
     def get(self, request):
-        experiences = MyExperience.objects.all()
-        serializer = MyExperienceSerializer(experiences, many=True, context={'request': request})
-        data = {
-            "success": True,
-            "message": "Operation successful",
-            "results": serializer.data
-        }
-        return Response(data, status=200)
+        serializer = MyExperienceValuesSerializer(context={'request': request})
+        return success_response(serializer.serialize())
+
+
+class ContactIPThrottle(IPTokenBucketThrottle):
+    scope = "contact_ip"
+
 
+class ContactEmailThrottle(EmailTokenBucketThrottle):
+    scope = "contact_email"
 
-class ContactMessageView(APIView):
+
+class ContactMessageView(ConcurrencyLimitMixin, APIView):
+    # Shed bursts before they reach Postgres, the broker or the SMTP quota.
+    throttle_classes = [ContactIPThrottle, ContactEmailThrottle]
+    concurrency_scope = "contact"
 
     @extend_schema(
         request=ContactMessageSerializer,  # <--- explicitly set request body
@@ -106,69 +109,213 @@ class ContactMessageView(APIView):
     def post(self, request):
         serializer = ContactMessageSerializer(data=request.data)
         if serializer.is_valid():
-            name = serializer.validated_data['name'] # type: ignore
-            email = serializer.validated_data['email'] # type: ignore
-            message = serializer.validated_data['message'] # type: ignore
-            try:
-                send_support_email_task.delay(name, email, message)
-            except Exception as e:
-                print(e)
-                logger.error(e)
-            serializer.save()
-            return Response({
-                "success": True,
-                "message": "Operation successful",
-                "results": serializer.data
-            }, status=200)
-        return Response({
-            "success": False,
-            "message": "Operation failed",
-            "results": serializer.errors
-        }, status=400)
+            # The email is queued in the same transaction as the message and
+            # relayed by Celery beat, so the broker is never on this path.
+            with transaction.atomic():
+                enqueue_contact_email(serializer.save())
+            return success_response(serializer.data)
+        return error_response(serializer.errors)
+
+class BlogPostPagination(KeysetPagination):
+    # Backed by the BlogPost (status, published_at, id) index.
+    ordering = ('-published_at', '-id')
+
+
+def blog_post_validators(request, post):
+    # From the post already loaded for the response: no query of its own.
+    return row_validators(BlogPost, [post])
+
 
 class BlogPostView(APIView):
     def get(self, request, slug=None):
         if slug:
             post = get_object_or_404(BlogPost, slug=slug)
-            serializer = BlogPostSerializer(post, context={'request': request})
-            data = {
-                "success": True,
-                "message": "Operation successful",
-                "results": serializer.data
-            }
-            return Response(data, status=200)
-        posts = BlogPost.objects.filter(status=BlogPost.Status.PUBLISHED).order_by('-published_at')
-        serializer = BlogPostSerializer(posts, many=True, context={'request': request})
-        data = {
-            "success": True,
-            "message": "Operation successful",
-            "results": serializer.data
-        }
-        return Response(data, status=200)
+            # Counted before the conditional check: a 304 is a view too.
+            if post.status == BlogPost.Status.PUBLISHED:
+                counters.record_view(post)
+            return self.get_post(request, post=post)
+        return self.get_list(request)
+
+    @conditional_get(blog_post_validators)
+    def get_post(self, request, post):
+        serializer = BlogPostSerializer(post, context={'request': request})
+        return success_response(serializer.data)
+
+    def get_list(self, request):
+        serializer = BlogPostValuesSerializer(context={'request': request})
+        posts = serializer.get_queryset(BlogPost.objects.published(), extra=('updated_at',))
+        paginator = BlogPostPagination()
+        rows = list(paginator.get_page_queryset(posts, request))
+        # The ETag covers the page being served (and the extra row telling
+        # whether there is a next one), not every published post.
+        etag, last_modified = row_validators(BlogPost, rows)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        page = paginator.build_page(rows)
+        response = paginator.get_paginated_response(serializer.to_representation(page))
+        return set_validators(response, etag, last_modified)
+
+
+class MostReadBlogPostsView(APIView):
+    """
+    The most viewed published posts, served from the Redis ranking kept by
+    ``apps.users.counters`` without touching the database.
+    """
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        return success_response(counters.most_read(max(1, min(limit, self.max_limit))))
+
+
+class BlogCommentPagination(KeysetPagination):
+    # Oldest first; backed by the BlogComment (post, created_at, id) index.
+    ordering = ('created_at', 'id')
+
+
+class CommentIPThrottle(IPTokenBucketThrottle):
+    scope = "comment_ip"
+
+
+class BlogCommentView(APIView):
+    """
+    Comments of a published post, keyset-paginated oldest first, and posting
+    a new one. Posting also bumps the post's ``comment_count`` (see
+    ``apps.users.signals``).
+    """
+
+    def get_throttles(self):
+        # Reading is free; only posting is rate limited.
+        return [CommentIPThrottle()] if self.request.method == 'POST' else []
+
+    def get_post(self, slug):
+        return get_object_or_404(BlogPost.objects.published().only('id'), slug=slug)
+
+    def get(self, request, slug):
+        post = self.get_post(slug)
+        serializer = BlogCommentValuesSerializer(context={'request': request})
+        comments = serializer.get_queryset(BlogComment.objects.filter(post=post))
+        paginator = BlogCommentPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        return paginator.get_paginated_response(serializer.to_representation(page))
+
+    @extend_schema(
+        request=BlogCommentSerializer,
+        responses={201: BlogCommentSerializer}
+    )
+    def post(self, request, slug):
+        post = self.get_post(slug)
+        serializer = BlogCommentSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(post=post)
+            return success_response(serializer.data, status=201)
+        return error_response(serializer.errors)
+
+
+class BlogSearchView(APIView):
+    """
+    Full-text search over published posts, ranked by relevance with title
+    matches weighted above excerpt and content matches.
+    """
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return error_response([], "Query parameter 'q' is required")
+        posts = BlogPost.objects.published().search(query)
+        paginator = CustomPagination()
+        page = paginator.paginate_queryset(posts, request, view=self)
+        serializer = BlogPostSerializer(page, many=True, context={'request': request})
+        return success_response(
+            serializer.data,
+            count=paginator.page.paginator.count,
+            next=paginator.get_next_link(),
+            previous=paginator.get_previous_link(),
+        )
 
 
 class SettingsView(APIView):
+    @conditional_get(site_settings.validators)
     def get(self, request):
-        settings = Settings.objects.all()
-        data = []
-        for setting in settings:
-            data.append({
-                "key": setting.key,
-                "value": setting.value
-            })
-        return Response({
-            "success": True,
-            "message": "Operation successful",
-            "results": data
-            }, status=200)
+        return success_response(site_settings.as_list())
 
 class SettingsFilesView(APIView):
 
+    @conditional_get(lambda request: queryset_validators(SettingFiles.objects.all()))
     def get(self, request):
-        settings = SettingFiles.objects.all()
-        data = SettingsFilesSerializer(settings, many=True, context={'request': request}).data
-        return Response({
-            "success": True,
-            "message": "Operation successful",
-            "results": data
-            }, status=200)
+        data = SettingsFilesValuesSerializer(context={'request': request}).serialize()
+        return success_response(data)
+
+
+class SettingFileDownloadView(View):
+    """
+    Download a setting file (CV, PDFs) with Range and conditional GET support.
+
+    The versioned URL listed by ``settings/files/`` embeds the file's checksum,
+    so it never changes content and is cached for a year; a stale version
+    redirects to the current one. The unversioned URL always serves the
+    current file and must be revalidated. A plain Django view: DRF's content
+    negotiation would reject ``Accept`` headers asking for the file's type.
+    """
+    immutable = "public, max-age=31536000, immutable"
+    revalidate = "public, max-age=0, must-revalidate"
+
+    def get(self, request, id, version=None):
+        setting_file = get_object_or_404(SettingFiles, id=id)
+        if not setting_file.file:
+            raise Http404
+        checksum = setting_file.ensure_checksum()
+        if version is not None and version != checksum[:DOWNLOAD_VERSION_LENGTH]:
+            response = HttpResponseRedirect(settings_file_download_url(setting_file.id, checksum))
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return serve_file(
+            request, setting_file.file,
+            etag=quote_etag(checksum),
+            last_modified=setting_file.updated_at,
+            cache_control=self.immutable if version else self.revalidate,
+        )
+
+
+class PortfolioSnapshotView(APIView):
+    """
+    Every portfolio section (skills, works, achievements, experiences,
+    settings and setting files) in one response, served from the shared cache.
+    """
+
+    def get(self, request):
+        snapshot = get_portfolio_snapshot()
+        not_modified = conditional_response(request, snapshot["etag"], snapshot["last_modified"])
+        if not_modified is not None:
+            return not_modified
+        response = success_response(snapshot["results"])
+        return set_validators(response, snapshot["etag"], snapshot["last_modified"])
+
+
+class DownloadNegotiation(BaseContentNegotiation):
+    """Accept any ``Accept`` header: the response is a file, not a rendered API body."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class ExportView(APIView):
+    """
+    Admin-only download of a whole table (see ``apps.users.exports.EXPORTS``)
+    as CSV or NDJSON, streamed from a server-side cursor.
+    """
+    permission_classes = (IsAdminUser,)
+    content_negotiation_class = DownloadNegotiation
+
+    def get(self, request, table, export_format):
+        if table not in EXPORTS or export_format not in EXPORT_FORMATS:
+            raise NotFound()
+        return export_response(table, export_format)
@@ -0,0 +1,144 @@
+"""
+Non-blocking request audit pipeline.
+
+``RequestAuditMiddleware`` only samples the request and appends a small tuple
+to a bounded in-process queue; a daemon thread per process drains the queue
+and writes ``RequestAuditLog`` rows with ``bulk_create`` in large batches.
+When the queue is full (the database is slow or down) new events are dropped
+and counted instead of slowing requests down.
+
+Configured by the ``REQUEST_AUDIT`` setting, read on every request so it can
+be changed with ``override_settings``:
+
+* ``ENABLED``: turn the pipeline on.
+* ``SAMPLE_RATE``: fraction of requests recorded (0.0 to 1.0).
+* ``MAX_QUEUE``: events buffered before new ones are dropped.
+* ``BATCH_SIZE``: rows per ``bulk_create``.
+* ``FLUSH_INTERVAL``: seconds between flushes when the queue is quiet.
+* ``EXCLUDE_PATHS``: path prefixes never recorded (probes, static files).
+"""
+
+import atexit
+import ipaddress
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.users.models import RequestAuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def audit_settings():
+    return settings.REQUEST_AUDIT
+
+
+def clean_ip(value):
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+
+class AuditLogBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.dropped = 0
+
+    def record(self, event):
+        """
+        Queue one event: ``(requested_at timestamp, user_id, ip, user_agent,
+        path, method, status_code, duration_ms)``. Never blocks.
+        """
+        config = audit_settings()
+        self.ensure_flusher()
+        if self._queue.qsize() >= config["MAX_QUEUE"]:
+            self.dropped += 1
+            return False
+        self._queue.put_nowait(event)
+        if self._queue.qsize() >= config["BATCH_SIZE"]:
+            self._wakeup.set()
+        return True
+
+    def ensure_flusher(self):
+        """Start the flusher thread (again, after a fork) if it is not running."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's queue and thread are not ours.
+                self._reset()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-audit-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(audit_settings()["FLUSH_INTERVAL"])
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write request audit logs: {e}")
+            finally:
+                close_old_connections()
+
+    def drain(self, limit):
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def flush(self):
+        """Write every queued event now. Returns the number of rows written."""
+        batch_size = audit_settings()["BATCH_SIZE"]
+        written = 0
+        while events := self.drain(batch_size):
+            RequestAuditLog.objects.bulk_create([self.to_row(event) for event in events], batch_size=batch_size)
+            written += len(events)
+        if self.dropped:
+            logger.warning(f"Dropped {self.dropped} request audit events (queue full)")
+            self.dropped = 0
+        return written
+
+    @staticmethod
+    def to_row(event):
+        requested_at, user_id, ip, user_agent, path, method, status_code, duration_ms = event
+        return RequestAuditLog(
+            requested_at=datetime.fromtimestamp(requested_at, tz=dt_timezone.utc),
+            user_id=user_id,
+            ip_address=clean_ip(ip) if ip else None,
+            user_agent=user_agent[:255],
+            path=path[:2048],
+            method=method[:10],
+            status_code=status_code,
+            duration_ms=duration_ms,
+        )
+
+
+audit_buffer = AuditLogBuffer()
+
+
+@atexit.register
+def flush_on_exit():
+    if audit_buffer._pid == os.getpid() and not audit_buffer._queue.empty():
+        try:
+            audit_buffer.flush()
+        except Exception as e:
+            logger.error(f"Failed to write request audit logs on exit: {e}")
@@ -0,0 +1,171 @@
+"""
+Blog post view counters, buffered in Redis and written to the database in bulk.
+
+A detail request never writes to the database: ``record_view()`` sends one
+pipelined round trip that
+
+* adds 1 to the post's pending delta (``HINCRBY`` on ``PENDING_KEY``),
+* adds 1 to its score in the "most read" sorted set (``ZINCRBY`` on
+  ``RANKING_KEY``),
+* stores the title and slug the ranking is rendered with (``POSTS_KEY``).
+
+``flush()`` runs from Celery beat. It renames the pending hash so new views
+go to a fresh one, then adds every delta to ``BlogPost.view_count`` with a
+single ``UPDATE ... SET view_count = view_count + CASE id ... END`` per
+batch. If the update fails the renamed hash is kept and retried by the next
+run, so views are counted at least once.
+
+Like the throttles, counting fails open: without Redis views are not
+counted, and ``most_read()`` returns nothing.
+"""
+
+import uuid
+
+import orjson
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from redis.exceptions import RedisError
+
+from apps.core.utils.redis_client import get_redis, mark_unavailable
+from apps.users.models import BlogPost
+
+PENDING_KEY = "blog:views:pending"
+FLUSHING_KEY = "blog:views:flushing"
+FLUSH_LOCK_KEY = "blog:views:flush-lock"
+RANKING_KEY = "blog:views:ranking"
+# Set once the ranking has been loaded from the database; missing after
+# Redis lost its data.
+RANKING_LOADED_KEY = "blog:views:ranking-loaded"
+POSTS_KEY = "blog:views:posts"
+FLUSH_BATCH_SIZE = 1000
+FLUSH_LOCK_SECONDS = 300
+# Posts loaded into the ranking when it has to be rebuilt from the database.
+RANKING_REBUILD_SIZE = 1000
+
+# KEYS[1] lock; ARGV[1] the holder's token. Deletes the lock only if it is
+# still ours: after a run outlives FLUSH_LOCK_SECONDS the lock may belong to
+# the next run.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def post_summary(post):
+    return orjson.dumps({"id": post.id, "title": post.title, "slug": post.slug})
+
+
+def record_view(post):
+    """Count one view of a published ``post``. Never raises."""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.hincrby(PENDING_KEY, post.id, 1)
+        pipe.zincrby(RANKING_KEY, 1, post.id)
+        pipe.hset(POSTS_KEY, post.id, post_summary(post))
+        pipe.execute()
+    except RedisError as e:
+        mark_unavailable(e)
+        return False
+    return True
+
+
+def most_read(limit=10):
+    """
+    The ``limit`` most viewed posts as ``{"id", "title", "slug", "views"}``
+    dicts, read from Redis only.
+    """
+    client = get_redis()
+    if client is None:
+        return []
+    try:
+        ranked = client.zrevrange(RANKING_KEY, 0, limit - 1, withscores=True)
+        summaries = client.hmget(POSTS_KEY, [post_id for post_id, score in ranked]) if ranked else []
+    except RedisError as e:
+        mark_unavailable(e)
+        return []
+    return [
+        {**orjson.loads(summary), "views": int(score)}
+        for (post_id, score), summary in zip(ranked, summaries) if summary is not None
+    ]
+
+
+def forget(post_id):
+    """Drop a deleted or unpublished post from the ranking."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(RANKING_KEY, post_id)
+        pipe.hdel(POSTS_KEY, post_id)
+        pipe.execute()
+    except RedisError as e:
+        mark_unavailable(e)
+
+
+def remember(post):
+    """Refresh the title and slug shown for a ranked post."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        if client.zscore(RANKING_KEY, post.id) is not None:
+            client.hset(POSTS_KEY, post.id, post_summary(post))
+    except RedisError as e:
+        mark_unavailable(e)
+
+
+def apply_deltas(deltas, batch_size=FLUSH_BATCH_SIZE):
+    """Add ``{post_id: views}`` to ``BlogPost.view_count``, one UPDATE per batch."""
+    items = sorted(deltas.items())
+    with transaction.atomic():
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            increment = Case(*(When(pk=post_id, then=Value(views)) for post_id, views in batch), default=Value(0))
+            BlogPost.objects.filter(pk__in=[post_id for post_id, views in batch]).update(
+                view_count=F("view_count") + increment)
+
+
+def rebuild_ranking(client):
+    """Load the most viewed posts' totals into the ranking (first run, or after Redis lost its data)."""
+    posts = BlogPost.objects.published().filter(view_count__gt=0).order_by("-view_count")[:RANKING_REBUILD_SIZE]
+    posts = list(posts.only("id", "title", "slug", "view_count"))
+    pipe = client.pipeline(transaction=False)
+    if posts:
+        # GT: never lower a score Redis counted past the database total.
+        pipe.zadd(RANKING_KEY, {post.id: post.view_count for post in posts}, gt=True)
+        pipe.hset(POSTS_KEY, mapping={post.id: post_summary(post) for post in posts})
+    pipe.set(RANKING_LOADED_KEY, 1)
+    pipe.execute()
+
+
+def flush():
+    """
+    Write the pending deltas to the database. Returns the number of views
+    written. Runs from Celery beat; overlapping runs skip while one holds
+    the lock.
+    """
+    client = get_redis()
+    if client is None:
+        return 0
+    token = uuid.uuid4().hex
+    if not client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_SECONDS):
+        return 0
+    try:
+        # A leftover FLUSHING_KEY is a batch an earlier run failed to write.
+        if not client.exists(FLUSHING_KEY) and client.exists(PENDING_KEY):
+            client.rename(PENDING_KEY, FLUSHING_KEY)
+        deltas = {int(post_id): int(views) for post_id, views in client.hgetall(FLUSHING_KEY).items()}
+        if deltas:
+            apply_deltas(deltas)
+            client.delete(FLUSHING_KEY)
+        if not client.exists(RANKING_LOADED_KEY):
+            rebuild_ranking(client)
+        return sum(deltas.values())
+    finally:
+        client.register_script(RELEASE_LOCK_SCRIPT)(keys=[FLUSH_LOCK_KEY], args=[token])
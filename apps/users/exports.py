@@ -0,0 +1,30 @@
+"""
+Tables that can be downloaded in full, as CSV or NDJSON, from their admin
+change list or from ``exports/<table>/<format>/``. Rows are streamed from a
+server-side cursor (see ``stream_export_response``), so exporting a large
+table does not load it into memory.
+"""
+
+from django.utils import timezone
+
+from apps.core.utils import stream_export_response
+from apps.core.utils.format_response import EXPORT_CONTENT_TYPES
+from apps.users.models import BlogComment, ContactMessage, RequestAuditLog
+
+EXPORTS = {
+    "contact-messages": (ContactMessage, ("id", "name", "email", "message", "created_at")),
+    "blog-comments": (BlogComment, ("id", "post_id", "post__slug", "name", "email", "body", "created_at")),
+    "request-audit-logs": (RequestAuditLog, ("id", "requested_at", "method", "path", "status_code", "duration_ms",
+                                             "ip_address", "user_id", "user_agent")),
+}
+
+EXPORT_FORMATS = tuple(EXPORT_CONTENT_TYPES)
+
+
+def export_response(table, export_format="csv", queryset=None):
+    """Stream ``queryset`` (default: the whole table) in primary key order."""
+    model, fields = EXPORTS[table]
+    if queryset is None:
+        queryset = model.objects.all()
+    filename = f"{table}-{timezone.now():%Y%m%d-%H%M%S}"
+    return stream_export_response(queryset.order_by("pk"), fields, filename, export_format)
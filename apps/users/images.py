@@ -0,0 +1,130 @@
+"""
+Which image fields get responsive variants, and how they are (re)generated.
+
+Each field listed in ``IMAGE_FIELDS`` has a sibling ``<field>_variants``
+JSONField holding the names of its derivatives (see
+``apps.core.utils.images.render_variants``) plus the name of the original they
+were built from. ``apps.users.signals`` enqueues ``generate_image_variants_task``
+when an upload changes; the task calls ``generate_variants`` below.
+
+Variant files are shared by every row whose original has the same bytes, so
+``discard_variants`` only deletes them once no row refers to their digest.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from apps.core.utils.images import delete_variants, file_digest, render_variants, variants_exist
+from apps.users.models import BlogPost, MyAchievement, MySkill, MyWork, Testimonial
+from apps.users.snapshot import SNAPSHOT_MODELS, invalidate_portfolio_snapshot
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = {
+    MySkill: ("icon",),
+    MyWork: ("image",),
+    MyAchievement: ("image",),
+    BlogPost: ("image",),
+    Testimonial: ("client_photo",),
+}
+
+
+def variants_field(field_name):
+    return f"{field_name}_variants"
+
+
+def thumbnail_url(instance, field_name):
+    """URL of the small admin thumbnail, or None until it has been generated."""
+    name = (getattr(instance, variants_field(field_name)) or {}).get("thumbnail")
+    return default_storage.url(name) if name else None
+
+
+def request_variants(instance, field_name, retry_after=300):
+    """
+    Enqueue generation for an image that has no variants yet, e.g. one
+    uploaded before the pipeline existed. A short-lived cache marker keeps
+    repeated page views from enqueueing the same work again.
+    """
+    from apps.users.tasks import generate_image_variants_task
+
+    label = type(instance)._meta.label
+    try:
+        if cache.add(f"image_variants:pending:{label}:{instance.pk}:{field_name}", True, timeout=retry_after):
+            generate_image_variants_task.delay(label, instance.pk, field_name)
+    except Exception as e:
+        logger.error(f"Failed to enqueue image variants for {label} {instance.pk}: {e}")
+
+
+def is_current(instance, field_name):
+    """True when the stored variants were built from the current upload."""
+    variants = getattr(instance, variants_field(field_name)) or {}
+    return variants.get("source") == getattr(instance, field_name).name
+
+
+def variants_in_use(digest):
+    """True when any image field of any row still refers to variants of ``digest``."""
+    return any(
+        model.objects.using(DEFAULT_DB_ALIAS).filter(**{f"{variants_field(field_name)}__digest": digest}).exists()
+        for model, field_names in IMAGE_FIELDS.items() for field_name in field_names
+    )
+
+
+def discard_variants(variants):
+    """Delete the files of replaced or orphaned variants no other row shares."""
+    digest = (variants or {}).get("digest")
+    if not digest or variants_in_use(digest):
+        return
+    try:
+        delete_variants(variants)
+    except Exception as e:
+        logger.error(f"Failed to delete image variants {digest}: {e}")
+
+
+def generate_variants(instance, field_name):
+    """
+    Build the variants for one image field and store their names on the row.
+
+    Idempotent: when the original's content hash matches the stored variants
+    and all their files exist, nothing is rendered or written. Returns True
+    when the row was updated, False when nothing changed or the row's image
+    changed in the meantime.
+    """
+    field_file = getattr(instance, field_name)
+    model = type(instance)
+    current = getattr(instance, variants_field(field_name)) or {}
+    if not field_file:
+        variants = {}
+    else:
+        digest = file_digest(field_file)
+        if current.get("digest") == digest and current.get("thumbnail") and variants_exist(current):
+            variants = {**current, "source": field_file.name}
+        else:
+            variants = render_variants(
+                field_file, settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_FORMATS,
+                quality=settings.IMAGE_VARIANT_QUALITY, digest=digest,
+                thumbnail_size=settings.IMAGE_THUMBNAIL_SIZE)
+            variants["source"] = field_file.name
+    if variants == current:
+        return False
+
+    # update() skips the post_save signal that enqueued this work; bump
+    # updated_at so conditional GETs see the new srcset. Matching on the
+    # original's name discards the result when the image was replaced while
+    # rendering; the task enqueued for the new upload stores its own.
+    updated = model.objects.filter(pk=instance.pk, **{field_name: field_file.name}).update(
+        **{variants_field(field_name): variants, "updated_at": timezone.now()})
+    if not updated:
+        discard_variants(variants)
+        return False
+    setattr(instance, variants_field(field_name), variants)
+    if current.get("digest") != variants.get("digest"):
+        discard_variants(current)
+    if model in SNAPSHOT_MODELS:
+        invalidate_portfolio_snapshot()
+    logger.info(f"Generated image variants for {model._meta.label} {instance.pk} {field_name}")
+    return True
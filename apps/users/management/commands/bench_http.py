@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import django
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.db import connection
+from django.test.testcases import QuietWSGIRequestHandler
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.metrics import QueryMetrics
+from apps.core.utils.benchmark import run_load, summarize
+from apps.users import seeding
+from apps.users.api.v1 import urls as v1_urls
+from apps.users.api.v1.serializers import DOWNLOAD_VERSION_LENGTH
+from apps.users.models import BlogPost, MyUser, MyWork, SettingFiles
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def route_requests(fixtures):
+    """
+    The request sent to each v1 route, keyed by its URL pattern, as
+    ``(method, path, body, headers)``. Every pattern in
+    ``apps/users/api/v1/urls.py`` must have an entry.
+    """
+    contact = orjson.dumps({"name": "Load Test", "email": "load@example.com", "message": "Benchmark message"})
+    download = f"settings/files/{fixtures['file_id']}/download/"
+    admin = {"Authorization": f"Bearer {fixtures['admin_token']}"}
+    return {
+        "skills/": ("GET", "skills/", b"", {}),
+        "works/": ("GET", "works/", b"", {}),
+        "works/<int:id>/": ("GET", f"works/{fixtures['work_id']}/", b"", {}),
+        "achievements/": ("GET", "achievements/", b"", {}),
+        "experiences/": ("GET", "experiences/", b"", {}),
+        "contact/": ("POST", "contact/", contact, {"Content-Type": "application/json"}),
+        "blog/": ("GET", "blog/", b"", {}),
+        "blog/search/": ("GET", f"blog/search/?q={fixtures['search_term']}", b"", {}),
+        "blog/most-read/": ("GET", "blog/most-read/", b"", {}),
+        "blog/<slug:slug>/": ("GET", f"blog/{fixtures['slug']}/", b"", {}),
+        "blog/<slug:slug>/comments/": ("GET", f"blog/{fixtures['slug']}/comments/", b"", {}),
+        "settings/": ("GET", "settings/", b"", {}),
+        "settings/files/": ("GET", "settings/files/", b"", {}),
+        "settings/files/<int:id>/download/": ("GET", download, b"", {}),
+        "settings/files/<int:id>/download/<str:version>/": ("GET", download + fixtures["file_version"] + "/", b"", {}),
+        "exports/<slug:table>/<slug:export_format>/": ("GET", "exports/contact-messages/csv/", b"", admin),
+        "portfolio/": ("GET", "portfolio/", b"", {}),
+    }
+
+
+class QueryCountingHandler(WSGIHandler):
+    """WSGI handler recording the number of queries each request ran."""
+
+    def __init__(self):
+        super().__init__()
+        self.query_counts = []
+
+    def __call__(self, environ, start_response):
+        queries = QueryMetrics()
+        with queries.track():
+            response = super().__call__(environ, start_response)
+        self.query_counts.append(queries.count)
+        return response
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test every v1 route at several data scales against a throwaway test database "
+        "(SQLite or PostgreSQL per DATABASES), served in-process by Django's threaded WSGI server. "
+        "Uses a local memory cache; no Redis or Celery needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", nargs="+", type=int, default=[10, 1000, 100000],
+                            help="Blog posts and works seeded per run")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0, help="Faker seed for the generated data")
+        parser.add_argument("--routes", nargs="+", help="Only these URL patterns, e.g. 'blog/' 'works/<int:id>/'")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        report = {
+            "options": {k: options[k] for k in ("scales", "requests", "concurrency", "seed")},
+            "environment": {
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "scales": {},
+        }
+        media_root = tempfile.mkdtemp(prefix="bench-media-")
+        if connection.vendor == "sqlite" and not connection.settings_dict["TEST"].get("NAME"):
+            # The default in-memory test database cannot be shared with the server threads.
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(media_root, "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=LOCMEM_CACHES, MEDIA_ROOT=media_root,
+                                   ALLOWED_HOSTS=["127.0.0.1"], REQUEST_AUDIT={**settings.REQUEST_AUDIT, "ENABLED": False},
+                                   # Only the test copy of the primary exists.
+                                   REPLICA_ROUTING={**settings.REPLICA_ROUTING, "REPLICAS": []}):
+                for scale in options["scales"]:
+                    report["scales"][str(scale)] = self.bench_scale(scale, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+
+    def bench_scale(self, scale, options):
+        seeding.clear()
+        start = time.perf_counter()
+        rows = seeding.seed(scale, seed=options["seed"])
+        seed_seconds = time.perf_counter() - start
+        cache.clear()
+        self.stdout.write(f"scale {scale}: seeded {sum(rows.values())} rows in {seed_seconds:.1f}s")
+
+        targets = route_requests(self.fixtures())
+        patterns = [str(pattern.pattern) for pattern in v1_urls.urlpatterns]
+        missing = set(patterns) - set(targets)
+        if missing:
+            raise CommandError(f"No benchmark request defined for: {', '.join(sorted(missing))}")
+        if options["routes"]:
+            patterns = [pattern for pattern in patterns if pattern in options["routes"]]
+
+        prefix = f"/api/{settings.API_VERSION.strip('/')}/"
+        handler = QueryCountingHandler()
+        server = ThreadedWSGIServer(("127.0.0.1", 0), QuietWSGIRequestHandler, allow_reuse_address=False)
+        server.set_app(handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        port = server.server_address[1]
+        routes = {}
+        try:
+            for pattern in patterns:
+                method, path, body, headers = targets[pattern]
+                # Warm up caches and connections before measuring.
+                asyncio.run(run_load("127.0.0.1", port, [prefix + path], 2, 1, headers=headers, method=method, body=body))
+                handler.query_counts = []
+                results, elapsed = asyncio.run(run_load(
+                    "127.0.0.1", port, [prefix + path], options["requests"], options["concurrency"],
+                    headers=headers, method=method, body=body))
+                summary = summarize(results, elapsed)
+                counts = handler.query_counts
+                summary["queries_per_request"] = round(sum(counts) / len(counts), 2) if counts else 0.0
+                summary["statuses"] = sorted({result.status for result in results})
+                routes[pattern] = summary
+                self.stdout.write(f"  {method} {pattern}: {json.dumps(summary)}")
+        finally:
+            server.shutdown()
+            server.server_close()
+        return {"rows": rows, "seed_seconds": round(seed_seconds, 2), "routes": routes, "peak_rss_mb": peak_rss_mb()}
+
+    def fixtures(self):
+        """Concrete ids, slugs and versions for the parameterized routes."""
+        admin = MyUser.objects.filter(email="bench-admin@example.com").first()
+        if admin is None:
+            admin = MyUser.objects.create_superuser("bench-admin@example.com", None)
+        setting_file = SettingFiles(name="cv", file=ContentFile(b"%PDF-1.4\n" + b"0" * 200 * 1024, name="cv.pdf"))
+        setting_file.save()
+        post = BlogPost.objects.published().order_by("-published_at", "-id").first()
+        if post is None:
+            raise CommandError("The seeded data has no published blog post; use a larger scale")
+        return {
+            "work_id": MyWork.objects.order_by("id").values_list("id", flat=True).first(),
+            "slug": post.slug,
+            "search_term": post.title.split()[0],
+            "file_id": setting_file.id,
+            "file_version": setting_file.checksum[:DOWNLOAD_VERSION_LENGTH],
+            "admin_token": str(AccessToken.for_user(admin)),
+        }
@@ -0,0 +1,73 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.renderers import FastJSONRenderer
+from apps.core.utils import build_envelope
+from apps.users.api.v1.fast_serializers import BlogPostValuesSerializer
+from apps.users.api.v1.serializers import MyWorkSerializer
+from apps.users.management.commands.bench_serializers import Rollback, build_posts
+from apps.users.models import BlogPost, MyWork, Technology
+
+
+class Command(BaseCommand):
+    help = "Compare encode time and allocations of DRF's JSONRenderer and FastJSONRenderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100, help="Blog posts in the payload (max page size)")
+        parser.add_argument("--works", type=int, default=500, help="Works in the payload")
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        try:
+            with transaction.atomic():
+                payloads = self.build_payloads(request, options["posts"], options["works"])
+                raise Rollback
+        except Rollback:
+            pass
+
+        renderers = [("drf json", JSONRenderer()), ("orjson", FastJSONRenderer())]
+        self.stdout.write(f"{'payload':<10}{'renderer':<10}{'bytes':>10}{'encode (us)':>14}{'peak alloc (KiB)':>18}")
+        for name, payload in payloads:
+            for renderer_name, renderer in renderers:
+                body = renderer.render(payload)
+                elapsed = self.best_of(options["repeat"], lambda: renderer.render(payload))
+                tracemalloc.start()
+                renderer.render(payload)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"{name:<10}{renderer_name:<10}{len(body):>10}{elapsed * 1e6:>14.0f}{peak / 1024:>18.1f}")
+
+    def build_payloads(self, request, posts, works):
+        BlogPost.objects.bulk_create(build_posts(posts))
+        technologies = Technology.objects.bulk_create(Technology(name=f"Bench technology {i}") for i in range(20))
+        created = MyWork.objects.bulk_create(
+            MyWork(title=f"Work {i}", subtext="Subtext " * 5, description="Description " * 50,
+                   image=f"works/{i}.png", github_link="https://github.com/example/repo", order=i)
+            for i in range(works))
+        MyWork.technologies.through.objects.bulk_create(
+            MyWork.technologies.through(mywork_id=work.id, technology_id=technologies[(i + j) % 20].id)
+            for i, work in enumerate(created) for j in range(4))
+
+        blog = BlogPostValuesSerializer(context={'request': request}).serialize(BlogPost.objects.published()[:posts])
+        work_data = MyWorkSerializer(
+            MyWork.objects.prefetch_related('technologies'), many=True, context={'request': request}).data
+        return [
+            ("blog", build_envelope(blog, next="http://testserver/api/v1/blog/?cursor=abc")),
+            ("works", build_envelope(work_data)),
+        ]
+
+    @staticmethod
+    def best_of(repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,83 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.users.api.v1.fast_serializers import BlogPostValuesSerializer, MyAchievementValuesSerializer, MySkillValuesSerializer
+from apps.users.api.v1.serializers import BlogPostSerializer, MyAchievementSerializer, MySkillSerializer
+from apps.users.models import BlogPost, MyAchievement, MySkill
+
+
+def build_skills(n):
+    return [MySkill(name=f"Skill {i}", icon=f"skills/skill-{i}.png", percentage=i % 100, order=i) for i in range(n)]
+
+
+def build_achievements(n):
+    today = date.today()
+    return [
+        MyAchievement(title=f"Achievement {i}", organization="Organization", image=f"achievements/{i}.png",
+                      date=today - timedelta(days=i % 3650), order=i)
+        for i in range(n)
+    ]
+
+
+def build_posts(n):
+    now = timezone.now()
+    return [
+        BlogPost(title=f"Post {i}", slug=f"bench-post-{i}", excerpt="Excerpt " * 10, content="Content " * 200,
+                 image=f"blog/{i}.jpg", status=BlogPost.Status.PUBLISHED, published_at=now - timedelta(minutes=i))
+        for i in range(n)
+    ]
+
+
+CASES = [
+    ("skills", MySkill, build_skills, MySkillSerializer, MySkillValuesSerializer),
+    ("achievements", MyAchievement, build_achievements, MyAchievementSerializer, MyAchievementValuesSerializer),
+    ("blog", BlogPost, build_posts, BlogPostSerializer, BlogPostValuesSerializer),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare ModelSerializer and values()-based serialization of the list endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10, 1000, 100000])
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best time is reported")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        self.stdout.write(f"{'case':<14}{'rows':>8}{'model (ms)':>14}{'values (ms)':>14}{'speedup':>10}")
+        for size in options["sizes"]:
+            # Seed inside a transaction that is always rolled back, so the
+            # benchmark leaves the database untouched.
+            try:
+                with transaction.atomic():
+                    for name, model, build, model_serializer, values_serializer in CASES:
+                        model.objects.bulk_create(build(size), batch_size=1000)
+                        queryset = model.objects.all()
+                        slow = self.best_of(options["repeat"], lambda: model_serializer(
+                            queryset.all(), many=True, context={'request': request}).data)
+                        fast = self.best_of(options["repeat"], lambda: values_serializer(
+                            context={'request': request}).serialize(queryset.all()))
+                        self.stdout.write(
+                            f"{name:<14}{size:>8}{slow * 1000:>14.1f}{fast * 1000:>14.1f}{slow / fast:>9.1f}x")
+                        model.objects.all().delete()
+                    raise Rollback
+            except Rollback:
+                pass
+
+    @staticmethod
+    def best_of(repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
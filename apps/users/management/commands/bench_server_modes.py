@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.utils.benchmark import free_port, run_load, summarize, wait_for_port
+
+READ_PATHS = ["skills/", "works/", "achievements/", "experiences/", "blog/", "settings/", "settings/files/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the read API served by gunicorn (WSGI, thread per request) "
+        "against uvicorn (ASGI, async views) at high concurrency with slow clients. "
+        "Uses the configured database as-is."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--client-delay", type=float, default=0.05,
+                            help="Seconds each client stalls mid-request, like a slow mobile client")
+        parser.add_argument("--threads", type=int, default=8, help="gunicorn threads in the WSGI worker")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        prefix = f"/api/{settings.API_VERSION.strip('/')}/"
+        paths = [prefix + path for path in READ_PATHS]
+        modes = {
+            "wsgi": ([sys.executable, "-m", "gunicorn", "config.wsgi:application",
+                      "--workers", "1", "--threads", str(options["threads"])], "False"),
+            "asgi": ([sys.executable, "-m", "uvicorn", "config.asgi:application",
+                      "--workers", "1", "--lifespan", "off", "--log-level", "warning"], "True"),
+        }
+        report = {"options": {k: options[k] for k in ("concurrency", "requests", "client_delay", "threads")}}
+        for mode, (command, async_views) in modes.items():
+            port = free_port()
+            bind = ["--bind", f"127.0.0.1:{port}"] if mode == "wsgi" else ["--host", "127.0.0.1", "--port", str(port)]
+            env = {**os.environ, "DJANGO_ASGI_READ_VIEWS": async_views}
+            server = subprocess.Popen(command + bind, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                if not wait_for_port("127.0.0.1", port):
+                    raise CommandError(f"{mode} server did not start; is {command[2]} installed?")
+                # Warm up caches and connections before measuring.
+                asyncio.run(run_load("127.0.0.1", port, paths, len(paths), len(paths)))
+                results, elapsed = asyncio.run(run_load(
+                    "127.0.0.1", port, paths, options["requests"], options["concurrency"], options["client_delay"]))
+                report[mode] = summarize(results, elapsed)
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+            self.stdout.write(f"{mode}: {json.dumps(report[mode])}")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from apps.users.images import IMAGE_FIELDS, generate_variants
+
+class Command(BaseCommand):
+    help = "Generate missing responsive image variants for every image field (safe to re-run)"
+
+    def handle(self, *args, **kwargs):
+        updated = 0
+        for model, field_names in IMAGE_FIELDS.items():
+            for field_name in field_names:
+                queryset = model.objects.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+                for instance in queryset.iterator():
+                    try:
+                        updated += generate_variants(instance, field_name)
+                    except (OSError, ValueError) as e:
+                        self.stderr.write(f"{model._meta.label} {instance.pk}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {updated} images"))
@@ -0,0 +1,71 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.users import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate realistic synthetic rows for every portfolio table (capacity testing). "
+        "--scale N creates N blog posts and works, 10N comments and audit log rows, N/10 users, "
+        "and proportionally fewer of the single-page sections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=100000)
+        parser.add_argument("--rows", nargs="+", default=[], metavar="STEP=COUNT",
+                            help=f"Override the count of steps: {', '.join(seeding.STEP_MODELS)}")
+        parser.add_argument("--seed", type=int, default=0, help="Same seed and counts give the same rows")
+        parser.add_argument("--now", help="ISO datetime generated dates are drawn back from "
+                                          f"(default {seeding.EPOCH.isoformat()}, 'now' for the current time)")
+        parser.add_argument("--workers", type=int,
+                            help="Worker processes (default: one per CPU on PostgreSQL, 1 on SQLite)")
+        parser.add_argument("--chunk-size", type=int, default=seeding.CHUNK_SIZE, help="Rows per job")
+        parser.add_argument("--batch-size", type=int, default=seeding.BATCH_SIZE, help="Rows per INSERT/COPY")
+        parser.add_argument("--setting-files", type=int, default=5)
+        parser.add_argument("--clear", action="store_true",
+                            help="Delete existing portfolio rows first (real user accounts are kept)")
+
+    def handle(self, *args, **options):
+        counts = seeding.capacity_counts(options["scale"])
+        for override in options["rows"]:
+            name, _, count = override.partition("=")
+            if name not in seeding.STEP_MODELS or not count.isdigit():
+                raise CommandError(f"Invalid --rows value {override!r}")
+            counts[name] = int(count)
+        now = options["now"]
+        if now == "now":
+            now = timezone.now()
+        elif now is not None:
+            parsed = parse_datetime(now)
+            if parsed is None:
+                raise CommandError(f"Invalid --now value {now!r}")
+            now = parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+        workers = options["workers"]
+        if workers is None:
+            # SQLite allows one writer at a time; extra processes only contend for the lock.
+            workers = os.cpu_count() if connection.vendor == "postgresql" else 1
+
+        if options["clear"]:
+            seeding.clear()
+            self.stdout.write("Cleared existing rows")
+
+        start = time.perf_counter()
+        site = seeding.seed_site(options["seed"], options["setting_files"])
+
+        def progress(step, rows):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{step:<20}{rows:>12,} rows  ({elapsed:.1f}s)")
+
+        inserted = seeding.run(counts, seed=options["seed"], workers=workers, chunk_size=options["chunk_size"],
+                               batch_size=options["batch_size"], progress=progress, now=now)
+        seeding.invalidate_caches()
+        total = sum(inserted.values()) + sum(site.values())
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s, {workers} workers)"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from apps.users.models import BlogPost
+
+class Command(BaseCommand):
+    help = "Recompute the full-text search vector of every blog post"
+
+    def handle(self, *args, **kwargs):
+        if not BlogPost.objects.supports_full_text_search():
+            self.stdout.write(self.style.WARNING("Full-text search requires PostgreSQL, nothing to do."))
+            return
+        updated = BlogPost.objects.all().update_search_vector()
+        self.stdout.write(self.style.SUCCESS(f"Updated search vectors for {updated} blog posts"))
@@ -1,4 +1,7 @@
-from django.db import models
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import BaseUserManager
 
 
@@ -24,3 +27,56 @@ class MyUserManager(BaseUserManager):
         user.is_superuser = True
         user.save(using=self._db)
         return user
+
+
+# Text search configuration used for the BlogPost search vector and queries.
+BLOG_SEARCH_CONFIG = "english"
+
+
+def blog_search_vector():
+    """Weighted document for blog search: title (A) > excerpt (B) > content (C)."""
+    return (
+        SearchVector("title", weight="A", config=BLOG_SEARCH_CONFIG)
+        + SearchVector("excerpt", weight="B", config=BLOG_SEARCH_CONFIG)
+        + SearchVector("content", weight="C", config=BLOG_SEARCH_CONFIG)
+    )
+
+
+class BlogPostQuerySet(models.QuerySet):
+    def published(self):
+        # save() stamps published_at, but update() and bulk writes can leave
+        # it NULL; such rows have no place in the keyset-paginated list.
+        return self.filter(status=self.model.Status.PUBLISHED, published_at__isnull=False)
+
+    def supports_full_text_search(self):
+        return connections[self.db].vendor == "postgresql"
+
+    def update_search_vector(self):
+        """Recompute the stored search vector for every row in the queryset."""
+        if not self.supports_full_text_search():
+            return 0
+        return self.update(search_vector=blog_search_vector())
+
+    def update_comment_counts(self):
+        """Recount ``comment_count`` from the comments table, e.g. after bulk inserts."""
+        comments = self.model._meta.get_field("comments").related_model.objects
+        counts = comments.filter(post=OuterRef("pk")).order_by().values("post").annotate(n=Count("pk")).values("n")
+        return self.update(comment_count=Coalesce(Subquery(counts), 0))
+
+    def search(self, query):
+        """
+        Rank posts against a web-style query (quoted phrases, ``-`` exclusion)
+        using the GIN-indexed ``search_vector`` column. Falls back to
+        ``icontains`` on databases without full-text search (e.g. SQLite).
+        """
+        if not self.supports_full_text_search():
+            return self.filter(
+                Q(title__icontains=query) | Q(excerpt__icontains=query) | Q(content__icontains=query)
+            )
+
+        search_query = SearchQuery(query, search_type="websearch", config=BLOG_SEARCH_CONFIG)
+        return (
+            self.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-published_at", "-id")
+        )
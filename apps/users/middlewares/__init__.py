@@ -1,3 +1,6 @@
-# from .requestauditmiddleware import RequestAuditMiddleware
+from .healthcheckmiddleware import HealthCheckMiddleware
+from .metricsmiddleware import MetricsMiddleware
+from .replicastickinessmiddleware import ReplicaStickinessMiddleware
+from .requestauditmiddleware import RequestAuditMiddleware
 
-# __all__ = ["RequestAuditMiddleware"]
+__all__ = ["HealthCheckMiddleware", "MetricsMiddleware", "ReplicaStickinessMiddleware", "RequestAuditMiddleware"]
@@ -0,0 +1,57 @@
+import orjson
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+from apps.core.health import readiness
+
+LIVENESS_PATH = "/health"
+READINESS_PATH = "/ready"
+
+LIVE_BODY = orjson.dumps({"status": "ok"})
+
+
+@sync_and_async_middleware
+class HealthCheckMiddleware:
+    """
+    Answer the liveness and readiness probes before the rest of the
+    middleware stack (sessions, CSRF, auth, host validation) runs; must be
+    first in ``MIDDLEWARE``. See ``apps.core.health``. Runs natively under
+    both WSGI and ASGI, so it does not force the stack below it onto threads.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        path = request.path_info.rstrip("/")
+        if path == LIVENESS_PATH:
+            return self.respond(LIVE_BODY, 200)
+        if path == READINESS_PATH:
+            return self.readiness_response(*readiness())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        path = request.path_info.rstrip("/")
+        if path == LIVENESS_PATH:
+            return self.respond(LIVE_BODY, 200)
+        if path == READINESS_PATH:
+            # The checks wait on a thread pool; keep that off the event loop.
+            return self.readiness_response(*await sync_to_async(readiness, thread_sensitive=False)())
+        return await self.get_response(request)
+
+    @classmethod
+    def readiness_response(cls, ready, checks):
+        body = orjson.dumps({"status": "ok" if ready else "unavailable", "checks": checks})
+        return cls.respond(body, 200 if ready else 503)
+
+    @staticmethod
+    def respond(body, status):
+        response = HttpResponse(body, status=status, content_type="application/json")
+        response["Cache-Control"] = "no-store"
+        return response
@@ -0,0 +1,48 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.decorators import sync_and_async_middleware
+
+from apps.core.metrics import QueryMetrics, observe_request
+
+
+@sync_and_async_middleware
+class MetricsMiddleware:
+    """
+    Record latency, response size and database usage of every request,
+    labelled with the resolved view; served by ``apps.core.metrics.metrics_view``.
+
+    Query counts come from ``QueryMetrics.track()``, which wraps the database
+    connections of the thread it runs in. Under ASGI each request runs its
+    sync code and the async ORM (thread-sensitive ``sync_to_async``) in one
+    thread, so the wrappers are installed in that thread and every such query
+    is counted. Queries run with ``thread_sensitive=False`` use other threads
+    and connections and are not counted; latency and size always are.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        queries = QueryMetrics()
+        start = time.perf_counter()
+        with queries.track():
+            response = self.get_response(request)
+        observe_request(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryMetrics()
+        start = time.perf_counter()
+        stack = await sync_to_async(queries.track)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        observe_request(request, response, time.perf_counter() - start, queries)
+        return response
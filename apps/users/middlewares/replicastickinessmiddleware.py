@@ -0,0 +1,58 @@
+import math
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from apps.core import db_router
+
+
+@sync_and_async_middleware
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes across requests for ``apps.core.db_router``: a request
+    that wrote to the primary gets a short-lived cookie, and requests
+    carrying it read from the primary as well. Does nothing without replicas.
+    The router's state lives in context variables, which ``sync_to_async``
+    carries to and from the ORM's thread, so the async path behaves the same.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.start(request):
+            return self.get_response(request)
+        return self.finish(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        if not self.start(request):
+            return await self.get_response(request)
+        return self.finish(request, await self.get_response(request))
+
+    @staticmethod
+    def start(request):
+        """Reset the routing state; returns whether replicas are in use."""
+        config = settings.REPLICA_ROUTING
+        # Worker threads and event loops serve many requests: never inherit a previous pin.
+        db_router.reset()
+        if not config["REPLICAS"]:
+            return False
+        if config["COOKIE_NAME"] in request.COOKIES:
+            db_router.pin_primary()
+        return True
+
+    @staticmethod
+    def finish(request, response):
+        config = settings.REPLICA_ROUTING
+        if db_router.wrote():
+            response.set_cookie(
+                config["COOKIE_NAME"], "1", max_age=math.ceil(config["STICKY_SECONDS"]),
+                secure=request.is_secure(), httponly=True, samesite="Lax",
+            )
+        return response
@@ -1,44 +1,80 @@
-import logging
-
-from django.urls import resolve
-from django.http import HttpRequest, HttpResponse
-from django.core.exceptions import ValidationError
-
-# from apps.users.models import RequestAuditLog, MyUser
-
-logger = logging.getLogger(__name__)
-
-
-# class RequestAuditMiddleware:
-#     def __init__(self, get_response):
-#         self.get_response = get_response
-
-#     def __call__(self, request: HttpRequest) -> HttpResponse:
-#         user = request.user if request.user.is_authenticated else None
-#         x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-#         ip_address = None
-#         if x_forwarded_for:
-#             ip_address = x_forwarded_for.split(",")[0].strip()
-#         else:
-#             ip_address = request.META.get('REMOTE_ADDR', '0.0.0.0')
-#         user_agent = request.META.get('HTTP_USER_AGENT', 'unknown')
-#         path = request.path
-#         method = request.method
-
-#         response = self.get_response(request)
-
-#         status_code = response.status_code
-
-#         try:
-#             RequestAuditLog.objects.create(
-#                 user=user if isinstance(user, MyUser) else None,
-#                 ip_address=ip_address,
-#                 user_agent=user_agent,
-#                 path=path,
-#                 method=method,
-#                 status_code=status_code
-#             )
-#         except ValidationError as e:
-#             logger.error(f"Failed to save audit log: {e}")
-
-#         return response
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.throttling import BaseThrottle
+
+from apps.users.audit import audit_buffer, audit_settings
+
+
+@sync_and_async_middleware
+class RequestAuditMiddleware:
+    """
+    Record a sample of requests in ``RequestAuditLog`` without touching the
+    database on the request path; see ``apps.users.audit`` for the pipeline.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled(request):
+            return self.get_response(request)
+
+        requested_at = time.time()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, requested_at, start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            return await self.get_response(request)
+
+        requested_at = time.time()
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        # record() only appends to an in-memory buffer: safe on the event loop.
+        self.record(request, response, requested_at, start)
+        return response
+
+    @staticmethod
+    def sampled(request):
+        config = audit_settings()
+        return (config["ENABLED"] and random.random() < config["SAMPLE_RATE"]
+                and not request.path.startswith(tuple(config["EXCLUDE_PATHS"])))
+
+    def record(self, request, response, requested_at, start):
+        duration_ms = (time.perf_counter() - start) * 1000
+        audit_buffer.record((
+            requested_at,
+            self.user_id(request),
+            # The address the throttles see: REMOTE_ADDR, or the entry added
+            # by the outermost of REST_FRAMEWORK["NUM_PROXIES"] trusted proxies.
+            BaseThrottle().get_ident(request),
+            request.META.get('HTTP_USER_AGENT', ''),
+            request.path,
+            request.method,
+            response.status_code,
+            duration_ms,
+        ))
+
+    @staticmethod
+    def user_id(request):
+        """
+        The authenticated user's id, without loading the session or user just
+        for the audit log: only a user the request already resolved is used.
+        """
+        user = request.__dict__.get("user")
+        if isinstance(user, SimpleLazyObject):
+            user = None if user._wrapped is empty else user._wrapped
+        if user is not None and getattr(user, "is_authenticated", False):
+            return user.pk
+        return None
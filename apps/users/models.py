@@ -1,13 +1,15 @@
 from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.models import BaseModel
-from apps.users.managers import MyUserManager
+from apps.core.utils.images import file_digest
+from apps.users.managers import BlogPostQuerySet, MyUserManager
 
 
 class MyUser(AbstractBaseUser, PermissionsMixin, BaseModel):
@@ -51,6 +53,8 @@ class MyUser(AbstractBaseUser, PermissionsMixin, BaseModel):
 class MySkill(BaseModel):
     name = models.CharField(max_length=100)
     icon = models.ImageField(upload_to='skills/', blank=True, null=True)
+    # Resized WebP/AVIF copies, filled in by apps.users.images.
+    icon_variants = models.JSONField(default=dict, blank=True, editable=False)
     percentage = models.PositiveIntegerField(default=0)
     order = models.PositiveIntegerField(default=0)
 
@@ -79,6 +83,7 @@ class MyWork(BaseModel):
     subtext = models.TextField()
     description = models.TextField()
     image = models.ImageField(upload_to='works/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     technologies = models.ManyToManyField(Technology, related_name='works')
     github_link = models.URLField(blank=True, null=True)
     live_link = models.URLField(blank=True, null=True)
@@ -96,6 +101,7 @@ class MyAchievement(BaseModel):
     title = models.CharField(max_length=100)
     organization = models.CharField(max_length=100)
     image = models.ImageField(upload_to='achievements/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     date = models.DateField()
     order = models.PositiveIntegerField(default=0)
 
@@ -137,6 +143,63 @@ class ContactMessage(BaseModel):
         ordering = ["-created_at"]
 
 
+class RequestAuditLog(BaseModel):
+    """
+    One sampled HTTP request, written in batches by ``apps.users.audit``.
+    ``created_at`` is when the batch was written; ``requested_at`` is when
+    the request arrived.
+    """
+    user = models.ForeignKey(MyUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_logs')
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.CharField(max_length=255, blank=True)
+    path = models.CharField(max_length=2048)
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    requested_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.method} {self.path} {self.status_code}"
+
+    class Meta:
+        verbose_name = "Request Audit Log"
+        verbose_name_plural = "Request Audit Logs"
+        ordering = ["-requested_at"]
+
+
+class EmailOutbox(BaseModel):
+    """
+    Emails waiting to be sent, written in the same transaction as the row
+    that triggers them and drained by ``apps.users.tasks.relay_email_outbox``.
+    ``available_at`` is when the relay may (re)try the row next.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    contact_message = models.ForeignKey(
+        ContactMessage, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.payload.get('email')} ({self.status})"
+
+    class Meta:
+        verbose_name = "Email Outbox"
+        verbose_name_plural = "Email Outbox"
+        ordering = ["available_at", "id"]
+        indexes = [
+            # Serves the relay's "pending and due" scan.
+            models.Index(fields=["status", "available_at"], name="emailoutbox_due_idx"),
+        ]
+
+
 class Testimonial(BaseModel):
     client_name = models.CharField(max_length=100)
     feedback = models.TextField()
@@ -146,6 +209,7 @@ class Testimonial(BaseModel):
     )
     client_photo = models.ImageField(
         upload_to='testimonials/', blank=True, null=True)
+    client_photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
 
     def __str__(self):
@@ -200,13 +264,27 @@ class BlogPost(BaseModel):
     excerpt = models.TextField(blank=True, null=True)
     content = models.TextField()
     image = models.ImageField(upload_to='blog/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     published_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(
         max_length=10, choices=Status.choices, default=Status.DRAFT)
+    # Weighted title/excerpt/content document, kept in sync by save() and
+    # GIN-indexed on PostgreSQL (see apps.users.signals).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Maintained by the BlogComment signals in apps.users.signals.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Detail views, buffered in Redis and added in bulk (see apps.users.counters).
+    view_count = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = BlogPostQuerySet.as_manager()
 
     class Meta:
         # SUGGESTION: Order blog posts by publication date by default.
         ordering = ["-published_at"]
+        indexes = [
+            # Serves the keyset-paginated published list in BlogPostView.
+            models.Index(fields=["status", "-published_at", "-id"], name="blogpost_status_published_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -221,6 +299,7 @@ class BlogPost(BaseModel):
             self.published_at = timezone.now()
 
         super().save(*args, **kwargs)
+        BlogPost.objects.filter(pk=self.pk).update_search_vector()
 
 
 class BlogComment(BaseModel):
@@ -229,6 +308,12 @@ class BlogComment(BaseModel):
     email = models.EmailField()
     body = models.TextField()
 
+    class Meta:
+        indexes = [
+            # Serves the keyset-paginated comments of a post in BlogCommentView.
+            models.Index(fields=["post", "created_at", "id"], name="blogcomment_post_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.email}"
 
@@ -236,6 +321,20 @@ class BlogComment(BaseModel):
 class SettingFiles(BaseModel):
     name = models.CharField(max_length=100, unique=True)
     file = models.FileField(upload_to='settings_files/')
+    # SHA-256 of the file; versions the download URL and serves as its ETag.
+    checksum = models.CharField(max_length=64, blank=True, editable=False)
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        if self.file and not self.file._committed:
+            self.checksum = file_digest(self.file)
+        super().save(*args, **kwargs)
+
+    def ensure_checksum(self):
+        """Return the checksum, computing it for rows saved before it existed."""
+        if not self.checksum and self.file:
+            self.checksum = file_digest(self.file)
+            SettingFiles.objects.filter(pk=self.pk).update(checksum=self.checksum)
+        return self.checksum
@@ -0,0 +1,106 @@
+"""
+Transactional outbox for outgoing email.
+
+Views record the email to send as an ``EmailOutbox`` row in the same database
+transaction as the data that triggers it, so a request never waits on (or
+loses mail to) the Celery broker. ``relay()`` runs periodically from Celery
+beat and delivers due rows:
+
+1. Claim a batch with ``SELECT ... FOR UPDATE SKIP LOCKED`` and push each
+   row's ``available_at`` one lease into the future, then commit. Concurrent
+   relays skip rows another relay holds, and no transaction stays open while
+   talking to SMTP.
+2. Send each claimed row. Success marks it sent; failure schedules a retry
+   with exponential backoff until ``MAX_ATTEMPTS``.
+
+A relay that dies mid-batch leaves its rows to be retried once the lease
+runs out, so every email is delivered at least once.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.utils.mailsender import smtp_pool
+from apps.users.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+LEASE = timedelta(minutes=5)
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+
+
+def enqueue_contact_email(contact_message):
+    """Queue the support email for a contact message; call inside its transaction."""
+    return EmailOutbox.objects.create(
+        contact_message=contact_message,
+        payload={"name": contact_message.name, "email": contact_message.email, "message": contact_message.message},
+    )
+
+
+def backoff(attempts):
+    """Delay before retry number ``attempts`` + 1: 30s, 1m, 2m, ... capped at an hour."""
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.Status.PENDING, available_at__lte=now)
+            .order_by("available_at", "id")[:batch_size]
+        )
+        EmailOutbox.objects.filter(pk__in=[row.pk for row in rows]).update(
+            available_at=now + LEASE, attempts=F("attempts") + 1)
+    for row in rows:
+        row.attempts += 1
+    return rows
+
+
+def deliver(row, connection):
+    from apps.users.tasks import support_email
+
+    connection.send([support_email(**row.payload)])
+
+
+def relay(batch_size=BATCH_SIZE):
+    """
+    Deliver up to ``batch_size`` due emails over one pooled SMTP connection.
+
+    Returns:
+        tuple: ``(sent, failed)`` counts for this batch.
+    """
+    rows = claim_batch(batch_size)
+    if not rows:
+        return 0, 0
+    sent = 0
+    with smtp_pool.connection() as connection:
+        for row in rows:
+            sent += send_row(row, connection)
+    return sent, len(rows) - sent
+
+
+def send_row(row, connection):
+    """Send one claimed row and record the outcome. Returns True on success."""
+    try:
+        deliver(row, connection)
+    except Exception as e:
+        give_up = row.attempts >= MAX_ATTEMPTS
+        EmailOutbox.objects.filter(pk=row.pk).update(
+            status=EmailOutbox.Status.FAILED if give_up else EmailOutbox.Status.PENDING,
+            available_at=timezone.now() + backoff(row.attempts),
+            last_error=repr(e),
+            updated_at=timezone.now(),
+        )
+        logger.error(f"Outbox email {row.pk} failed (attempt {row.attempts}): {e}")
+        return False
+    EmailOutbox.objects.filter(pk=row.pk).update(
+        status=EmailOutbox.Status.SENT, sent_at=timezone.now(), last_error="", updated_at=timezone.now())
+    return True
@@ -0,0 +1,123 @@
+"""
+Process-local registry of the ``Settings`` key/value table.
+
+All keys are loaded with a single query and kept in process memory. Every
+process (gunicorn workers, Celery workers) compares its copy against a version
+token in the shared cache; saving or deleting a ``Settings`` row replaces the
+token (see ``apps.users.signals``), so the next read anywhere reloads the table.
+Steady-state reads therefore cost one cache GET and no database queries.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.core.utils.conditional import make_etag
+from apps.users.models import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class SettingsRegistry:
+    version_key = "settings:version"
+    # Upper bound on staleness when the cache is not shared between processes
+    # (e.g. the local memory cache used in development).
+    max_age = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Drop the local copy; the next read reloads it."""
+        self._values = None
+        self._version = None
+        self._loaded_at = 0.0
+        self.etag = None
+
+    def invalidate(self):
+        """Drop the local copy and tell every other process to reload."""
+        self.clear()
+        try:
+            cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+        except Exception as e:
+            logger.error(f"Failed to publish settings version: {e}")
+
+    def _shared_version(self):
+        try:
+            return cache.get(self.version_key)
+        except Exception as e:
+            logger.error(f"Failed to read settings version: {e}")
+            return self._version
+
+    async def _ashared_version(self):
+        try:
+            return await cache.aget(self.version_key)
+        except Exception as e:
+            logger.error(f"Failed to read settings version: {e}")
+            return self._version
+
+    def _queryset(self):
+        # Reloads follow a write (a new version token): a lagging replica
+        # would cache the old rows under the new version.
+        return Settings.objects.using(DEFAULT_DB_ALIAS).order_by('pk').values_list('key', 'value', 'updated_at')
+
+    def _is_stale(self, version):
+        return (self._values is None or version != self._version
+                or time.monotonic() - self._loaded_at > self.max_age)
+
+    def _load(self, version):
+        return self._store(list(self._queryset()), version)
+
+    def _store(self, rows, version):
+        self._values = {key: value for key, value, _ in rows}
+        self.etag = make_etag(f"settings:{rows!r}")
+        self._version = version
+        self._loaded_at = time.monotonic()
+        return self._values
+
+    def all(self):
+        """Return every setting as an ordered ``{key: value}`` dict."""
+        version = self._shared_version()
+        values = self._values
+        if self._is_stale(version):
+            with self._lock:
+                values = self._load(version)
+        return values
+
+    async def aall(self):
+        """Async variant of ``all()`` using the async cache API and ORM."""
+        version = await self._ashared_version()
+        values = self._values
+        if self._is_stale(version):
+            values = self._store([row async for row in self._queryset()], version)
+        return values
+
+    def get(self, key, default=None):
+        return self.all().get(key, default)
+
+    def as_list(self):
+        """Settings in the ``[{"key": ..., "value": ...}]`` shape used by the API."""
+        return [{"key": key, "value": value} for key, value in self.all().items()]
+
+    async def aas_list(self):
+        return [{"key": key, "value": value} for key, value in (await self.aall()).items()]
+
+    def validators(self, request=None):
+        """
+        ``(etag, None)`` for conditional GETs on the settings endpoint. No
+        Last-Modified: deleting a row does not move ``Max(updated_at)``.
+        """
+        self.all()
+        return self.etag, None
+
+    async def avalidators(self, request=None):
+        await self.aall()
+        return self.etag, None
+
+
+site_settings = SettingsRegistry()
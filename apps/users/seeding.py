@@ -0,0 +1,459 @@
+"""
+Synthetic portfolio data for benchmarks and capacity tests.
+
+Data is generated in steps, one per table, in foreign key order (``STEPS``).
+Each step is split into jobs of ``chunk_size`` rows with explicit primary
+keys, so children can point at their parents without querying them, and
+jobs can run in any order or in parallel worker processes. Every job seeds
+its own Faker instance and RNG from ``(seed, step, first id)``: the same
+counts and seed always produce the same rows, whatever the number of workers.
+Dates are drawn backwards from a fixed ``now`` (``EPOCH`` unless given), not
+the wall clock, so reruns on other days produce the same rows too.
+
+Rows are written ``batch_size`` at a time, with ``COPY ... FROM STDIN`` on
+PostgreSQL (psycopg 3) and ``bulk_create`` elsewhere, so memory stays flat
+however many rows are asked for. Faker is slow per call, so long texts are
+drawn from pools (names, sentences, paragraphs...) generated once per job
+rather than generated per row.
+
+Neither path sends signals: nothing here schedules image variants, and
+``invalidate_caches()`` must be called to drop the cached settings and
+portfolio snapshot. Blog search vectors are computed per job.
+"""
+
+import logging
+import multiprocessing
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from ipaddress import IPv4Address
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.models import Max
+from django.utils.text import slugify
+from faker import Faker
+
+from apps.core.utils.images import file_digest
+from apps.users.models import (BlogComment, BlogPost, ContactMessage, EmailOutbox, FrequentlyAskedQuestion,
+                               MyAchievement, MyExperience, MySkill, MyUser, MyWork, RequestAuditLog, SettingFiles,
+                               Settings, Technology, Testimonial)
+from apps.users.registry import site_settings
+from apps.users.snapshot import invalidate_portfolio_snapshot
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 10000
+TECHNOLOGIES = 40
+TECHNOLOGIES_PER_WORK = 3
+POOL_SIZE = 200
+# Default reference time generated dates are drawn back from.
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+# Marks generated users (an unusable password), so clear() leaves real accounts alone.
+SEEDED_PASSWORD = "!seeded"
+# Names seed_site() gives its setting files, so clear() leaves uploaded ones alone.
+SEED_FILE_PREFIX = "seed-file-"
+
+AUDITED_PATHS = ["/api/v1/skills/", "/api/v1/works/", "/api/v1/blog/", "/api/v1/portfolio/", "/api/v1/contact/"]
+
+# (step, model, parent steps whose ids the rows refer to), in insert order.
+STEPS = (
+    ("users", MyUser, ()),
+    ("technologies", Technology, ()),
+    ("works", MyWork, ()),
+    ("work_technologies", MyWork.technologies.through, ("works", "technologies")),
+    ("blog_posts", BlogPost, ()),
+    ("blog_comments", BlogComment, ("blog_posts",)),
+    ("contact_messages", ContactMessage, ()),
+    ("email_outbox", EmailOutbox, ("contact_messages",)),
+    ("request_audit_logs", RequestAuditLog, ("users",)),
+    ("skills", MySkill, ()),
+    ("achievements", MyAchievement, ()),
+    ("experiences", MyExperience, ()),
+    ("testimonials", Testimonial, ()),
+    ("faqs", FrequentlyAskedQuestion, ()),
+)
+STEP_MODELS = {name: model for name, model, parents in STEPS}
+# Parents a step can do without (the foreign key is nullable).
+OPTIONAL_PARENTS = {"users"}
+
+
+def scale_counts(scale):
+    """
+    Rows per step for ``bench_http``: blog posts and works grow with the
+    scale; the unpaginated single-page sections are capped at a realistic size.
+    """
+    return {
+        "blog_posts": scale,
+        "works": scale,
+        "technologies": min(scale, TECHNOLOGIES),
+        "skills": min(scale, 100),
+        "achievements": min(scale, 100),
+        "experiences": min(scale, 100),
+    }
+
+
+def capacity_counts(scale):
+    """Rows per step for ``seed_scale``: every table, in production-like proportions."""
+    small = max(scale // 100, 1)
+    return {
+        "users": scale // 10,
+        "technologies": min(scale, 1000),
+        "works": scale,
+        "blog_posts": scale,
+        "blog_comments": scale * 10,
+        "contact_messages": scale,
+        "email_outbox": scale,
+        "request_audit_logs": scale * 10,
+        "skills": small,
+        "achievements": small,
+        "experiences": small,
+        "testimonials": small,
+        "faqs": small,
+    }
+
+
+class Generator:
+    """
+    Deterministic row factories. Each step's factory takes the ids to create
+    (a range) and the id ranges of its parent steps.
+    """
+
+    def __init__(self, seed=0, now=None):
+        self.fake = Faker()
+        self.fake.seed_instance(seed)
+        self.random = random.Random(seed)
+        self.now = (now or EPOCH).replace(microsecond=0)
+
+    # Pools are built on first use, so a job only pays for the ones it needs.
+    def _pool(self, make):
+        return [make() for _ in range(POOL_SIZE)]
+
+    @cached_property
+    def paragraphs(self):
+        return self._pool(lambda: self.fake.paragraph(nb_sentences=6))
+
+    @cached_property
+    def sentences(self):
+        return self._pool(lambda: self.fake.sentence(nb_words=12))
+
+    @cached_property
+    def titles(self):
+        return self._pool(lambda: self.fake.sentence(nb_words=6).rstrip("."))
+
+    @cached_property
+    def names(self):
+        return self._pool(self.fake.name)
+
+    @cached_property
+    def companies(self):
+        return self._pool(self.fake.company)
+
+    @cached_property
+    def jobs(self):
+        return self._pool(self.fake.job)
+
+    @cached_property
+    def user_agents(self):
+        return self._pool(self.fake.user_agent)
+
+    @cached_property
+    def domains(self):
+        return self._pool(self.fake.domain_name)
+
+    def pick(self, values, max_length=None):
+        return self.random.choice(values)[:max_length]
+
+    def text(self, paragraphs):
+        return "\n\n".join(self.random.choices(self.paragraphs, k=paragraphs))
+
+    def title(self, max_length):
+        return self.pick(self.titles, max_length)
+
+    def email(self, i):
+        return f"{self.pick(self.names).split()[0].lower()}.{i}@{self.pick(self.domains)}"
+
+    def date(self, max_days_ago=3650):
+        return (self.now - timedelta(days=self.random.randrange(max_days_ago))).date()
+
+    def moment(self, max_minutes_ago=10 ** 6):
+        return self.now - timedelta(minutes=self.random.randrange(max_minutes_ago))
+
+    def settings(self):
+        yield Settings(key="website_name", value=self.fake.company())
+        yield Settings(key="website_url", value=self.fake.url())
+        yield Settings(key="website_logo", value="/static/default_logo.png")
+        yield Settings(key="github", value=f"https://github.com/{self.fake.user_name()}")
+
+    def users(self, ids, parents):
+        for i in ids:
+            # Hashing a real password per row would dominate the run.
+            yield MyUser(id=i, email=f"user{i}@example.com", name=self.pick(self.names), password=SEEDED_PASSWORD,
+                         is_verified=self.random.random() < 0.8)
+
+    def technologies(self, ids, parents):
+        for i in ids:
+            yield Technology(id=i, name=f"{self.fake.word().title()} {i}"[:100], icon=f"fa-{i}")
+
+    def works(self, ids, parents):
+        for i in ids:
+            yield MyWork(
+                id=i, title=self.title(100), subtext=self.pick(self.sentences), description=self.text(2),
+                github_link=f"https://github.com/example/project-{i}", live_link=f"https://{self.pick(self.domains)}/",
+                order=i,
+            )
+
+    def work_technologies(self, ids, parents):
+        # ``ids`` are work ids here; the link rows get serial ids.
+        through = MyWork.technologies.through
+        technologies = parents["technologies"]
+        per_work = min(TECHNOLOGIES_PER_WORK, len(technologies))
+        for work_id in ids:
+            for technology_id in self.random.sample(technologies, per_work):
+                yield through(mywork_id=work_id, technology_id=technology_id)
+
+    def blog_posts(self, ids, parents):
+        for i in ids:
+            # Titles are generated per post so search terms vary.
+            title = self.fake.sentence(nb_words=6).rstrip(".")[:200]
+            published = self.random.random() < 0.9
+            yield BlogPost(
+                id=i, title=title, slug=f"{slugify(title)[:200]}-{i}", excerpt=self.pick(self.sentences),
+                content=self.text(self.random.randint(3, 12)),
+                status=BlogPost.Status.PUBLISHED if published else BlogPost.Status.DRAFT,
+                published_at=self.moment() if published else None,
+            )
+
+    def blog_comments(self, ids, parents):
+        posts = parents["blog_posts"]
+        for i in ids:
+            yield BlogComment(id=i, post_id=self.random.choice(posts), name=self.pick(self.names, 100),
+                              email=self.email(i), body=self.pick(self.paragraphs))
+
+    def contact_messages(self, ids, parents):
+        for i in ids:
+            yield ContactMessage(id=i, name=self.pick(self.names, 100), email=self.email(i), message=self.text(1))
+
+    def email_outbox(self, ids, parents):
+        messages = parents["contact_messages"]
+        for i in ids:
+            sent = self.random.random() < 0.95
+            yield EmailOutbox(
+                id=i, contact_message_id=messages[(i - ids.start) % len(messages)],
+                payload={"name": self.pick(self.names), "email": self.email(i), "message": self.pick(self.sentences)},
+                status=EmailOutbox.Status.SENT if sent else EmailOutbox.Status.FAILED,
+                attempts=1 if sent else 8, sent_at=self.moment() if sent else None,
+                last_error="" if sent else "SMTPServerDisconnected()",
+            )
+
+    def request_audit_logs(self, ids, parents):
+        users = parents.get("users")
+        for i in ids:
+            yield RequestAuditLog(
+                id=i, user_id=self.random.choice(users) if users and self.random.random() < 0.2 else None,
+                ip_address=str(IPv4Address(self.random.getrandbits(32))), user_agent=self.pick(self.user_agents, 255),
+                path=self.random.choice(AUDITED_PATHS), method="GET",
+                status_code=self.random.choices([200, 304, 404, 429], weights=[85, 10, 4, 1])[0],
+                duration_ms=round(self.random.lognormvariate(3, 0.6), 2), requested_at=self.moment(),
+            )
+
+    def skills(self, ids, parents):
+        for i in ids:
+            yield MySkill(id=i, name=self.pick(self.jobs, 100), percentage=self.random.randint(30, 100), order=i)
+
+    def achievements(self, ids, parents):
+        for i in ids:
+            yield MyAchievement(id=i, title=self.title(100), organization=self.pick(self.companies, 100),
+                                date=self.date(), order=i)
+
+    def experiences(self, ids, parents):
+        for i in ids:
+            start = self.date()
+            yield MyExperience(
+                id=i, title=self.pick(self.jobs, 100), company=self.pick(self.companies, 100), description=self.text(1),
+                start_date=start, end_date=start + timedelta(days=self.random.randint(90, 1500)), order=i,
+            )
+
+    def testimonials(self, ids, parents):
+        for i in ids:
+            yield Testimonial(id=i, client_name=self.pick(self.names, 100), feedback=self.text(1),
+                              rating=self.random.randint(3, 5), order=i)
+
+    def faqs(self, ids, parents):
+        for i in ids:
+            yield FrequentlyAskedQuestion(id=i, question=f"{self.title(250)}?",
+                                          answer=self.text(1), order=i)
+
+
+def uses_copy():
+    return connection.vendor == "postgresql" and is_psycopg3
+
+
+def copy_insert(model, objs):
+    """Write model instances with ``COPY ... FROM STDIN`` (PostgreSQL, psycopg 3)."""
+    fields = [field for field in model._meta.concrete_fields if not (field.primary_key and objs[0].pk is None)]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN") as copy:
+            for obj in objs:
+                copy.write_row([field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields])
+
+
+def bulk_insert(model, rows, batch_size=BATCH_SIZE):
+    """Insert an iterable of unsaved instances ``batch_size`` at a time. Returns the row count."""
+    rows = iter(rows)
+    inserted = 0
+    while batch := list(islice(rows, batch_size)):
+        if uses_copy():
+            copy_insert(model, batch)
+        else:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        inserted += len(batch)
+    return inserted
+
+
+def insert_chunk(job):
+    """Generate and insert one job's rows; runs in a worker process."""
+    name, ids, parents, seed, now, batch_size = job
+    generator = Generator(zlib.crc32(f"{seed}:{name}:{ids.start}".encode()), now)
+    with transaction.atomic():
+        inserted = bulk_insert(STEP_MODELS[name], getattr(generator, name)(ids, parents), batch_size)
+        if name == "blog_posts":
+            BlogPost.objects.filter(id__gte=ids.start, id__lt=ids.stop).update_search_vector()
+    return name, inserted
+
+
+def next_id(model):
+    # From the primary: a lagging replica would hand out ids already taken.
+    return (model.objects.using(DEFAULT_DB_ALIAS).aggregate(last=Max("pk"))["last"] or 0) + 1
+
+
+def plan(counts, seed=0, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, now=None):
+    """
+    Assign id ranges after the current maximum id of every table and split
+    the steps into jobs. Children only refer to parents created by the same
+    run, so a step whose required parents get no rows is skipped.
+    """
+    ranges = {}
+    jobs = []
+    for name, model, parent_names in STEPS:
+        if name == "work_technologies":
+            count = len(ranges.get("works", ()))
+        else:
+            count = counts.get(name, 0)
+        if not count or any(not ranges.get(p) for p in parent_names if p not in OPTIONAL_PARENTS):
+            continue
+        parents = {parent: ranges[parent] for parent in parent_names if ranges.get(parent)}
+        if name == "work_technologies":
+            ids = ranges["works"]
+        else:
+            start = next_id(model)
+            ids = ranges[name] = range(start, start + count)
+        for offset in range(0, len(ids), chunk_size):
+            jobs.append((name, ids[offset:offset + chunk_size], parents, seed, now, batch_size))
+    return jobs
+
+
+def reset_sequences():
+    """Move PostgreSQL id sequences past the explicit ids written by ``run()``."""
+    statements = connection.ops.sequence_reset_sql(no_style(), list(STEP_MODELS.values()))
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def seed_site(seed=0, setting_files=0):
+    """Site settings (updated if the keys exist) and a few small setting files."""
+    generator = Generator(seed)
+    site = list(generator.settings())
+    # bulk_create and update() rather than save(): no per-row signals;
+    # invalidate_caches() drops the cached copies once the run is done.
+    Settings.objects.bulk_create(site, ignore_conflicts=True)
+    for setting in site:
+        Settings.objects.filter(key=setting.key).update(value=setting.value)
+    names = [f"{SEED_FILE_PREFIX}{i}" for i in range(setting_files)]
+    SettingFiles.objects.filter(name__in=names).delete()
+    files = []
+    for name in names:
+        setting_file = SettingFiles(name=name)
+        content = ContentFile(f"%PDF-1.4\n{generator.text(5)}\n".encode())
+        setting_file.checksum = file_digest(content)
+        setting_file.file.save(f"{name}.pdf", content, save=False)
+        files.append(setting_file)
+    SettingFiles.objects.bulk_create(files)
+    return {"settings": len(site), "setting_files": setting_files}
+
+
+def run(counts, seed=0, workers=1, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, progress=None, now=None):
+    """
+    Insert ``counts`` rows per step (see ``STEPS``) using ``workers``
+    processes, with dates before ``now`` (default ``EPOCH``).
+    ``progress(step, rows)`` is called as jobs finish. Returns the number of
+    rows inserted per step.
+    """
+    jobs = plan(counts, seed, chunk_size, batch_size, now)
+    inserted = {}
+    # Steps run one after another so parents exist before their children;
+    # the jobs within a step run in parallel.
+    for name in STEP_MODELS:
+        step_jobs = [job for job in jobs if job[0] == name]
+        if not step_jobs:
+            continue
+        if workers > 1:
+            # Forked workers must open their own database connections.
+            connections.close_all()
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                results = list(pool.imap_unordered(insert_chunk, step_jobs))
+        else:
+            results = [insert_chunk(job) for job in step_jobs]
+        for step, rows in results:
+            inserted[step] = inserted.get(step, 0) + rows
+        if name == "blog_comments":
+            # bulk_create skips the signals maintaining the counter.
+            BlogPost.objects.update_comment_counts()
+        if progress:
+            progress(name, inserted[name])
+    reset_sequences()
+    return inserted
+
+
+def invalidate_caches():
+    """Make readers see the seeded rows: bulk writes do not send the signals that would."""
+    site_settings.invalidate()
+    invalidate_portfolio_snapshot()
+
+
+def seed(scale, seed=0, batch_size=BATCH_SIZE):
+    """
+    Single-process portfolio of the given scale (see ``scale_counts``) for
+    ``bench_http``. Returns the number of rows inserted per step.
+    """
+    inserted = seed_site(seed)
+    inserted.update(run(scale_counts(scale), seed=seed, batch_size=batch_size))
+    invalidate_caches()
+    return inserted
+
+
+def clear():
+    """
+    Delete every row ``run()`` can create, and the files ``seed_site()``
+    uploads. Real user accounts are kept, and so are site settings: the seeded
+    keys are the real ones, so there is no telling seeded values apart.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Children go first, so plain DELETEs are enough: no related rows to
+        # collect, and no per-row signals on millions of rows.
+        for name, model, parents in reversed(STEPS):
+            table = connection.ops.quote_name(model._meta.db_table)
+            if model is MyUser:
+                password = connection.ops.quote_name(MyUser._meta.get_field("password").column)
+                cursor.execute(f"DELETE FROM {table} WHERE {password} = %s", [SEEDED_PASSWORD])
+            else:
+                cursor.execute(f"DELETE FROM {table}")
+        SettingFiles.objects.filter(name__startswith=SEED_FILE_PREFIX).delete()
\ No newline at end of file
@@ -1,6 +1,28 @@
-from django.db.models.signals import post_migrate
+import logging
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 from django.dispatch import receiver
-from apps.users.models import Settings
+from django.utils import timezone
+from apps.users.models import BlogComment, BlogPost, ContactMessage, MyExperience, MyWork, Settings
+from apps.users import counters
+from apps.users.images import IMAGE_FIELDS, discard_variants, is_current, variants_field
+from apps.users.registry import site_settings
+from apps.users.snapshot import SNAPSHOT_MODELS, invalidate_portfolio_snapshot
+from apps.users.tasks import generate_image_variants_task
+
+logger = logging.getLogger(__name__)
+
+# Admin search fields backed by a pg_trgm index. The admin's ``icontains``
+# compiles to ``UPPER("field"::text) LIKE UPPER('%term%')`` on PostgreSQL,
+# so the indexes are built on that same expression.
+TRIGRAM_SEARCH_FIELDS = {
+    ContactMessage: ("name", "email", "message"),
+    BlogComment: ("name", "email", "body"),
+    MyWork: ("title", "subtext", "description"),
+    MyExperience: ("title", "company", "description"),
+}
 
 @receiver(post_migrate)
 def create_default_settings(sender, **kwargs):
@@ -25,3 +47,165 @@ def create_default_settings(sender, **kwargs):
             key=item["key"],
             defaults={"value": item["value"]}
         )
+
+
+@receiver(post_migrate)
+def create_search_indexes(sender, using="default", **kwargs):
+    """
+    Create PostgreSQL-only indexes that cannot be declared in Meta.indexes
+    without breaking SQLite: the GIN index on BlogPost.search_vector and the
+    trigram indexes for ``TRIGRAM_SEARCH_FIELDS``.
+    """
+    if sender.name != "apps.users":
+        return
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS blogpost_search_vector_idx "
+            f"ON {quote(BlogPost._meta.db_table)} USING gin ({quote('search_vector')})"
+        )
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError as e:
+            logger.warning(f"pg_trgm is not available, admin search stays unindexed: {e}")
+            return
+        for model, fields in TRIGRAM_SEARCH_FIELDS.items():
+            table = model._meta.db_table
+            for field in fields:
+                column = model._meta.get_field(field).column
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {quote(f'{table}_{column}_trgm_idx')} "
+                    f"ON {quote(table)} USING gin ((UPPER({quote(column)}::text)) gin_trgm_ops)"
+                )
+
+
+def schedule_snapshot_invalidation(sender, **kwargs):
+    """
+    Invalidate the portfolio snapshot once the surrounding transaction
+    commits, so readers never see a snapshot built from uncommitted rows.
+    A transaction saving many rows (admin inlines, bulk commands) schedules
+    this once.
+    """
+    if kwargs.get("action", "post_").startswith("pre_"):
+        return
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        # A callback registered in this savepoint or an enclosing one is
+        # only discarded together with the change being made now.
+        active = set(connection.savepoint_ids)
+        if any(func is invalidate_portfolio_snapshot and savepoints <= active
+               for savepoints, func, robust in connection.run_on_commit):
+            return
+    transaction.on_commit(invalidate_portfolio_snapshot)
+
+
+for model in SNAPSHOT_MODELS:
+    post_save.connect(schedule_snapshot_invalidation, sender=model, dispatch_uid=f"snapshot_save_{model.__name__}")
+    post_delete.connect(schedule_snapshot_invalidation, sender=model, dispatch_uid=f"snapshot_delete_{model.__name__}")
+# The admin edits technologies through an inline on the through model, which
+# fires post_save/post_delete rather than m2m_changed.
+WorkTechnology = MyWork.technologies.through
+post_save.connect(schedule_snapshot_invalidation, sender=WorkTechnology, dispatch_uid="snapshot_save_work_technology")
+post_delete.connect(schedule_snapshot_invalidation, sender=WorkTechnology, dispatch_uid="snapshot_delete_work_technology")
+m2m_changed.connect(schedule_snapshot_invalidation, sender=WorkTechnology, dispatch_uid="snapshot_work_technologies")
+
+
+def touch_work(sender, instance, **kwargs):
+    """
+    Bump ``MyWork.updated_at`` when its technologies change, so the works
+    endpoints' ETag validators see the change.
+    """
+    if isinstance(instance, WorkTechnology):
+        work_ids = [instance.mywork_id]
+    elif kwargs.get("reverse"):
+        work_ids = kwargs.get("pk_set") or []
+    else:
+        work_ids = [instance.pk]
+    if kwargs.get("action", "post_").startswith("pre_") or not work_ids:
+        return
+    MyWork.objects.filter(pk__in=work_ids).update(updated_at=timezone.now())
+
+
+post_save.connect(touch_work, sender=WorkTechnology, dispatch_uid="touch_work_save_technology")
+post_delete.connect(touch_work, sender=WorkTechnology, dispatch_uid="touch_work_delete_technology")
+m2m_changed.connect(touch_work, sender=WorkTechnology, dispatch_uid="touch_work_technologies")
+
+
+@receiver(post_save, sender=Settings, dispatch_uid="settings_registry_save")
+@receiver(post_delete, sender=Settings, dispatch_uid="settings_registry_delete")
+def invalidate_settings_registry(sender, **kwargs):
+    """Make every process reload the settings registry after the change commits."""
+    site_settings.clear()
+    transaction.on_commit(site_settings.invalidate)
+
+
+def schedule_image_variants(sender, instance, **kwargs):
+    """
+    Enqueue variant generation when an image field got a new upload. Saves that
+    leave the image untouched enqueue nothing; stale variants of a replaced or
+    cleared image are dropped right away so the API never serves them, and
+    their files are deleted after commit unless another row shares them.
+    """
+    for field_name in IMAGE_FIELDS[sender]:
+        if is_current(instance, field_name):
+            continue
+        stale = getattr(instance, variants_field(field_name))
+        if stale:
+            sender.objects.filter(pk=instance.pk).update(**{variants_field(field_name): {}})
+            setattr(instance, variants_field(field_name), {})
+            transaction.on_commit(lambda stale=stale: discard_variants(stale), robust=True)
+        if getattr(instance, field_name):
+            transaction.on_commit(
+                lambda field_name=field_name: generate_image_variants_task.delay(
+                    sender._meta.label, instance.pk, field_name),
+                robust=True,
+            )
+
+
+def delete_image_variants(sender, instance, **kwargs):
+    """Delete a removed row's variant files once no other row shares them."""
+    for field_name in IMAGE_FIELDS[sender]:
+        variants = getattr(instance, variants_field(field_name))
+        if variants:
+            transaction.on_commit(lambda variants=variants: discard_variants(variants), robust=True)
+
+
+for model in IMAGE_FIELDS:
+    post_save.connect(schedule_image_variants, sender=model, dispatch_uid=f"image_variants_{model.__name__}")
+    post_delete.connect(delete_image_variants, sender=model, dispatch_uid=f"image_variants_delete_{model.__name__}")
+
+
+@receiver(post_save, sender=BlogComment, dispatch_uid="comment_count_save")
+def increment_comment_count(sender, instance, created, **kwargs):
+    """
+    Keep ``BlogPost.comment_count`` in step with its comments with an atomic
+    ``F()`` update, so concurrent comments are never lost. ``updated_at`` moves
+    too, so the blog endpoints' validators see the new count.
+    """
+    if created:
+        BlogPost.objects.filter(pk=instance.post_id).update(
+            comment_count=F("comment_count") + 1, updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=BlogComment, dispatch_uid="comment_count_delete")
+def decrement_comment_count(sender, instance, **kwargs):
+    BlogPost.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=BlogPost, dispatch_uid="view_ranking_save")
+def update_view_ranking(sender, instance, **kwargs):
+    """Keep the "most read" ranking to published posts, with their current title and slug."""
+    if instance.status == BlogPost.Status.PUBLISHED:
+        transaction.on_commit(lambda: counters.remember(instance))
+    else:
+        transaction.on_commit(lambda: counters.forget(instance.pk))
+
+
+@receiver(post_delete, sender=BlogPost, dispatch_uid="view_ranking_delete")
+def drop_from_view_ranking(sender, instance, **kwargs):
+    post_id = instance.pk
+    transaction.on_commit(lambda: counters.forget(post_id))
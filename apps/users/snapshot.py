@@ -0,0 +1,135 @@
+"""
+Precomputed portfolio snapshot.
+
+The public site needs skills, works, achievements, experiences, settings and
+setting files on every page load. Instead of serving six endpoints, the whole
+document is built once and stored in the shared cache.
+
+Changing one of the underlying models (see ``apps.users.signals``) does not
+rebuild it: ``invalidate_portfolio_snapshot()`` replaces a version token once
+per transaction, and the next read builds the document for the new version.
+A build that raced with a change is stored under the version it started from,
+which nobody reads any more, so a stale document can never be served for the
+current version. Superseded documents expire after ``PORTFOLIO_SNAPSHOT_TIMEOUT``.
+"""
+
+import json
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from apps.core.utils.conditional import make_etag
+
+from apps.users.api.v1.serializers import (MyAchievementSerializer, MyExperienceSerializer,
+                                           MySkillSerializer, MyWorkSerializer,
+                                           SettingsFilesSerializer)
+from apps.users.models import MyAchievement, MyExperience, MySkill, MyWork, SettingFiles, Settings, Technology
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_SNAPSHOT_VERSION_KEY = "portfolio:snapshot:version"
+PORTFOLIO_SNAPSHOT_TIMEOUT = 24 * 3600
+# Models whose rows appear in the snapshot; changing any of them invalidates it.
+SNAPSHOT_MODELS = (MySkill, MyWork, Technology, MyAchievement, MyExperience, Settings, SettingFiles)
+
+
+def build_portfolio_snapshot():
+    """
+    Serialize every portfolio section into a single document.
+
+    No request is passed to the serializers, so media URLs are relative to
+    ``MEDIA_URL`` and the document is the same for every visitor.
+    """
+    context = {'request': None}
+    # Rebuilt right after a change, possibly in another process: a lagging
+    # replica would store the old rows under the new version.
+    db = DEFAULT_DB_ALIAS
+    works = MyWork.objects.using(db).prefetch_related('technologies')
+    return {
+        "skills": MySkillSerializer(MySkill.objects.using(db), many=True, context=context).data,
+        "works": MyWorkSerializer(works, many=True, context=context).data,
+        "achievements": MyAchievementSerializer(MyAchievement.objects.using(db), many=True, context=context).data,
+        "experiences": MyExperienceSerializer(MyExperience.objects.using(db), many=True, context=context).data,
+        "settings": [{"key": key, "value": value}
+                     for key, value in Settings.objects.using(db).values_list('key', 'value')],
+        "files": SettingsFilesSerializer(SettingFiles.objects.using(db), many=True, context=context).data,
+    }
+
+
+def snapshot_key(version):
+    return f"portfolio:snapshot:{version}"
+
+
+def invalidate_portfolio_snapshot():
+    """Start a new snapshot version; the next read rebuilds the document."""
+    try:
+        cache.set(PORTFOLIO_SNAPSHOT_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    except Exception as e:
+        # A cache outage must not break admin saves or migrations.
+        logger.error(f"Failed to invalidate portfolio snapshot: {e}")
+
+
+def current_version():
+    """The current version token, creating one if the cache lost it."""
+    cache.add(PORTFOLIO_SNAPSHOT_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    return cache.get(PORTFOLIO_SNAPSHOT_VERSION_KEY)
+
+
+def refresh_portfolio_snapshot(version=None):
+    """
+    Build the snapshot for ``version`` (default: the current one) and store
+    it, together with the ETag and Last-Modified validators for conditional
+    GETs. The version must be read before the rows are.
+    """
+    try:
+        version = version or current_version()
+    except Exception as e:
+        logger.error(f"Failed to read portfolio snapshot version: {e}")
+    results = build_portfolio_snapshot()
+    snapshot = {
+        "etag": make_etag(json.dumps(results, sort_keys=True, default=str)),
+        "last_modified": timezone.now(),
+        "results": results,
+    }
+    if version:
+        try:
+            cache.set(snapshot_key(version), snapshot, timeout=PORTFOLIO_SNAPSHOT_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Failed to store portfolio snapshot: {e}")
+    return snapshot
+
+
+def get_portfolio_snapshot():
+    """
+    Return the cached snapshot entry (``etag``, ``last_modified``, ``results``).
+    A hit is two cache GETs (version, then document); a miss (first read of a
+    version, eviction) rebuilds and stores it.
+    """
+    try:
+        version = cache.get(PORTFOLIO_SNAPSHOT_VERSION_KEY)
+        snapshot = cache.get(snapshot_key(version)) if version else None
+    except Exception as e:
+        logger.error(f"Failed to read portfolio snapshot: {e}")
+        version = snapshot = None
+    if snapshot is None:
+        logger.info("Portfolio snapshot cache miss, rebuilding")
+        snapshot = refresh_portfolio_snapshot(version)
+    return snapshot
+
+
+async def aget_portfolio_snapshot():
+    """Async variant of ``get_portfolio_snapshot`` using the async cache API."""
+    try:
+        version = await cache.aget(PORTFOLIO_SNAPSHOT_VERSION_KEY)
+        snapshot = await cache.aget(snapshot_key(version)) if version else None
+    except Exception as e:
+        logger.error(f"Failed to read portfolio snapshot: {e}")
+        version = snapshot = None
+    if snapshot is None:
+        logger.info("Portfolio snapshot cache miss, rebuilding")
+        snapshot = await sync_to_async(refresh_portfolio_snapshot)(version)
+    return snapshot
@@ -1,47 +1,105 @@
+import time
+
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.conf import settings
-from django.utils import timezone
-from apps.users.models import Settings
+from celery.signals import task_failure, task_postrun, task_prerun, worker_process_shutdown
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS
+from apps.core.metrics import TASK_DURATION, TASK_FAILURES
+from apps.core.utils.mailsender import build_support_email, smtp_pool
+from apps.users.registry import site_settings
+
+
+def support_email(name, email, subject="Contact Message", message="Thanks for reaching out!", from_email=None):
+    """
+    Build the contact support email, branded with the site settings.
+    """
+    return build_support_email(
+        name, email, subject, message, from_email,
+        website_url=site_settings.get("website_url", "https://default.url"),
+        website_name=site_settings.get("website_name", "My Website"),
+        website_logo=site_settings.get("website_logo", "/static/default_logo.png"),
+    )
+
 
 @shared_task
 def send_support_email_task(name, email, subject="Contact Message", message="Thanks for reaching out!", from_email=None):
     """
     Send an email to the provided email address when a new contact message is submitted.
     """
-    if from_email is None:
-        from_email = settings.DEFAULT_FROM_EMAIL
-    def get_setting(key, default=None):
-        """Helper to get a setting value by key."""
-        setting = Settings.objects.filter(key=key).first()
-        return setting.value if setting else default
-
-    website_url = get_setting("website_url", "https://default.url")
-    website_name = get_setting("website_name", "My Website")
-    website_logo = get_setting("website_logo", "/static/default_logo.png")
-
-    context = {
-        'website_url': website_url,
-        'website_name': website_name,
-        'logo': website_logo,
-        'name': name,
-        'email': email,
-        'from_email': from_email,
-        'message': message,
-        'year': timezone.now().year,
-    }
-
-
-    email_subject = f"📩 New Contact Message: {subject}"
-    html_content = render_to_string("email/contact_support.html", context)
-    text_content = render_to_string("email/contact_support.txt", context)
-
-    msg = EmailMultiAlternatives(
-        subject=email_subject,
-        body=text_content,
-        from_email=from_email,
-        to=[email],  # send to the email parameter
-    )
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    smtp_pool.send_messages([support_email(name, email, subject, message, from_email)])
+
+
+@shared_task
+def send_support_emails_batch_task(payloads):
+    """
+    Send many support emails over a single pooled connection.
+
+    ``payloads`` is a list of ``send_support_email_task`` keyword arguments.
+    """
+    return smtp_pool.send_messages([support_email(**payload) for payload in payloads])
+
+
+@worker_process_shutdown.connect
+def close_smtp_connections(**kwargs):
+    smtp_pool.close_all()
+
+
+# Tasks whose run time and failures are exported by apps.core.metrics.
+INSTRUMENTED_TASKS = {send_support_email_task.name, send_support_emails_batch_task.name}
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    if task.name in INSTRUMENTED_TASKS:
+        _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@task_failure.connect
+def count_task_failure(sender=None, exception=None, **kwargs):
+    if sender.name in INSTRUMENTED_TASKS:
+        TASK_FAILURES.labels(sender.name, type(exception).__name__).inc()
+
+
+@shared_task
+def generate_image_variants_task(model_label, pk, field_name):
+    """
+    Build the responsive WebP/AVIF variants of one image field.
+    """
+    from apps.users.images import generate_variants
+
+    # Queued on commit of the upload: a lagging replica may not have the row yet.
+    instance = apps.get_model(model_label).objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).first()
+    if instance is None:
+        return False
+    return generate_variants(instance, field_name)
+
+
+@shared_task(ignore_result=True)
+def relay_email_outbox():
+    """
+    Deliver due emails from the outbox (see apps.users.outbox). Runs from
+    Celery beat; overlapping runs are safe.
+    """
+    from apps.users.outbox import relay
+
+    return relay()
+
+
+
+@shared_task(ignore_result=True)
+def flush_blog_view_counts():
+    """
+    Add the blog views buffered in Redis to ``BlogPost.view_count`` (see
+    apps.users.counters). Runs from Celery beat.
+    """
+    from apps.users.counters import flush
+
+    return flush()
@@ -1,3 +1,1515 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import shutil
+import smtplib
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from io import BytesIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpResponse
+from django.test import (AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core import db_router, health, metrics, throttling
+from apps.core.renderers import FastJSONRenderer
+from apps.core.utils import redis_client
+from apps.core.utils.images import variants_exist
+from apps.core.utils.mailsender import smtp_pool
+from apps.core.utils import EstimatedCountPaginator, KeysetPagination, build_envelope, stream_export_response
+from apps.users.api.v1 import async_views, fast_serializers, serializers
+from apps.users.api.v1.views import ContactIPThrottle
+from apps.users.models import (BlogComment, BlogPost, ContactMessage, EmailOutbox, MyAchievement, MyExperience, MySkill,
+                               MyUser, MyWork, RequestAuditLog, SettingFiles, Settings, Technology)
+from apps.users import counters, outbox, seeding
+from apps.users.api.v1 import urls as v1_urls
+from apps.users.management.commands.bench_http import route_requests
+from apps.users.audit import AuditLogBuffer, audit_buffer
+from apps.users.middlewares import (
+    HealthCheckMiddleware, MetricsMiddleware, ReplicaStickinessMiddleware, RequestAuditMiddleware,
+)
+from apps.users.registry import site_settings
+from apps.users.snapshot import (current_version, get_portfolio_snapshot, invalidate_portfolio_snapshot,
+                                 refresh_portfolio_snapshot)
+from apps.users.images import generate_variants
+from apps.users.tasks import (generate_image_variants_task, send_support_email_task,
+                              send_support_emails_batch_task)
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests",
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PortfolioSnapshotTests(TestCase):
+    url = "/api/v1/portfolio/"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_hit_runs_no_queries(self):
+        MySkill.objects.create(name="Django", percentage=90)
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"]["skills"][0]["name"], "Django")
+
+    def test_one_invalidation_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            work = MyWork.objects.create(title="Portfolio", subtext="s", description="d")
+            work.technologies.add(*Technology.objects.bulk_create([Technology(name="Django"), Technology(name="DRF")]))
+            MySkill.objects.create(name="Django")
+        self.assertEqual(callbacks, [invalidate_portfolio_snapshot])
+
+    def test_invalidation_survives_a_rolled_back_savepoint(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    MySkill.objects.create(name="Rolled back")
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+            MySkill.objects.create(name="Kept")
+        self.assertEqual(callbacks, [invalidate_portfolio_snapshot])
+
+    def test_build_that_raced_a_change_is_not_served(self):
+        MySkill.objects.create(name="Old")
+        version = current_version()
+        invalidate_portfolio_snapshot()
+        # A build that read the old version finishes after the invalidation.
+        refresh_portfolio_snapshot(version)
+        MySkill.objects.update(name="New")
+        self.assertEqual(get_portfolio_snapshot()["results"]["skills"][0]["name"], "New")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PortfolioSnapshotInvalidationTests(TransactionTestCase):
+    """Real commits: inside TestCase's transaction every change shares one invalidation."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_snapshot_is_rebuilt_when_models_change(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d")
+        self.assertEqual(get_portfolio_snapshot()["results"]["works"][0]["technologies"], [])
+
+        work.technologies.add(Technology.objects.create(name="Django"))
+        self.assertEqual(get_portfolio_snapshot()["results"]["works"][0]["technologies"], ["Django"])
+
+        Settings.objects.update_or_create(key="github", defaults={"value": "https://github.com/me"})
+        settings_section = get_portfolio_snapshot()["results"]["settings"]
+        self.assertIn({"key": "github", "value": "https://github.com/me"}, settings_section)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueryBudgetTests(TestCase):
+    """
+    Every v1 endpoint must run a fixed number of queries no matter how many
+    rows it returns. A failure here usually means a new N+1. Read endpoints
+    include one aggregate query per model for their conditional-GET validators.
+    """
+    ROWS = 300
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        now = timezone.now()
+        technologies = Technology.objects.bulk_create(
+            Technology(name=f"Technology {i}") for i in range(cls.ROWS))
+        works = MyWork.objects.bulk_create(
+            MyWork(title=f"Work {i}", subtext="subtext", description="description", order=i)
+            for i in range(cls.ROWS))
+        MyWork.technologies.through.objects.bulk_create(
+            MyWork.technologies.through(mywork_id=work.id, technology_id=technologies[(i + j) % cls.ROWS].id)
+            for i, work in enumerate(works) for j in range(5))
+        MySkill.objects.bulk_create(MySkill(name=f"Skill {i}", order=i) for i in range(cls.ROWS))
+        MyAchievement.objects.bulk_create(
+            MyAchievement(title=f"Achievement {i}", organization="org", date=today, order=i)
+            for i in range(cls.ROWS))
+        MyExperience.objects.bulk_create(
+            MyExperience(title=f"Experience {i}", company="company", description="description",
+                         start_date=today - timedelta(days=i), order=i)
+            for i in range(cls.ROWS))
+        BlogPost.objects.bulk_create(
+            BlogPost(title=f"Post {i}", slug=f"post-{i}", content="content",
+                     status=BlogPost.Status.PUBLISHED, published_at=now - timedelta(minutes=i))
+            for i in range(cls.ROWS))
+        SettingFiles.objects.bulk_create(
+            SettingFiles(name=f"File {i}", file=f"settings_files/file-{i}.pdf") for i in range(cls.ROWS))
+        cls.work = works[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def assertQueryBudget(self, url, budget):
+        with self.assertNumQueries(budget):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def test_skills(self):
+        self.assertQueryBudget("/api/v1/skills/", 2)
+
+    def test_works_list(self):
+        response = self.assertQueryBudget("/api/v1/works/", 4)
+        self.assertEqual(len(response.json()["results"][0]["technologies"]), 5)
+
+    def test_work_detail(self):
+        self.assertQueryBudget(f"/api/v1/works/{self.work.id}/", 4)
+
+    def test_achievements(self):
+        self.assertQueryBudget("/api/v1/achievements/", 2)
+
+    def test_experiences(self):
+        self.assertQueryBudget("/api/v1/experiences/", 2)
+
+    def test_blog_list(self):
+        response = self.assertQueryBudget("/api/v1/blog/", 1)
+        self.assertEqual(len(response.json()["results"]), 10)
+
+    def test_blog_list_deep_page(self):
+        cursor = KeysetPagination().encode_cursor([timezone.now() - timedelta(minutes=250), 1])
+        self.assertQueryBudget(f"/api/v1/blog/?cursor={cursor}", 1)
+
+    def test_blog_detail(self):
+        self.assertQueryBudget("/api/v1/blog/post-0/", 1)
+
+    def test_settings(self):
+        site_settings.clear()
+        self.assertQueryBudget("/api/v1/settings/", 1)
+        self.assertQueryBudget("/api/v1/settings/", 0)
+
+    def test_settings_files(self):
+        self.assertQueryBudget("/api/v1/settings/files/", 2)
+
+    def test_portfolio_snapshot(self):
+        self.assertQueryBudget("/api/v1/portfolio/", 7)
+        self.assertQueryBudget("/api/v1/portfolio/", 0)
+
+    def test_contact(self):
+        # Two INSERTs (message and outbox row) inside one savepoint.
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                "/api/v1/contact/", {"name": "Visitor", "email": "visitor@example.com", "message": "Hello"})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.skill = MySkill.objects.create(name="Django", percentage=90)
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        response = self.client.get("/api/v1/skills/")
+        with self.assertNumQueries(1):
+            not_modified = self.client.get("/api/v1/skills/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_etag_changes_on_update_and_delete(self):
+        etag = self.client.get("/api/v1/skills/")["ETag"]
+        self.skill.save()
+        updated_etag = self.client.get("/api/v1/skills/")["ETag"]
+        self.assertNotEqual(etag, updated_etag)
+        MySkill.objects.create(name="DRF")
+        created_etag = self.client.get("/api/v1/skills/")["ETag"]
+        self.assertNotEqual(updated_etag, created_etag)
+        # Deleting an older row leaves Max('updated_at') untouched; the count catches it.
+        self.skill.delete()
+        self.assertNotEqual(created_etag, self.client.get("/api/v1/skills/")["ETag"])
+
+    def test_no_last_modified_for_sets_that_can_shrink(self):
+        MySkill.objects.create(name="DRF")
+        response = self.client.get("/api/v1/skills/")
+        self.assertNotIn("Last-Modified", response.headers)
+        self.skill.delete()
+        response = self.client.get("/api/v1/skills/", HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_blog_list_etag_covers_only_the_page_served(self):
+        posts = [BlogPost.objects.create(title=f"Post {i}", slug=f"post-{i}", content="c",
+                                         status=BlogPost.Status.PUBLISHED) for i in range(4)]
+        url = "/api/v1/blog/?page_size=2"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Beyond the page and the row telling whether there is a next one.
+        posts[0].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Deleting a listed post brings in another one without moving any updated_at.
+        BlogPost.objects.filter(pk=posts[3].pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_blog_detail_etag_follows_the_post(self):
+        post = BlogPost.objects.create(title="Post", slug="post", content="c", status=BlogPost.Status.PUBLISHED)
+        etag = self.client.get("/api/v1/blog/post/")["ETag"]
+        self.assertEqual(self.client.get("/api/v1/blog/post/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        post.save()
+        self.assertEqual(self.client.get("/api/v1/blog/post/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_work_etag_changes_when_technologies_change(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d")
+        etag = self.client.get(f"/api/v1/works/{work.id}/")["ETag"]
+        work.technologies.add(Technology.objects.create(name="Django"))
+        response = self.client.get(f"/api/v1/works/{work.id}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_portfolio_snapshot_revalidates_from_cache(self):
+        etag = self.client.get("/api/v1/portfolio/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/portfolio/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class BlogPaginationTests(TestCase):
+    def test_cursor_walks_every_post_once(self):
+        published_at = timezone.now()
+        # Several posts share a timestamp, so the id tie-breaker matters.
+        BlogPost.objects.bulk_create(
+            BlogPost(title=f"Post {i}", slug=f"post-{i}", content="content",
+                     status=BlogPost.Status.PUBLISHED, published_at=published_at - timedelta(hours=i // 3))
+            for i in range(25))
+        BlogPost.objects.create(title="Draft", slug="draft", content="content")
+
+        seen = []
+        url = "/api/v1/blog/?page_size=4"
+        while url:
+            body = self.client.get(url).json()
+            seen += [post["slug"] for post in body["results"]]
+            url = body["next"]
+        expected = list(BlogPost.objects.filter(status=BlogPost.Status.PUBLISHED)
+                        .order_by("-published_at", "-id").values_list("slug", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get("/api/v1/blog/?cursor=garbage").status_code, 404)
+
+    def test_seek_filter_leads_with_an_index_range(self):
+        paginator = KeysetPagination()
+        paginator.ordering = ("-published_at", "-id")
+        queryset = BlogPost.objects.filter(paginator.seek_filter([timezone.now(), 7]))
+        where = str(queryset.query).split(" WHERE ", 1)[1]
+        self.assertTrue(where.startswith('("users_blogpost"."published_at" <= '), where)
+
+    def test_published_post_without_date_is_not_listed(self):
+        BlogPost.objects.create(title="Dated", slug="dated", content="content", status=BlogPost.Status.PUBLISHED)
+        BlogPost.objects.bulk_create([BlogPost(title="Undated", slug="undated", content="content",
+                                               status=BlogPost.Status.PUBLISHED)])
+        body = self.client.get("/api/v1/blog/?page_size=1").json()
+        self.assertEqual([post["slug"] for post in body["results"]], ["dated"])
+        self.assertIsNone(body["next"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BlogCommentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = BlogPost.objects.create(title="Post", slug="post", content="c", status=BlogPost.Status.PUBLISHED)
+        self.url = "/api/v1/blog/post/comments/"
+
+    def test_cursor_walks_comments_oldest_first(self):
+        created_at = timezone.now()
+        comments = BlogComment.objects.bulk_create(
+            BlogComment(post=self.post, name=f"Reader {i}", email=f"r{i}@example.com", body="b")
+            for i in range(9))
+        # Several comments share a timestamp, so the id tie-breaker matters.
+        for i, comment in enumerate(comments):
+            BlogComment.objects.filter(pk=comment.pk).update(created_at=created_at + timedelta(minutes=i // 3))
+
+        seen = []
+        url = self.url + "?page_size=4"
+        while url:
+            with self.assertNumQueries(2):
+                body = self.client.get(url).json()
+            seen += [comment["id"] for comment in body["results"]]
+            url = body["next"]
+        self.assertEqual(seen, [comment.pk for comment in comments])
+        self.assertNotIn("email", body["results"][0])
+
+    def test_posting_maintains_comment_count(self):
+        response = self.client.post(self.url, {"name": "Reader", "email": "reader@example.com", "body": "Hi"},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("email", response.json()["results"])
+        BlogComment.objects.create(post=self.post, name="Other", email="other@example.com", body="Hello")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+        # The page is the only query (its rows give the ETag), however many posts are listed.
+        with self.assertNumQueries(1):
+            results = self.client.get("/api/v1/blog/").json()["results"]
+        self.assertEqual(results[0]["comment_count"], 2)
+
+        BlogComment.objects.filter(name="Other").delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_drafts_and_invalid_comments_are_rejected(self):
+        BlogPost.objects.create(title="Draft", slug="draft", content="c")
+        self.assertEqual(self.client.get("/api/v1/blog/draft/comments/").status_code, 404)
+        response = self.client.post(self.url, {"name": "Reader", "email": "not-an-email", "body": ""},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BlogComment.objects.exists())
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands used by apps.users.counters."""
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def encode(value):
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = self.encode(value)
+        return True
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def register_script(self, script):
+        assert script == counters.RELEASE_LOCK_SCRIPT
+
+        def release_lock(keys, args):
+            if self.data.get(keys[0]) != self.encode(args[0]):
+                return 0
+            return self.delete(keys[0])
+        return release_lock
+
+    def rename(self, key, new_key):
+        self.data[new_key] = self.data.pop(key)
+
+    def hincrby(self, key, field, amount):
+        values = self.data.setdefault(key, {})
+        field = self.encode(field)
+        values[field] = self.encode(int(values.get(field, 0)) + amount)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.data.setdefault(key, {})
+        for name, item in (mapping or {field: value}).items():
+            values[self.encode(name)] = self.encode(item)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(self.encode(field)) for field in fields]
+
+    def hdel(self, key, field):
+        self.data.get(key, {}).pop(self.encode(field), None)
+
+    def zincrby(self, key, amount, member):
+        scores = self.data.setdefault(key, {})
+        member = self.encode(member)
+        scores[member] = scores.get(member, 0.0) + amount
+
+    def zadd(self, key, mapping, gt=False):
+        scores = self.data.setdefault(key, {})
+        for member, score in mapping.items():
+            member = self.encode(member)
+            if not gt or score > scores.get(member, float("-inf")):
+                scores[member] = float(score)
+
+    def zscore(self, key, member):
+        return self.data.get(key, {}).get(self.encode(member))
+
+    def zrem(self, key, member):
+        self.data.get(key, {}).pop(self.encode(member), None)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.data.get(key, {}).items(), key=lambda item: (-item[1], item[0]))
+        return ranked[start:end + 1]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BlogViewCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = FakeRedis()
+        patcher = mock.patch("apps.users.counters.get_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.posts = [
+            BlogPost.objects.create(title=f"Post {i}", slug=f"post-{i}", content="c", status=BlogPost.Status.PUBLISHED)
+            for i in range(3)
+        ]
+
+    def view(self, slug, times=1):
+        for _ in range(times):
+            self.assertEqual(self.client.get(f"/api/v1/blog/{slug}/").status_code, 200)
+
+    def test_views_are_flushed_in_one_update(self):
+        self.view("post-0", 3)
+        self.view("post-2")
+        BlogPost.objects.create(title="Draft", slug="draft", content="c")
+        self.view("draft")
+        self.assertFalse(BlogPost.objects.filter(view_count__gt=0).exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(counters.flush(), 4)
+        self.assertEqual(len([q for q in queries if q["sql"].startswith("UPDATE")]), 1)
+        self.assertEqual(dict(BlogPost.objects.values_list("slug", "view_count")),
+                         {"post-0": 3, "post-1": 0, "post-2": 1, "draft": 0})
+        # New views after a flush start a new batch.
+        self.view("post-1")
+        self.assertEqual(counters.flush(), 1)
+        self.assertEqual(counters.flush(), 0)
+        self.assertEqual(BlogPost.objects.get(slug="post-1").view_count, 1)
+
+    def test_revalidated_views_are_counted(self):
+        etag = self.client.get("/api/v1/blog/post-0/")["ETag"]
+        self.assertEqual(self.client.get("/api/v1/blog/post-0/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        request = AsyncRequestFactory().get("/api/v1/blog/post-0/", headers={"If-None-Match": etag})
+        self.assertEqual(async_to_sync(async_views.blog)(request, slug="post-0").status_code, 304)
+        self.assertEqual(counters.flush(), 3)
+
+    def test_failed_flush_is_retried(self):
+        self.view("post-1", 2)
+        with mock.patch("apps.users.counters.apply_deltas", side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                counters.flush()
+        self.view("post-1")
+        self.assertEqual(counters.flush(), 2)
+        self.assertEqual(counters.flush(), 1)
+        self.assertEqual(BlogPost.objects.get(slug="post-1").view_count, 3)
+
+    def test_flush_releases_only_its_own_lock(self):
+        self.view("post-1")
+
+        def lock_expired_and_taken(deltas):
+            self.redis.set(counters.FLUSH_LOCK_KEY, "next-run")
+        with mock.patch("apps.users.counters.apply_deltas", side_effect=lock_expired_and_taken):
+            counters.flush()
+        self.assertEqual(self.redis.data[counters.FLUSH_LOCK_KEY], b"next-run")
+        self.assertEqual(counters.flush(), 0)
+
+    def test_most_read_is_served_from_redis(self):
+        self.view("post-1", 3)
+        self.view("post-2", 2)
+        with self.assertNumQueries(0):
+            results = self.client.get("/api/v1/blog/most-read/?limit=2").json()["results"]
+        self.assertEqual([(post["slug"], post["views"]) for post in results], [("post-1", 3), ("post-2", 2)])
+
+    def test_ranking_is_rebuilt_from_the_database(self):
+        BlogPost.objects.filter(slug="post-0").update(view_count=40)
+        counters.flush()
+        self.assertEqual(counters.most_read()[0], {"id": self.posts[0].id, "title": "Post 0", "slug": "post-0",
+                                                   "views": 40})
+
+
+class BlogSearchTests(TestCase):
+    def test_search_published_posts(self):
+        BlogPost.objects.create(title="Django caching", content="Redis", status=BlogPost.Status.PUBLISHED)
+        BlogPost.objects.create(title="Django drafts", content="Redis", status=BlogPost.Status.DRAFT)
+        BlogPost.objects.create(title="Celery", content="queues", status=BlogPost.Status.PUBLISHED)
+
+        body = self.client.get("/api/v1/blog/search/", {"q": "django"}).json()
+        self.assertEqual(body["count"], 1)
+        self.assertEqual(body["results"][0]["title"], "Django caching")
+
+    def test_missing_query_is_400(self):
+        self.assertEqual(self.client.get("/api/v1/blog/search/").status_code, 400)
+
+
+class FastSerializerTests(TestCase):
+    """The values()-based serializers must render exactly like their ModelSerializers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date(2024, 2, 29)
+        MySkill.objects.create(name="Django", icon="skills/dj ango.png", percentage=90, icon_variants={
+            "source": "skills/dj ango.png",
+            "formats": {"webp": {"640": "variants/ab/abc/640.webp", "320": "variants/ab/abc/320.webp"}},
+        })
+        MySkill.objects.create(name="No icon")
+        MyAchievement.objects.create(title="Award", organization="Org", image="achievements/a.png", date=today)
+        MyExperience.objects.create(title="Dev", company="Co", description="d", start_date=today)
+        MyExperience.objects.create(title="Lead", company="Co", description="d", start_date=today,
+                                    end_date=today + timedelta(days=1))
+        BlogPost.objects.create(title="Post", content="c", image="blog/p.jpg", status=BlogPost.Status.PUBLISHED)
+        post = BlogPost.objects.create(title="Draft", content="c", excerpt="e")
+        BlogComment.objects.create(post=post, name="Reader", email="reader@example.com", body="Nice")
+        SettingFiles.objects.create(name="CV", file="settings_files/cv.pdf")
+
+    def assertSameOutput(self, model_serializer, values_serializer, request):
+        queryset = values_serializer.model.objects.all()
+        expected = model_serializer(queryset, many=True, context={'request': request}).data
+        actual = values_serializer(context={'request': request}).serialize()
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_output_is_identical(self):
+        pairs = [
+            (serializers.MySkillSerializer, fast_serializers.MySkillValuesSerializer),
+            (serializers.MyAchievementSerializer, fast_serializers.MyAchievementValuesSerializer),
+            (serializers.MyExperienceSerializer, fast_serializers.MyExperienceValuesSerializer),
+            (serializers.BlogPostSerializer, fast_serializers.BlogPostValuesSerializer),
+            (serializers.BlogCommentSerializer, fast_serializers.BlogCommentValuesSerializer),
+            (serializers.SettingsFilesSerializer, fast_serializers.SettingsFilesValuesSerializer),
+        ]
+        for request in (RequestFactory().get("/"), None):
+            for model_serializer, values_serializer in pairs:
+                with self.subTest(serializer=values_serializer.__name__, request=request):
+                    self.assertSameOutput(model_serializer, values_serializer, request)
+
+
+class FastJSONRendererTests(TestCase):
+    def test_matches_drf_renderer(self):
+        work = MyWork.objects.create(title="Portf\u00f6lio \u2028", subtext="s", description="d", image="works/a.png")
+        work.technologies.add(Technology.objects.create(name="Django"))
+        data = build_envelope(
+            serializers.MyWorkSerializer(MyWork.objects.all(), many=True, context={'request': None}).data,
+            next=None)
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_responses_use_standard_envelope(self):
+        body = self.client.get("/api/v1/skills/").json()
+        self.assertEqual(list(body), ["success", "message", "results"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class SettingsRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        site_settings.clear()
+
+    def test_email_task_reads_settings_without_queries(self):
+        Settings.objects.update_or_create(key="website_name", defaults={"value": "Wahid"})
+        site_settings.all()
+        with self.assertNumQueries(0):
+            send_support_email_task("Visitor", "visitor@example.com", message="Hello")
+        self.assertIn("Wahid", mail.outbox[0].alternatives[0][0])
+
+    def test_change_in_another_process_is_picked_up(self):
+        self.assertNotEqual(site_settings.get("website_name"), "Changed")
+        # Simulate another worker: update the row without touching this
+        # process's copy, then publish a new version token.
+        Settings.objects.filter(key="website_name").update(value="Changed")
+        self.assertNotEqual(site_settings.get("website_name"), "Changed")
+        cache.set(site_settings.version_key, "new-version")
+        self.assertEqual(site_settings.get("website_name"), "Changed")
+
+    def test_saving_a_setting_invalidates_registry(self):
+        site_settings.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            Settings.objects.update_or_create(key="github", defaults={"value": "https://github.com/me"})
+        self.assertEqual(site_settings.get("github"), "https://github.com/me")
+
+    def test_deleted_setting_is_not_hidden_behind_if_modified_since(self):
+        response = self.client.get("/api/v1/settings/")
+        self.assertNotIn("Last-Modified", response.headers)
+        with self.captureOnCommitCallbacks(execute=True):
+            Settings.objects.filter(key="twitter").delete()
+        response = self.client.get("/api/v1/settings/", HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("twitter", [item["key"] for item in response.json()["results"]])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AsyncReadViewTests(TestCase):
+    """The async read views must return exactly what the DRF views return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image="works/a.png")
+        cls.work.technologies.add(Technology.objects.create(name="Django"))
+        MySkill.objects.create(name="Django", icon="skills/dj.png")
+        MyExperience.objects.create(title="Dev", company="Co", description="d", start_date=date(2024, 1, 1))
+        for i in range(12):
+            BlogPost.objects.create(title=f"Post {i}", content="c", status=BlogPost.Status.PUBLISHED)
+
+    def setUp(self):
+        cache.clear()
+        site_settings.clear()
+
+    async def assertSameAsSync(self, async_view, path, **kwargs):
+        expected = await sync_to_async(self.client.get)(path)
+        response = await async_view(AsyncRequestFactory().get(path), **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response.get("ETag"), expected.get("ETag"))
+        return response
+
+    async def test_responses_match_sync_views(self):
+        await self.assertSameAsSync(async_views.skills, "/api/v1/skills/")
+        await self.assertSameAsSync(async_views.experiences, "/api/v1/experiences/")
+        await self.assertSameAsSync(async_views.works, "/api/v1/works/")
+        await self.assertSameAsSync(async_views.works, f"/api/v1/works/{self.work.id}/", id=self.work.id)
+        await self.assertSameAsSync(async_views.blog, "/api/v1/blog/?page_size=5")
+        await self.assertSameAsSync(async_views.blog, "/api/v1/blog/post-3/", slug="post-3")
+        await self.assertSameAsSync(async_views.settings, "/api/v1/settings/")
+        await self.assertSameAsSync(async_views.portfolio, "/api/v1/portfolio/")
+
+    async def test_conditional_get_and_not_found(self):
+        response = await async_views.skills(AsyncRequestFactory().get("/api/v1/skills/"))
+        not_modified = await async_views.skills(
+            AsyncRequestFactory().get("/api/v1/skills/", headers={"If-None-Match": response["ETag"]}))
+        self.assertEqual(not_modified.status_code, 304)
+        await self.assertSameAsSync(async_views.works, "/api/v1/works/0/", id=0)
+        await self.assertSameAsSync(async_views.blog, "/api/v1/blog/missing/", slug="missing")
+
+    async def test_invalid_cursor_is_404_on_both_paths(self):
+        response = await self.assertSameAsSync(async_views.blog, "/api/v1/blog/?cursor=garbage")
+        self.assertEqual(response.status_code, 404)
+
+
+class TemporaryMediaMixin:
+    """Store uploads in a throwaway MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, IMAGE_VARIANT_WIDTHS=[32, 64, 1280], IMAGE_VARIANT_FORMATS=["avif", "webp"])
+class ImageVariantTests(TemporaryMediaMixin, TestCase):
+
+    def upload(self, name="photo.png", size=(200, 100)):
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, "PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def variant_files(self):
+        return [name for _, _, names in os.walk(os.path.join(settings.MEDIA_ROOT, "variants")) for name in names]
+
+    def test_only_new_uploads_enqueue_generation(self):
+        with mock.patch("apps.users.signals.generate_image_variants_task.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image=self.upload())
+            delay.assert_called_once_with("users.MyWork", work.pk, "image")
+            generate_image_variants_task(*delay.call_args.args)
+
+            work.refresh_from_db()
+            work.title = "Renamed"
+            with self.captureOnCommitCallbacks(execute=True):
+                work.save()
+            delay.assert_called_once()
+
+            work.image = self.upload("other.png")
+            with self.captureOnCommitCallbacks(execute=True):
+                work.save()
+            self.assertEqual(delay.call_count, 2)
+            self.assertEqual(MyWork.objects.get(pk=work.pk).image_variants, {})
+
+    def test_variants_are_resized_and_exposed_as_srcset(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image=self.upload())
+        self.assertTrue(generate_image_variants_task("users.MyWork", work.pk, "image"))
+        work.refresh_from_db()
+
+        names = work.image_variants["formats"]["webp"]
+        self.assertEqual(list(names), ["32", "64", "200"])
+        with default_storage.open(names["32"]) as fh, Image.open(fh) as variant:
+            self.assertEqual((variant.format, variant.size), ("WEBP", (32, 16)))
+
+        srcset = serializers.MyWorkSerializer(work, context={'request': None}).data["image_srcset"]
+        self.assertEqual(srcset["image/webp"], ", ".join(f"/media/{names[w]} {w}w" for w in ("32", "64", "200")))
+
+    def test_regeneration_is_content_addressed_and_idempotent(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image=self.upload())
+        generate_image_variants_task("users.MyWork", work.pk, "image")
+        with mock.patch("apps.users.images.render_variants") as render:
+            self.assertFalse(generate_image_variants_task("users.MyWork", work.pk, "image"))
+        render.assert_not_called()
+
+        # The same bytes uploaded elsewhere reuse the stored variants.
+        skill = MySkill.objects.create(name="Django", icon=self.upload("icon.png"))
+        generate_image_variants_task("users.MySkill", skill.pk, "icon")
+        skill.refresh_from_db()
+        work.refresh_from_db()
+        self.assertEqual(skill.icon_variants["formats"], work.image_variants["formats"])
+
+    def test_result_for_a_replaced_upload_is_discarded(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image=self.upload())
+        stale = MyWork.objects.get(pk=work.pk)
+        work.image = self.upload("other.png", size=(300, 100))
+        work.save()
+        self.assertFalse(generate_variants(stale, "image"))
+        self.assertEqual(MyWork.objects.get(pk=work.pk).image_variants, {})
+        self.assertEqual(self.variant_files(), [])
+
+    def test_replaced_and_deleted_variants_are_removed_unless_shared(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image=self.upload())
+        skill = MySkill.objects.create(name="Django", icon=self.upload("icon.png"))
+        generate_image_variants_task("users.MyWork", work.pk, "image")
+        generate_image_variants_task("users.MySkill", skill.pk, "icon")
+        work.refresh_from_db()
+        skill.refresh_from_db()
+        shared = work.image_variants["thumbnail"]
+
+        with mock.patch("apps.users.signals.generate_image_variants_task.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                work.image = self.upload("other.png", size=(300, 100))
+                work.save()
+        generate_image_variants_task("users.MyWork", work.pk, "image")
+        self.assertTrue(default_storage.exists(shared))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.delete()
+        self.assertFalse(default_storage.exists(shared))
+        work.refresh_from_db()
+        self.assertTrue(variants_exist(work.image_variants))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            work.delete()
+        self.assertEqual(self.variant_files(), [])
+
+    def test_thumbnail_is_a_square_crop(self):
+        work = MyWork.objects.create(title="Portfolio", subtext="s", description="d", image=self.upload())
+        generate_image_variants_task("users.MyWork", work.pk, "image")
+        work.refresh_from_db()
+        with default_storage.open(work.image_variants["thumbnail"]) as fh, Image.open(fh) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ("WEBP", (100, 100)))
+
+    def test_admin_changelist_uses_thumbnails(self):
+        self.client.force_login(MyUser.objects.create_superuser("admin@example.com", "password"))
+        ready = MyWork.objects.create(title="Ready", subtext="s", description="d", image=self.upload())
+        generate_image_variants_task("users.MyWork", ready.pk, "image")
+        ready.refresh_from_db()
+        pending = MyWork.objects.create(title="Pending", subtext="s", description="d", image=self.upload("new.png"))
+
+        with mock.patch("apps.users.tasks.generate_image_variants_task.delay") as delay:
+            for _ in range(2):
+                html = self.client.get("/admin/users/mywork/").content.decode()
+        self.assertIn(f'src="/media/{ready.image_variants["thumbnail"]}"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertNotIn(ready.image.url, html)
+        self.assertNotIn(pending.image.url, html)
+        delay.assert_called_once_with("users.MyWork", pending.pk, "image")
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SENDFILE_BACKEND="")
+class SettingFileDownloadTests(TemporaryMediaMixin, TestCase):
+    content = b"0123456789abcdef"
+
+    def setUp(self):
+        super().setUp()
+        self.file = SettingFiles.objects.create(
+            name="CV", file=SimpleUploadedFile("cv.pdf", self.content, content_type="application/pdf"))
+        self.url = f"/api/v1/settings/files/{self.file.id}/download/"
+        self.etag = f'"{self.file.checksum}"'
+
+    def test_listing_links_to_versioned_url(self):
+        item = self.client.get("/api/v1/settings/files/").json()["results"][0]
+        self.assertEqual(item["checksum"], hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(item["download_url"], f"http://testserver{self.url}{self.file.checksum[:16]}/")
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn("must-revalidate", response["Cache-Control"])
+
+    def test_range_requests(self):
+        cases = [("bytes=2-5", "bytes 2-5/16", b"2345"), ("bytes=-3", "bytes 13-15/16", b"def"),
+                 ("bytes=10-", "bytes 10-15/16", b"abcdef"), ("bytes=14-99", "bytes 14-15/16", b"ef")]
+        for header, content_range, body in cases:
+            with self.subTest(header=header):
+                response = self.client.get(self.url, headers={"Range": header})
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], content_range)
+                self.assertEqual(response["Content-Length"], str(len(body)))
+                self.assertEqual(b"".join(response.streaming_content), body)
+
+        response = self.client.get(self.url, headers={"Range": "bytes=16-"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */16")
+        # Multi-range and stale If-Range requests get the whole file.
+        self.assertEqual(self.client.get(self.url, headers={"Range": "bytes=0-1,4-5"}).status_code, 200)
+        response = self.client.get(self.url, headers={"Range": "bytes=0-1", "If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, headers={"Range": "bytes=0-1", "If-Range": self.etag})
+        self.assertEqual(response.status_code, 206)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url, headers={"If-None-Match": self.etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_versioned_url_is_immutable(self):
+        response = self.client.get(f"{self.url}{self.file.checksum[:16]}/")
+        self.assertIn("immutable", response["Cache-Control"])
+        response = self.client.get(f"{self.url}0000000000000000/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], f"{self.url}{self.file.checksum[:16]}/")
+
+    @override_settings(SENDFILE_BACKEND="nginx")
+    def test_proxy_offload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.file.file.name}")
+        self.assertEqual(response.content, b"")
+
+
+class ContactThrottleTests(TestCase):
+    url = "/api/v1/contact/"
+    payload = {"name": "Visitor", "email": "visitor@example.com", "message": "Hello"}
+
+    def setUp(self):
+        redis_client.reset()
+        self.addCleanup(redis_client.reset)
+
+    def limiter(self, slot=1, bucket=(1, b"0")):
+        """Stand-in for the Lua scripts: the slot and bucket decisions to return."""
+        def run_script(script, keys, args):
+            return slot if script == throttling.ACQUIRE_SLOT_SCRIPT else list(bucket)
+        return mock.patch("apps.core.throttling.run_script", side_effect=run_script)
+
+    def test_rate_limited_before_any_work(self):
+        with self.limiter(bucket=(0, b"12.5")), self.assertNumQueries(0):
+            response = self.client.post(self.url, self.payload)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "13")
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_concurrency_cap_sheds_load(self):
+        with self.limiter(slot=0), self.assertNumQueries(0):
+            response = self.client.post(self.url, self.payload)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_slot_is_released(self):
+        with self.limiter() as run_script, mock.patch.object(throttling, "get_redis") as get_redis:
+            self.assertEqual(self.client.post(self.url, self.payload).status_code, 200)
+        acquired = run_script.call_args_list[0].args
+        self.assertEqual(acquired[0], throttling.ACQUIRE_SLOT_SCRIPT)
+        get_redis.return_value.zrem.assert_called_once_with("concurrency:contact", acquired[2][1])
+
+    def test_ip_ident_ignores_spoofed_forwarded_for(self):
+        throttle = ContactIPThrottle()
+        request = RequestFactory().post(self.url, REMOTE_ADDR="10.0.0.2",
+                                        HTTP_X_FORWARDED_FOR="198.51.100.1, 203.0.113.9")
+        self.assertEqual(throttle.get_ident(request), "10.0.0.2")
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}):
+            self.assertEqual(throttle.get_ident(request), "203.0.113.9")
+
+    @override_settings(REDIS_URL="redis://127.0.0.1:1/0")
+    def test_fails_open_without_redis(self):
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, self.payload).status_code, 200)
+        self.assertEqual(ContactMessage.objects.count(), 2)
+        # The first failure short-circuits Redis for the next request.
+        self.assertIsNone(redis_client.get_redis())
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class EmailOutboxTests(TestCase):
+    payload = {"name": "Visitor", "email": "visitor@example.com", "message": "Hello"}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_contact_post_writes_outbox_in_same_transaction(self):
+        with mock.patch("apps.users.api.v1.views.enqueue_contact_email", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post("/api/v1/contact/", self.payload)
+        self.assertFalse(ContactMessage.objects.exists())
+        # The 500 above mails the ADMINS; only the support email matters here.
+        mail.outbox.clear()
+
+        self.client.post("/api/v1/contact/", self.payload)
+        row = EmailOutbox.objects.get()
+        self.assertEqual(row.contact_message, ContactMessage.objects.get())
+        self.assertEqual(row.payload, self.payload)
+        # Sending is left to the relay.
+        self.assertFalse([message for message in mail.outbox if self.payload["email"] in message.to])
+        self.assertEqual(mail.outbox, [])
+
+    def test_relay_sends_due_emails_once(self):
+        self.client.post("/api/v1/contact/", self.payload)
+        self.assertEqual(outbox.relay(), (1, 0))
+        self.assertEqual(outbox.relay(), (0, 0))
+        self.assertEqual([message.to for message in mail.outbox], [["visitor@example.com"]])
+        row = EmailOutbox.objects.get()
+        self.assertEqual((row.status, row.attempts), (EmailOutbox.Status.SENT, 1))
+
+    def test_failures_back_off_then_give_up(self):
+        row = EmailOutbox.objects.create(payload=self.payload)
+        with mock.patch("apps.users.outbox.deliver", side_effect=ConnectionError("smtp down")):
+            self.assertEqual(outbox.relay(), (0, 1))
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts), (EmailOutbox.Status.PENDING, 1))
+            self.assertGreater(row.available_at, timezone.now() + timedelta(seconds=20))
+            self.assertIn("smtp down", row.last_error)
+            # Not due yet.
+            self.assertEqual(outbox.relay(), (0, 0))
+
+            EmailOutbox.objects.filter(pk=row.pk).update(available_at=timezone.now(), attempts=outbox.MAX_ATTEMPTS - 1)
+            outbox.relay()
+        row.refresh_from_db()
+        self.assertEqual(row.status, EmailOutbox.Status.FAILED)
+
+    def test_claimed_rows_are_leased(self):
+        EmailOutbox.objects.create(payload=self.payload)
+        claimed = outbox.claim_batch()
+        self.assertEqual(len(claimed), 1)
+        # A relay that died after claiming leaves the row to be retried later.
+        self.assertEqual(outbox.claim_batch(), [])
+        EmailOutbox.objects.update(available_at=timezone.now())
+        self.assertEqual(outbox.claim_batch()[0].attempts, 2)
+
+
+class RecordingEmailBackend(BaseEmailBackend):
+    """Email backend that counts connections and can drop one like an SMTP server."""
+    opens = 0
+    sent = []
+    drop_next_send = False
+    # Drop the connection once this many messages have been delivered.
+    drop_at = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        RecordingEmailBackend.opens += 1
+        self.connection = object()
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, messages):
+        if RecordingEmailBackend.drop_next_send:
+            RecordingEmailBackend.drop_next_send = False
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        for message in messages:
+            if len(RecordingEmailBackend.sent) == RecordingEmailBackend.drop_at:
+                RecordingEmailBackend.drop_at = None
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            RecordingEmailBackend.sent.append(message)
+        return len(messages)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EMAIL_BACKEND="apps.users.tests.RecordingEmailBackend")
+class SMTPConnectionPoolTests(TestCase):
+    def setUp(self):
+        smtp_pool.close_all()
+        RecordingEmailBackend.opens = 0
+        RecordingEmailBackend.sent = []
+        RecordingEmailBackend.drop_at = None
+        site_settings.all()
+
+    def test_connection_is_reused_across_tasks(self):
+        for i in range(3):
+            send_support_email_task("Visitor", f"visitor{i}@example.com", message="Hello")
+        self.assertEqual(len(RecordingEmailBackend.sent), 3)
+        self.assertEqual(RecordingEmailBackend.opens, 1)
+
+    def test_reconnects_when_server_drops_connection(self):
+        send_support_email_task("Visitor", "visitor@example.com")
+        RecordingEmailBackend.drop_next_send = True
+        send_support_email_task("Visitor", "visitor@example.com")
+        self.assertEqual(len(RecordingEmailBackend.sent), 2)
+        self.assertEqual(RecordingEmailBackend.opens, 2)
+
+    def test_drop_mid_batch_resends_only_undelivered_messages(self):
+        payloads = [{"name": "Visitor", "email": f"visitor{i}@example.com"} for i in range(4)]
+        RecordingEmailBackend.drop_at = 2
+        self.assertEqual(send_support_emails_batch_task(payloads), 4)
+        self.assertEqual([m.to for m in RecordingEmailBackend.sent], [[p["email"]] for p in payloads])
+        self.assertEqual(RecordingEmailBackend.opens, 2)
+
+    @override_settings(EMAIL_POOL_MAX_MESSAGES=2)
+    def test_connections_are_retired_after_max_messages(self):
+        for _ in range(3):
+            send_support_email_task("Visitor", "visitor@example.com")
+        self.assertEqual(RecordingEmailBackend.opens, 2)
+
+    def test_batch_uses_one_connection(self):
+        payloads = [{"name": "Visitor", "email": f"visitor{i}@example.com"} for i in range(5)]
+        self.assertEqual(send_support_emails_batch_task(payloads), 5)
+        self.assertEqual([m.to for m in RecordingEmailBackend.sent], [[p["email"]] for p in payloads])
+        self.assertEqual(RecordingEmailBackend.opens, 1)
+
+    def test_outbox_relay_sends_batch_over_one_connection(self):
+        for i in range(3):
+            EmailOutbox.objects.create(payload={"name": "Visitor", "email": f"visitor{i}@example.com"})
+        self.assertEqual(outbox.relay(), (3, 0))
+        self.assertEqual(RecordingEmailBackend.opens, 1)
+
+
+AUDIT = {"ENABLED": True, "SAMPLE_RATE": 1.0, "MAX_QUEUE": 100, "BATCH_SIZE": 2, "FLUSH_INTERVAL": 60,
+         "EXCLUDE_PATHS": ["/health"]}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, REQUEST_AUDIT=AUDIT)
+@mock.patch.object(AuditLogBuffer, "ensure_flusher")
+class RequestAuditTests(TestCase):
+    """The flusher thread is not started here; tests call ``flush()`` themselves."""
+
+    def setUp(self):
+        cache.clear()
+        audit_buffer.drain(10 ** 6)
+        audit_buffer.dropped = 0
+
+    def test_requests_are_written_in_batches_off_the_request_path(self, ensure_flusher):
+        with self.assertNumQueries(2):
+            self.client.get("/api/v1/skills/", HTTP_X_FORWARDED_FOR="203.0.113.7, 10.0.0.1", HTTP_USER_AGENT="bot")
+        self.client.get("/api/v1/nope/")
+        self.client.get("/health")
+        self.assertFalse(RequestAuditLog.objects.exists())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(audit_buffer.flush(), 2)
+        first, second = RequestAuditLog.objects.order_by("requested_at", "id")
+        self.assertEqual((first.path, first.method, first.status_code), ("/api/v1/skills/", "GET", 200))
+        # X-Forwarded-For is ignored unless NUM_PROXIES trusts it.
+        self.assertEqual((first.ip_address, first.user_agent), ("127.0.0.1", "bot"))
+        self.assertEqual(second.status_code, 404)
+
+    @override_settings(REQUEST_AUDIT={**AUDIT, "SAMPLE_RATE": 0.0})
+    def test_sampling(self, ensure_flusher):
+        self.client.get("/api/v1/skills/")
+        self.assertEqual(audit_buffer.flush(), 0)
+
+    @override_settings(REQUEST_AUDIT={**AUDIT, "MAX_QUEUE": 2})
+    def test_overflow_drops_events(self, ensure_flusher):
+        for _ in range(3):
+            self.client.get("/api/v1/skills/")
+        self.assertEqual(audit_buffer.dropped, 1)
+        self.assertEqual(audit_buffer.flush(), 2)
+
+    def test_records_authenticated_user_without_loading_it(self, ensure_flusher):
+        user = MyUser.objects.create_superuser("admin@example.com", "password")
+        self.client.force_login(user)
+        self.client.get("/admin/")
+        self.client.get("/api/v1/skills/")
+        audit_buffer.flush()
+        self.assertEqual(
+            list(RequestAuditLog.objects.order_by("requested_at", "id").values_list("user_id", flat=True)),
+            [user.pk, None])
+
+    def test_forwarded_ip_follows_num_proxies(self, ensure_flusher):
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}):
+            self.client.get("/api/v1/skills/", HTTP_X_FORWARDED_FOR="198.51.100.1, 203.0.113.7")
+            self.client.get("/api/v1/skills/", HTTP_X_FORWARDED_FOR="not-an-ip")
+        audit_buffer.flush()
+        self.assertEqual(list(RequestAuditLog.objects.order_by("requested_at", "id").values_list("ip_address", flat=True)),
+                         ["203.0.113.7", None])
+
+    async def test_async_path(self, ensure_flusher):
+        async def view(request):
+            return HttpResponse(status=201)
+
+        middleware = RequestAuditMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().post("/api/v1/contact/"))
+        self.assertEqual(response.status_code, 201)
+        (event,) = audit_buffer.drain(10)
+        self.assertEqual(event[4:7], ("/api/v1/contact/", "POST", 201))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, METRICS_TOKEN="scrape-token",
+                   EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class MetricsTests(TestCase):
+    SKILLS = {"view": "apps.users.api.v1.views.MySkillView", "method": "GET"}
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def scrape(self, **headers):
+        return self.client.get("/metrics", **headers)
+
+    def test_records_latency_size_and_queries_per_view(self):
+        MySkill.objects.create(name="Python", percentage=90)
+        before = self.sample("django_http_request_duration_seconds_count", status="200", **self.SKILLS)
+        queries = self.sample("django_http_db_queries_sum", **self.SKILLS)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/skills/")
+        self.assertEqual(
+            self.sample("django_http_request_duration_seconds_count", status="200", **self.SKILLS), before + 1)
+        self.assertEqual(self.sample("django_http_db_queries_sum", **self.SKILLS), queries + 2)
+        self.assertGreaterEqual(
+            self.sample("django_http_response_size_bytes_sum", **self.SKILLS), len(response.content))
+
+    async def test_async_path_counts_async_orm_queries(self):
+        async def view(request):
+            await MySkill.objects.acount()
+            await MySkill.objects.filter(name="Python").aexists()
+            return HttpResponse()
+
+        middleware = MetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        labels = {"view": metrics.UNRESOLVED, "method": "GET"}
+        queries = self.sample("django_http_db_queries_sum", **labels)
+        await middleware(AsyncRequestFactory().get("/"))
+        self.assertEqual(self.sample("django_http_db_queries_sum", **labels), queries + 2)
+
+    def test_unresolved_paths_share_one_label(self):
+        labels = {"view": metrics.UNRESOLVED, "method": "GET", "status": "404"}
+        before = self.sample("django_http_request_duration_seconds_count", **labels)
+        self.client.get("/no-such-page/")
+        self.client.get("/another/missing/page")
+        self.assertEqual(self.sample("django_http_request_duration_seconds_count", **labels), before + 2)
+
+    def test_unknown_methods_share_one_label(self):
+        labels = {"view": metrics.UNRESOLVED, "status": "404"}
+        before = self.sample("django_http_request_duration_seconds_count", method="other", **labels)
+        self.client.generic("FOO", "/no-such-page/")
+        self.client.generic("BREW", "/no-such-page/")
+        self.assertEqual(
+            self.sample("django_http_request_duration_seconds_count", method="other", **labels), before + 2)
+        self.assertEqual(self.sample("django_http_request_duration_seconds_count", method="FOO", **labels), 0)
+
+    def test_endpoint_requires_token_or_staff(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        response = self.scrape(HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"django_http_request_duration_seconds_bucket", response.content)
+
+        self.client.force_login(MyUser.objects.create_superuser("admin@example.com", "password"))
+        self.assertEqual(self.scrape().status_code, 200)
+
+    def test_support_email_task_duration_and_failures(self):
+        task = send_support_email_task.name
+        runs = self.sample("celery_task_duration_seconds_count", task=task, state="SUCCESS")
+        send_support_email_task.apply(args=("Visitor", "visitor@example.com"))
+        self.assertEqual(self.sample("celery_task_duration_seconds_count", task=task, state="SUCCESS"), runs + 1)
+
+        failures = self.sample("celery_task_failures_total", task=task, exception="SMTPException")
+        with mock.patch.object(smtp_pool, "send_messages", side_effect=smtplib.SMTPException("down")):
+            send_support_email_task.apply(args=("Visitor", "visitor@example.com"))
+        self.assertEqual(self.sample("celery_task_failures_total", task=task, exception="SMTPException"), failures + 1)
+
+
+def failing_check():
+    raise ConnectionError("down")
+
+
+@override_settings(CACHES=LOCMEM_CACHES, HEALTH_CHECK={"TIMEOUT": 0.5, "CACHE_SECONDS": 60})
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        health.reset()
+        self.addCleanup(health.reset)
+
+    def test_liveness_skips_middleware_and_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/health", HTTP_HOST="not-allowed.example")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ok"})
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertNotIn("Set-Cookie", response)
+        self.assertEqual(self.client.get("/health/").status_code, 200)
+
+    def test_readiness_reports_each_dependency(self):
+        checks = {"database": health.check_database, "redis": lambda: None, "broker": failing_check}
+        with mock.patch.dict(health.CHECKS, checks, clear=True):
+            response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {
+            "status": "unavailable",
+            "checks": {"database": "ok", "redis": "ok", "broker": "ConnectionError"},
+        })
+
+    def test_readiness_result_is_cached(self):
+        check = mock.Mock(return_value=None)
+        with mock.patch.dict(health.CHECKS, {"database": check}, clear=True):
+            for _ in range(3):
+                self.assertEqual(self.client.get("/ready").status_code, 200)
+        self.assertEqual(check.call_count, 1)
+
+    async def test_runs_natively_under_asgi(self):
+        async def view(request):
+            return HttpResponse("view")
+
+        middleware = HealthCheckMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = AsyncRequestFactory()
+        self.assertEqual((await middleware(factory.get("/health/"))).status_code, 200)
+        self.assertEqual((await middleware(factory.get("/api/v1/skills/"))).content, b"view")
+        with mock.patch.dict(health.CHECKS, {"redis": failing_check}, clear=True):
+            self.assertEqual((await middleware(factory.get("/ready"))).status_code, 503)
+
+    @override_settings(HEALTH_CHECK={"TIMEOUT": 0.05, "CACHE_SECONDS": 0})
+    def test_slow_dependency_times_out(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        slow = mock.Mock(side_effect=release.wait)
+        with mock.patch.dict(health.CHECKS, {"redis": slow}, clear=True):
+            self.assertEqual(health.run_checks(), (False, {"redis": "timeout"}))
+            # The hung check is waited on again, not started a second time.
+            self.assertEqual(health.run_checks(), (False, {"redis": "timeout"}))
+            self.assertEqual(slow.call_count, 1)
+            release.set()
+            self.assertEqual(health.run_checks(), (True, {"redis": "ok"}))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SeedingTests(TemporaryMediaMixin, TestCase):
+    def test_same_seed_gives_same_data(self):
+        counts = seeding.seed(10, seed=7)
+        self.assertEqual(counts["blog_posts"], 10)
+        self.assertEqual(counts["work_technologies"], 10 * seeding.TECHNOLOGIES_PER_WORK)
+        first = list(BlogPost.objects.order_by("id").values_list("title", "slug", "status"))
+        seeding.clear()
+        self.assertFalse(MyWork.objects.exists())
+        seeding.seed(10, seed=7)
+        self.assertEqual(list(BlogPost.objects.order_by("id").values_list("title", "slug", "status")), first)
+
+    def test_dates_do_not_depend_on_the_clock(self):
+        counts = {"blog_posts": 5}
+        seeding.run(counts, seed=1)
+        dates = list(BlogPost.objects.order_by("id").values_list("published_at", flat=True))
+        self.assertTrue(all(date is None or date < seeding.EPOCH for date in dates))
+        seeding.clear()
+        with mock.patch("django.utils.timezone.now", return_value=seeding.EPOCH + timedelta(days=400)):
+            seeding.run(counts, seed=1)
+        self.assertEqual(list(BlogPost.objects.order_by("id").values_list("published_at", flat=True)), dates)
+
+    def test_capacity_run_links_children_to_seeded_parents(self):
+        owner = MyUser.objects.create_superuser("owner@example.com", "password")
+        counts = {"users": 3, "blog_posts": 5, "blog_comments": 40, "contact_messages": 4, "email_outbox": 4,
+                  "request_audit_logs": 20, "faqs": 2}
+        inserted = seeding.run(counts, seed=3, chunk_size=7)
+        self.assertEqual(inserted, counts)
+        self.assertEqual(BlogComment.objects.count(), 40)
+        self.assertEqual(sum(BlogPost.objects.values_list("comment_count", flat=True)), 40)
+        self.assertFalse(BlogComment.objects.exclude(post__in=BlogPost.objects.all()).exists())
+        self.assertFalse(RequestAuditLog.objects.filter(user=owner).exists())
+        # Jobs are seeded per (seed, step, first id), not by run order.
+        bodies = list(BlogComment.objects.order_by("id").values_list("post_id", "body"))
+        seeding.clear()
+        self.assertEqual(list(MyUser.objects.all()), [owner])
+        seeding.run(counts, seed=3, chunk_size=7)
+        self.assertEqual(list(BlogComment.objects.order_by("id").values_list("post_id", "body")), bodies)
+
+    def test_clear_keeps_site_settings_and_uploaded_files(self):
+        SettingFiles.objects.create(name="CV", file="settings_files/cv.pdf")
+        seeding.seed_site(seed=1, setting_files=2)
+        settings_rows = list(Settings.objects.values_list("key", "value"))
+        seeding.clear()
+        self.assertEqual(list(SettingFiles.objects.values_list("name", flat=True)), ["CV"])
+        self.assertEqual(list(Settings.objects.values_list("key", "value")), settings_rows)
+
+    def test_benchmark_covers_every_v1_route(self):
+        fixtures = {"work_id": 1, "slug": "post", "search_term": "post", "file_id": 1, "file_version": "v",
+                    "admin_token": "token"}
+        self.assertEqual(set(route_requests(fixtures)), {str(p.pattern) for p in v1_urls.urlpatterns})
+
+
+
+class StreamingExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f"Sender {i}", email=f"sender{i}@example.com", message=f"Message {i}")
+            for i in range(5)
+        ])
+        ContactMessage.objects.create(name="=HYPERLINK(\"x\")", email="evil@example.com", message="-1+1")
+        cls.admin = MyUser.objects.create_superuser("admin@example.com", "password")
+
+    def test_csv_streams_header_before_running_the_query(self):
+        response = stream_export_response(ContactMessage.objects.order_by("pk"), ("name", "message"), "messages",
+                                          chunk_size=2)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="messages.csv"')
+        chunks = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            self.assertEqual(next(chunks), "\ufeffname,message\r\n".encode())
+        with self.assertNumQueries(1):
+            body = b"".join(chunks).decode()
+        lines = body.splitlines()
+        self.assertEqual(lines[0], "Sender 0,Message 0")
+        self.assertEqual(len(lines), 6)
+        # Spreadsheet formulas are neutralised.
+        self.assertEqual(lines[-1], "\"'=HYPERLINK(\"\"x\"\")\",'-1+1")
+
+    def test_ndjson_writes_one_object_per_line(self):
+        response = stream_export_response(ContactMessage.objects.order_by("pk"), ("id", "email", "created_at"),
+                                          "messages", export_format="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(set(rows[0]), {"id", "email", "created_at"})
+        self.assertEqual(rows[0]["email"], "sender0@example.com")
+
+    def test_api_export_is_admin_only(self):
+        url = "/api/v1/exports/contact-messages/csv/"
+        self.assertEqual(self.client.get(url).status_code, 401)
+        user = MyUser.objects.create_user("user@example.com", "password")
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}").status_code,
+                         403)
+
+        auth = f"Bearer {AccessToken.for_user(self.admin)}"
+        response = self.client.get(url, HTTP_AUTHORIZATION=auth, HTTP_ACCEPT="text/csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(b"".join(response.streaming_content).decode().splitlines()), 7)
+        self.assertEqual(self.client.get("/api/v1/exports/users/csv/", HTTP_AUTHORIZATION=auth).status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/exports/contact-messages/xml/", HTTP_AUTHORIZATION=auth).status_code,
+                         404)
+
+    def test_admin_action_exports_selected_rows(self):
+        self.client.force_login(self.admin)
+        selected = list(ContactMessage.objects.order_by("pk").values_list("pk", flat=True)[:2])
+        response = self.client.post("/admin/users/contactmessage/", {
+            "action": "export_ndjson", "_selected_action": selected,
+        })
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["id"] for row in rows], selected)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f"Sender {i}", email=f"sender{i}@example.com", message=f"Message {i}")
+            for i in range(3)
+        ])
+
+    def test_large_estimate_replaces_the_exact_count(self):
+        paginator = EstimatedCountPaginator(ContactMessage.objects.order_by("-created_at"), 100)
+        with mock.patch("apps.core.utils.pagination.estimated_count", return_value=5_000_000) as estimate:
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 5_000_000)
+        estimate.assert_called_once()
+        self.assertEqual(paginator.num_pages, 50_000)
+
+    def test_small_or_unknown_estimate_counts_exactly(self):
+        for estimate in (None, 10):
+            with mock.patch("apps.core.utils.pagination.estimated_count", return_value=estimate):
+                self.assertEqual(EstimatedCountPaginator(ContactMessage.objects.all(), 100).count, 3)
+
+    def test_changelist_search_runs_a_single_count(self):
+        self.client.force_login(MyUser.objects.create_superuser("admin@example.com", "password"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/users/contactmessage/", {"q": "sender1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 1)
+        counts = [query["sql"] for query in queries if "COUNT(" in query["sql"] and "users_contactmessage" in query["sql"]]
+        self.assertEqual(len(counts), 1)
+
+
+REPLICA_ROUTING = {"REPLICAS": ["replica1"], "STICKY_SECONDS": 5.0, "COOKIE_NAME": "db_primary"}
+
+
+@override_settings(REPLICA_ROUTING=REPLICA_ROUTING)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        db_router.reset()
+        self.addCleanup(db_router.reset)
+        self.router = db_router.PrimaryReplicaRouter()
+
+    def test_reads_go_to_the_primary_after_a_write(self):
+        self.assertEqual(self.router.db_for_read(MySkill), "replica1")
+        self.assertEqual(self.router.db_for_write(ContactMessage), "default")
+        self.assertEqual(self.router.db_for_read(MySkill), "default")
+        with mock.patch("apps.core.db_router.time.monotonic", return_value=time.monotonic() + 6):
+            self.assertEqual(self.router.db_for_read(MySkill), "replica1")
+
+    def test_reads_in_a_transaction_use_the_primary(self):
+        with mock.patch.object(connection, "in_atomic_block", True):
+            self.assertEqual(self.router.db_for_read(MySkill), "default")
+
+    def test_reads_following_another_process_write_use_the_primary(self):
+        self.assertEqual(MySkill.objects.all().db, "replica1")
+        self.assertEqual(site_settings._queryset().db, "default")
+        with mock.patch("apps.users.tasks.apps.get_model") as get_model, \
+                mock.patch("apps.users.images.generate_variants"):
+            generate_image_variants_task("users.MyWork", 1, "image")
+        get_model.return_value.objects.using.assert_called_once_with("default")
+
+    @override_settings(REPLICA_ROUTING={**REPLICA_ROUTING, "REPLICAS": []})
+    def test_everything_uses_the_primary_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(MySkill), "default")
+
+    def test_session_sticks_to_the_primary_after_a_write(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(MySkill))
+            if request.method == "POST":
+                self.router.db_for_write(ContactMessage)
+            return HttpResponse()
+
+        middleware = ReplicaStickinessMiddleware(view)
+        factory = RequestFactory()
+        self.assertNotIn("db_primary", middleware(factory.get("/")).cookies)
+        response = middleware(factory.post("/"))
+        self.assertEqual(response.cookies["db_primary"]["max-age"], 5)
+        # A new request starts unpinned unless it carries the cookie.
+        middleware(factory.get("/"))
+        middleware(factory.get("/", HTTP_COOKIE="db_primary=1"))
+        self.assertEqual(seen, ["replica1", "replica1", "replica1", "default"])
+
+    async def test_async_path_sees_writes_made_in_sync_code(self):
+        async def view(request):
+            # The ORM runs in a thread; its write must reach this context.
+            await sync_to_async(self.router.db_for_write)(ContactMessage)
+            return HttpResponse()
+
+        middleware = ReplicaStickinessMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().post("/"))
+        self.assertIn("db_primary", response.cookies)
+
+
+@skipUnless(settings.REPLICA_ROUTING["REPLICAS"], "needs DJANGO_DATABASE_REPLICA_URLS")
+class ReplicaMirrorTests(TransactionTestCase):
+    """Replicas mirror the test database, so routed reads see the primary's rows."""
+    databases = "__all__"
+
+    def test_routed_reads_see_primary_writes(self):
+        MySkill.objects.create(name="Django", percentage=90)
+        db_router.reset()
+        skills = MySkill.objects.all()
+        self.assertIn(skills.db, settings.REPLICA_ROUTING["REPLICAS"])
+        self.assertEqual([skill.name for skill in skills], ["Django"])
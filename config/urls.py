@@ -5,6 +5,8 @@ from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, Spec
 from django.conf.urls.static import static
 from debug_toolbar.toolbar import debug_toolbar_urls
 
+from apps.core.metrics import metrics_view
+
 apidoc = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger-ui/',
@@ -15,6 +17,7 @@ apidoc = [
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path(f'api/{settings.API_VERSION}/', include('apps.users.api.v1.urls')),
 ] + apidoc
 